@@ -5,7 +5,8 @@
 
 const pool = require('../config/database');
 const logger = require('../utils/logger');
-const { queueEmbeddingGeneration } = require('../queues/embeddingQueue');
+const { queueEmbeddingGeneration, isEnrichmentWorkerEnabled } = require('../queues/embeddingQueue');
+const { refreshFeatureStore } = require('../services/predictionService');
 
 /**
  * Webhook endpoint for Apify actor to push scraped data
@@ -128,6 +129,13 @@ async function handleApifyWebhook(req, res) {
       });
     }
 
+    // Precompute prediction features for the new posts (async - don't wait)
+    if (insertedCount > 0) {
+      refreshFeatureStore().catch(err => {
+        logger.error('[Ingestion] Failed to trigger feature store refresh:', err.message);
+      });
+    }
+
     return res.status(200).json({
       success: true,
       inserted: insertedCount,
@@ -150,6 +158,12 @@ async function handleApifyWebhook(req, res) {
  * Queues a BullMQ job to generate embeddings asynchronously
  */
 async function triggerEmbeddingPipeline(batchSize) {
+  // The prediction-service enrichment worker picks up pending posts itself
+  if (isEnrichmentWorkerEnabled()) {
+    logger.info(`[Ingestion] Enrichment worker enabled - leaving ~${batchSize} new posts to it`);
+    return;
+  }
+
   logger.info(`[Ingestion] Triggering embedding pipeline for ~${batchSize} new posts`);
 
   try {
@@ -94,7 +94,8 @@ async function retrainModels(req, res) {
   try {
     console.log('🔄 [PREDICTION] Triggering model retraining...');
 
-    const result = await predictionService.retrainModels();
+    // Full rebuild unless the caller opts into ?mode=incremental
+    const result = await predictionService.retrainModels(req.query.mode || 'full');
 
     if (!result.success) {
       return res.status(503).json({
@@ -10,6 +10,15 @@ const logger = require('../utils/logger');
 // Create embedding queue
 const embeddingQueue = new Queue('embeddings', defaultQueueOptions);
 
+/**
+ * Whether the prediction-service enrichment worker (enrichment_worker.py) owns
+ * embedding generation; if so the scheduler and ingestion webhook don't queue
+ * pending-post batches here
+ */
+function isEnrichmentWorkerEnabled() {
+  return process.env.ENRICHMENT_WORKER_ENABLED === 'true';
+}
+
 /**
  * Add a job to generate embeddings for pending posts
  */
@@ -105,6 +114,7 @@ module.exports = {
   embeddingQueue,
   queueEmbeddingGeneration,
   queueSpecificPosts,
+  isEnrichmentWorkerEnabled,
   getQueueStats,
   cleanQueue
 };
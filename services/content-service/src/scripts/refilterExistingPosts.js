@@ -69,7 +69,11 @@ async function refilterExistingPosts() {
             try {
               const nerResponse = await axios.post('http://ner-service:8000/extract-metadata', {
                 text: `${post.title} ${post.bodyText || ''}`.substring(0, 2000)
-              }, { timeout: 3000 });
+              }, {
+                timeout: 3000,
+                // Bulk re-filtering must not compete with user-facing extraction
+                headers: { 'X-Priority': 'batch', 'X-Deadline-Ms': '3000' }
+              });
 
               const nerData = nerResponse.data;
 
@@ -296,7 +296,11 @@ async function saveScrapedData(scrapedPosts) {
           const nerServiceUrl = process.env.NER_SERVICE_URL || `http://ner-service:${nerServicePort}`;
           const nerResponse = await axios.post(`${nerServiceUrl}/extract-metadata`, {
             text: `${post.title} ${post.bodyText || ''}`.substring(0, 2000)
-          }, { timeout: 3000 });
+          }, {
+            timeout: 3000,
+            // Let the NER service drop this request instead of running it after we gave up
+            headers: { 'X-Priority': 'interactive', 'X-Deadline-Ms': '3000' }
+          });
 
           const nerData = nerResponse.data;
 
@@ -32,6 +32,9 @@ const LOCAL_EMBEDDING_URL = process.env.EMBEDDING_SERVER_URL || `http://embeddin
 // Configuration
 const BATCH_SIZE = 100; // Process 100 posts at a time
 const MAX_TOKENS_PER_REQUEST = 8000; // Token limit
+// A post left in 'processing' longer than this (e.g. by a crashed job) can be claimed again;
+// same lease as the prediction-service enrichment worker
+const PROCESSING_LEASE_SECONDS = parseInt(process.env.ENRICHMENT_LEASE_SECONDS || '900', 10);
 
 /**
  * Generate embeddings for all pending posts
@@ -42,16 +45,26 @@ async function generatePendingEmbeddings() {
   logger.info('[Embeddings] Starting pending embeddings generation');
 
   try {
-    // Get pending posts - ONLY PROCESS RELEVANT POSTS
+    // Claim pending posts - ONLY PROCESS RELEVANT POSTS
     // This saves API costs by only generating embeddings for interview-related content
+    // SKIP LOCKED + 'processing' in one statement so concurrent jobs and the
+    // prediction-service enrichment worker never pick up the same rows
     const pendingQuery = await pool.query(`
-      SELECT id, post_id, title, body_text, comments
-      FROM scraped_posts
-      WHERE embedding_status = 'pending'
-        AND embedding_retry_count < 3
-        AND is_relevant = true  -- ONLY process relevant posts
-      ORDER BY scraped_at DESC
-      LIMIT $1
+      WITH claimed AS (
+        SELECT id
+        FROM scraped_posts
+        WHERE embedding_status = 'pending'
+          AND embedding_retry_count < 3
+          AND is_relevant = true  -- ONLY process relevant posts
+        ORDER BY scraped_at DESC
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+      )
+      UPDATE scraped_posts p
+      SET embedding_status = 'processing', updated_at = NOW()
+      FROM claimed
+      WHERE p.id = claimed.id
+      RETURNING p.id, p.post_id, p.title, p.body_text, p.comments
     `, [BATCH_SIZE]);
 
     const posts = pendingQuery.rows;
@@ -69,7 +82,7 @@ async function generatePendingEmbeddings() {
     // Process each post
     for (const post of posts) {
       try {
-        await generatePostEmbedding(post);
+        await generatePostEmbedding(post, { claimed: true });
         succeeded++;
       } catch (error) {
         logger.error(`[Embeddings] Failed to generate embedding for post ${post.post_id}:`, error.message);
@@ -106,14 +119,27 @@ async function generatePendingEmbeddings() {
 
 /**
  * Generate embedding for a single post
+ * @param {Object} post - scraped_posts row (id, post_id, title, body_text, comments)
+ * @param {Object} options
+ * @param {boolean} options.claimed - post was already marked 'processing' by the caller's claim
  */
-async function generatePostEmbedding(post) {
-  // Mark as processing
-  await pool.query(`
-    UPDATE scraped_posts
-    SET embedding_status = 'processing', updated_at = NOW()
-    WHERE id = $1
-  `, [post.id]);
+async function generatePostEmbedding(post, { claimed = false } = {}) {
+  // Mark as processing, unless another job or the enrichment worker already is
+  // and its lease has not expired
+  if (!claimed) {
+    const claim = await pool.query(`
+      UPDATE scraped_posts
+      SET embedding_status = 'processing', updated_at = NOW()
+      WHERE id = $1
+        AND (embedding_status <> 'processing'
+             OR updated_at < NOW() - $2::int * INTERVAL '1 second')
+      RETURNING id
+    `, [post.id, PROCESSING_LEASE_SECONDS]);
+
+    if (claim.rowCount === 0) {
+      throw new Error(`Post ${post.post_id} is already being processed`);
+    }
+  }
 
   // Prepare text for embedding
   const fullText = prepareTextForEmbedding(post);
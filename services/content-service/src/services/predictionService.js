@@ -91,13 +91,18 @@ async function getPredictionServiceHealth() {
 
 /**
  * Trigger model retraining with latest data
+ * @param {string} mode - 'full' rebuilds from every post (picks up relabels and
+ *   deletes); 'incremental' only adds posts scraped since the last bundle
  */
-async function retrainModels() {
+async function retrainModels(mode = 'full') {
   try {
     const response = await axios.post(
       `${PREDICTION_SERVICE_URL}/api/models/retrain`,
       {},
-      { timeout: 60000 } // 60 second timeout for training
+      {
+        params: { mode },
+        timeout: 60000 // 60 second timeout for training
+      }
     );
 
     return {
@@ -113,6 +118,31 @@ async function retrainModels() {
   }
 }
 
+/**
+ * Featurize newly ingested posts into the prediction feature store
+ * (runs in the background on the prediction service)
+ */
+async function refreshFeatureStore() {
+  try {
+    const response = await axios.post(
+      `${PREDICTION_SERVICE_URL}/api/features/refresh`,
+      {},
+      { params: { reason: 'ingest' }, timeout: 5000 }
+    );
+
+    return {
+      success: true,
+      result: response.data
+    };
+  } catch (error) {
+    console.error('❌ [PREDICTION] Error refreshing feature store:', error.message);
+    return {
+      success: false,
+      error: error.message
+    };
+  }
+}
+
 /**
  * Get model statistics
  */
@@ -142,5 +172,6 @@ module.exports = {
   analyzeSkillGap,
   getPredictionServiceHealth,
   retrainModels,
+  refreshFeatureStore,
   getModelStats
 };
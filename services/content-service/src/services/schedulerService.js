@@ -10,7 +10,7 @@ const devtoService = require('./devtoService');
 const mediumService = require('./mediumService');
 const backfillService = require('./backfillService');
 const targetedCompanyScraper = require('./targetedCompanyScraper');
-const { queueEmbeddingGeneration } = require('../queues/embeddingQueue');
+const { queueEmbeddingGeneration, isEnrichmentWorkerEnabled } = require('../queues/embeddingQueue');
 const { refreshAllBenchmarkCaches } = require('./benchmarkCacheService');
 const trendingService = require('./trendingService');
 const logger = require('../utils/logger');
@@ -493,8 +493,14 @@ async function initializeScheduler() {
   // Initialize backfill tracking table
   await backfillService.initializeBackfillTracking();
 
-  // Always start embedding, benchmark cache, and trending scores schedules
-  startEmbeddingSchedule();
+  // Embeddings come from the prediction-service enrichment worker when it is deployed
+  if (isEnrichmentWorkerEnabled()) {
+    logger.info('[Scheduler] Enrichment worker enabled - skipping embedding schedule');
+  } else {
+    startEmbeddingSchedule();
+  }
+
+  // Always start benchmark cache and trending scores schedules
   startBenchmarkCacheSchedule();
   startTrendingScoresSchedule();
 
@@ -638,6 +644,10 @@ async function triggerJob(jobName) {
         break;
 
       case 'embedding':
+        if (isEnrichmentWorkerEnabled()) {
+          result = { message: 'Embeddings are generated by the enrichment worker - job not queued' };
+          break;
+        }
         await queueEmbeddingGeneration({ batchSize: 100 });
         result = { message: 'Embedding job queued' };
         break;
@@ -0,0 +1,283 @@
+"""
+NER Service Benchmark
+Measures per-stage latency, batch/concurrency throughput, peak memory and
+per-field precision/recall, and writes the results as JSON so runs can be diffed
+
+Usage:
+    python benchmarks/run_benchmark.py --output results.json
+    python benchmarks/run_benchmark.py --synthetic-size 2000 --batch-sizes 1 8 32 --concurrency 1 4
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_posts.jsonl')
+
+FIELDS = ['company', 'role_type', 'level', 'location', 'outcome']
+
+# Vocabulary for synthetic posts: (surface form, expected label)
+SYNTHETIC_COMPANIES = [('Google', 'Google'), ('Amazon', 'Amazon'), ('Meta', 'Meta'), ('Stripe', 'Stripe'),
+                       ('Microsoft', 'Microsoft'), ('Uber', 'Uber'), ('Citadel', 'Citadel'), ('Snowflake', 'Snowflake')]
+SYNTHETIC_ROLES = [('software engineer', 'SWE'), ('backend', 'SWE'), ('data scientist', 'Data'),
+                   ('SRE', 'DevOps'), ('product manager', 'PM'), ('security engineer', 'Security')]
+SYNTHETIC_LEVELS = [('L4', 'L4'), ('E5', 'E5'), ('Senior', 'Senior'), ('Junior', 'Junior'), ('Staff', 'Staff'), ('', None)]
+SYNTHETIC_LOCATIONS = [('Seattle', 'Seattle'), ('NYC', 'New York'), ('Austin', 'Austin'), ('remote', 'Remote'), ('', None)]
+SYNTHETIC_OUTCOMES = [('Got the offer', 'offer'), ('Rejected after onsite', 'reject'), ('Still waiting to hear back', 'pending')]
+FILLER = [
+    "The first round was a phone screen with two medium coding questions.",
+    "Onsite had system design, two coding rounds and a behavioral interview.",
+    "I prepared for about six weeks using mock interviews and past questions.",
+    "The interviewers asked about trade-offs in my previous projects.",
+    "Recruiter communication was quick and the process took three weeks overall."
+]
+
+
+def load_golden(path: str = GOLDEN_PATH) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def generate_synthetic(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate labelled synthetic posts of varying length"""
+    rng = random.Random(seed)
+    posts = []
+    for i in range(n):
+        company = rng.choice(SYNTHETIC_COMPANIES)
+        role = rng.choice(SYNTHETIC_ROLES)
+        level = rng.choice(SYNTHETIC_LEVELS)
+        location = rng.choice(SYNTHETIC_LOCATIONS)
+        outcome = rng.choice(SYNTHETIC_OUTCOMES)
+
+        head = " ".join(part for part in (company[0], level[0], role[0], 'interview') if part)
+        head += f" in {location[0]}." if location[0] else "."
+        body = " ".join(rng.choice(FILLER) for _ in range(rng.randint(1, 12)))
+        posts.append({
+            'id': f"s{i:06d}",
+            'text': f"{head} {body} {outcome[0]}.",
+            'labels': {
+                'company': company[1],
+                'role_type': role[1],
+                'level': level[1],
+                'location': location[1],
+                'outcome': outcome[1]
+            }
+        })
+    return posts
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) in milliseconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+        'p50_ms': round(pick(0.50) * 1000, 4),
+        'p95_ms': round(pick(0.95) * 1000, 4),
+        'p99_ms': round(pick(0.99) * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4)
+    }
+
+
+def measure_stages(service, posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Time the NER forward pass and every rule extractor separately, one post at a time"""
+    rules = service.rule_store.active
+    stages: Dict[str, Callable] = {
+        'extract_companies': lambda text, ents: service.extract_companies(text, ents, rules),
+        'extract_role_type': lambda text, ents: service.extract_role_type(text, rules),
+        'extract_level': lambda text, ents: service.extract_level(text),
+        'extract_location': lambda text, ents: service.extract_location(text, ents, rules),
+        'extract_outcome': lambda text, ents: service.extract_outcome(text, rules)
+    }
+    samples: Dict[str, List[float]] = {'ner_forward': [], **{name: [] for name in stages}}
+
+    for post in posts:
+        start = time.perf_counter()
+        entities = service.ner_pipeline(post['text'])
+        samples['ner_forward'].append(time.perf_counter() - start)
+
+        for name, stage in stages.items():
+            start = time.perf_counter()
+            stage(post['text'], entities)
+            samples[name].append(time.perf_counter() - start)
+
+    result = {name: percentiles(values) for name, values in samples.items()}
+    ner_total = sum(samples['ner_forward'])
+    rules_total = sum(sum(samples[name]) for name in stages)
+    result['ner_share'] = round(ner_total / (ner_total + rules_total), 4) if ner_total + rules_total else 0.0
+    return result
+
+
+def measure_throughput(service, posts: List[Dict[str, Any]], batch_sizes: List[int],
+                       concurrency_levels: List[int]) -> List[Dict[str, Any]]:
+    """Posts per second through extract_batch for each batch size x concurrency level"""
+    texts = [post['text'] for post in posts]
+    results = []
+
+    for batch_size in batch_sizes:
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        for concurrency in concurrency_levels:
+            batch_latencies: List[float] = []
+
+            def run(batch: List[str]):
+                start = time.perf_counter()
+                service.extract_batch(batch)
+                batch_latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(run, batches))
+            elapsed = time.perf_counter() - start
+
+            results.append({
+                'batch_size': batch_size,
+                'concurrency': concurrency,
+                'posts': len(texts),
+                'elapsed_s': round(elapsed, 4),
+                'posts_per_second': round(len(texts) / elapsed, 2) if elapsed else None,
+                'batch_latency': percentiles(batch_latencies)
+            })
+            print(f"  batch={batch_size:<4} concurrency={concurrency:<3} "
+                  f"{results[-1]['posts_per_second']} posts/s", file=sys.stderr)
+
+    return results
+
+
+def measure_accuracy(service, posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-field precision and recall against labelled posts (exact match, case-insensitive)"""
+    counts = {field: {'tp': 0, 'fp': 0, 'fn': 0} for field in FIELDS}
+    mistakes = []
+
+    texts = [post['text'] for post in posts]
+    predictions = []
+    for i in range(0, len(texts), 32):
+        predictions.extend(service.extract_batch(texts[i:i + 32]))
+
+    for post, predicted in zip(posts, predictions):
+        for field in FIELDS:
+            expected = post['labels'].get(field)
+            actual = predicted.get(field)
+            matched = expected is not None and actual is not None and str(expected).lower() == str(actual).lower()
+
+            if matched:
+                counts[field]['tp'] += 1
+                continue
+            if expected is None and actual is None:
+                continue
+            if actual is not None:
+                counts[field]['fp'] += 1
+            if expected is not None:
+                counts[field]['fn'] += 1
+            mistakes.append({'id': post['id'], 'field': field, 'expected': expected, 'actual': actual})
+
+    report = {}
+    for field, c in counts.items():
+        predicted_total = c['tp'] + c['fp']
+        expected_total = c['tp'] + c['fn']
+        report[field] = {
+            **c,
+            'precision': round(c['tp'] / predicted_total, 4) if predicted_total else None,
+            'recall': round(c['tp'] / expected_total, 4) if expected_total else None
+        }
+
+    return {'posts': len(posts), 'fields': report, 'mistakes': mistakes}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 2)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVICE_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NER service extraction pipeline")
+    parser.add_argument('--synthetic-size', type=int, default=500, help="Number of synthetic posts")
+    parser.add_argument('--stage-sample', type=int, default=200, help="Posts used for per-stage latency")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--golden', default=GOLDEN_PATH, help="Labelled JSONL corpus")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    rss_before_model = peak_rss_mb()
+    load_start = time.perf_counter()
+    import main as service
+    model_load_s = time.perf_counter() - load_start
+    rss_after_model = peak_rss_mb()
+
+    golden = load_golden(args.golden)
+    synthetic = generate_synthetic(args.synthetic_size, args.seed)
+
+    # Warm up tokenizer and model caches before timing anything
+    service.extract_batch([post['text'] for post in synthetic[:8]])
+
+    print("⏱️  Measuring per-stage latency...", file=sys.stderr)
+    stages = measure_stages(service, synthetic[:args.stage_sample])
+
+    print("🚀 Measuring throughput...", file=sys.stderr)
+    throughput = measure_throughput(service, synthetic, args.batch_sizes, args.concurrency)
+
+    print("🎯 Measuring accuracy...", file=sys.stderr)
+    accuracy = {
+        'golden': measure_accuracy(service, golden),
+        'synthetic': measure_accuracy(service, synthetic)
+    }
+    accuracy['synthetic'].pop('mistakes')
+
+    results = {
+        'benchmark': 'ner-service',
+        'timestamp': datetime.utcnow().isoformat(),
+        'git_commit': git_commit(),
+        'rules_version': service.rule_store.version,
+        'config': vars(args),
+        'model_load_s': round(model_load_s, 3),
+        'stages': stages,
+        'throughput': throughput,
+        'accuracy': accuracy,
+        'memory': {
+            'peak_rss_mb_before_model': rss_before_model,
+            'peak_rss_mb_after_model': rss_after_model,
+            'peak_rss_mb': peak_rss_mb()
+        }
+    }
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(payload + "\n")
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Bulk extraction jobs for the NER service
+Processes JSONL datasets in background batches with checkpointed, resumable progress
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Where job state, uploaded inputs and default outputs live
+JOBS_DIR = os.getenv('NER_JOBS_DIR', '/app/data/jobs')
+
+# Local input files must live under this directory
+JOBS_INPUT_ROOT = os.getenv('NER_JOBS_INPUT_ROOT', '/app/data')
+
+DEFAULT_BATCH_SIZE = int(os.getenv('NER_JOBS_BATCH_SIZE', '32'))
+MAX_CONCURRENT_JOBS = int(os.getenv('NER_JOBS_MAX_CONCURRENT', '1'))
+
+# Largest JSONL body accepted by /jobs/upload (1 GiB)
+MAX_UPLOAD_BYTES = int(os.getenv('NER_JOBS_MAX_UPLOAD_BYTES', str(1024 * 1024 * 1024)))
+
+# Job lifecycle states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class UploadTooLarge(Exception):
+    """Raised when an uploaded body goes past MAX_UPLOAD_BYTES"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Upload exceeds the {limit} byte limit")
+        self.limit = limit
+
+
+class BulkJob:
+    """
+    State of one bulk extraction job
+
+    The checkpoint is the pair (input_offset, output_offset): the byte position
+    in the input file after the last fully processed batch, and the size of the
+    output file at that moment. Resuming truncates the output back to
+    output_offset, so a crash mid-batch never leaves duplicate results.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        input_path: str,
+        output_path: str,
+        text_fields: List[str],
+        id_field: str = 'id',
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        self.job_id = job_id
+        self.input_path = input_path
+        self.output_path = output_path
+        self.text_fields = text_fields
+        self.id_field = id_field
+        self.batch_size = batch_size
+
+        self.status = QUEUED
+        self.processed = 0
+        self.failed = 0
+        self.input_offset = 0
+        self.output_offset = 0
+        self.total_bytes = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow().isoformat()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[str] = None
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(JOBS_DIR, self.job_id, 'job.json')
+
+    def to_dict(self) -> Dict[str, Any]:
+        progress = self.input_offset / self.total_bytes if self.total_bytes else 0.0
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'input_path': self.input_path,
+            'output_path': self.output_path,
+            'text_fields': self.text_fields,
+            'id_field': self.id_field,
+            'batch_size': self.batch_size,
+            'processed': self.processed,
+            'failed': self.failed,
+            'input_offset': self.input_offset,
+            'output_offset': self.output_offset,
+            'total_bytes': self.total_bytes,
+            'progress': round(progress, 4),
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'finished_at': self.finished_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BulkJob':
+        job = cls(
+            job_id=data['job_id'],
+            input_path=data['input_path'],
+            output_path=data['output_path'],
+            text_fields=data['text_fields'],
+            id_field=data.get('id_field', 'id'),
+            batch_size=data.get('batch_size', DEFAULT_BATCH_SIZE)
+        )
+        for key in ('status', 'processed', 'failed', 'input_offset', 'output_offset',
+                    'total_bytes', 'error', 'created_at', 'updated_at', 'finished_at'):
+            if key in data:
+                setattr(job, key, data[key])
+        return job
+
+    def save(self):
+        """Persist job state atomically (write temp file, then rename)"""
+        self.updated_at = datetime.utcnow().isoformat()
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+
+def resolve_input_path(path: str) -> str:
+    """Resolve a client-supplied input path, refusing anything outside JOBS_INPUT_ROOT"""
+    resolved = os.path.realpath(path)
+    root = os.path.realpath(JOBS_INPUT_ROOT)
+    if os.path.commonpath([resolved, root]) != root:
+        raise ValueError(f"Input path must be under {JOBS_INPUT_ROOT}")
+    if not os.path.isfile(resolved):
+        raise ValueError(f"Input file not found: {path}")
+    return resolved
+
+
+def resolve_output_path(path: str, input_path: Optional[str] = None) -> str:
+    """
+    Resolve a client-supplied output path under the same root as inputs
+
+    A job truncates its output before writing, so the path must not be the
+    job's input or any other existing file.
+    """
+    resolved = os.path.realpath(path)
+    root = os.path.realpath(JOBS_INPUT_ROOT)
+    if os.path.commonpath([resolved, root]) != root:
+        raise ValueError(f"Output path must be under {JOBS_INPUT_ROOT}")
+    if input_path is not None and resolved == os.path.realpath(input_path):
+        raise ValueError("Output path must not be the input file")
+    if os.path.exists(resolved):
+        raise ValueError(f"Output path already exists: {path}")
+    return resolved
+
+
+class BulkJobManager:
+    """
+    Runs bulk extraction jobs in the background
+
+    extract_batch is a coroutine function that receives a list of texts and
+    returns one result dict per text; file I/O runs on worker threads so the
+    event loop keeps serving requests.
+    """
+
+    def __init__(self, extract_batch: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]]):
+        self.extract_batch = extract_batch
+        self.jobs: Dict[str, BulkJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancelled: set = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def start(self):
+        """Load persisted jobs and resume any that were queued or running"""
+        self._slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+        os.makedirs(JOBS_DIR, exist_ok=True)
+
+        for job_id in sorted(os.listdir(JOBS_DIR)):
+            state_path = os.path.join(JOBS_DIR, job_id, 'job.json')
+            if not os.path.isfile(state_path):
+                continue
+            try:
+                with open(state_path) as f:
+                    job = BulkJob.from_dict(json.load(f))
+            except Exception as e:
+                logger.error(f"Skipping unreadable job state {state_path}: {e}")
+                continue
+
+            self.jobs[job.job_id] = job
+            if job.status in ACTIVE_STATES:
+                logger.info(f"♻️  Resuming job {job.job_id} at byte {job.input_offset}/{job.total_bytes}")
+                job.status = QUEUED
+                self._schedule(job)
+
+    def create_job(
+        self,
+        input_path: str,
+        text_fields: List[str],
+        output_path: Optional[str] = None,
+        id_field: str = 'id',
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        job_id: Optional[str] = None
+    ) -> BulkJob:
+        """Register a job for an input file that already exists on disk and start it"""
+        job_id = job_id or uuid.uuid4().hex
+        job = BulkJob(
+            job_id=job_id,
+            input_path=input_path,
+            output_path=output_path or os.path.join(JOBS_DIR, job_id, 'output.jsonl'),
+            text_fields=text_fields,
+            id_field=id_field,
+            batch_size=batch_size
+        )
+        job.total_bytes = os.path.getsize(input_path)
+        job.save()
+
+        self.jobs[job_id] = job
+        self._schedule(job)
+        logger.info(f"📥 Created job {job_id}: {input_path} ({job.total_bytes} bytes)")
+        return job
+
+    async def receive_upload(self, chunks, max_bytes: int = MAX_UPLOAD_BYTES) -> tuple:
+        """
+        Stream an uploaded JSONL body to disk
+
+        Returns:
+            (job_id, input_path) for a subsequent create_job call
+
+        Raises:
+            UploadTooLarge: the body went past max_bytes; nothing is kept on disk
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(JOBS_DIR, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        input_path = os.path.join(job_dir, 'input.jsonl')
+
+        received = 0
+        try:
+            with open(input_path, 'wb') as f:
+                async for chunk in chunks:
+                    received += len(chunk)
+                    if received > max_bytes:
+                        raise UploadTooLarge(max_bytes)
+                    f.write(chunk)
+        except BaseException:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+
+        return job_id, input_path
+
+    def get(self, job_id: str) -> Optional[BulkJob]:
+        return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[BulkJob]:
+        return sorted(self.jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[BulkJob]:
+        """Request cancellation; the running batch finishes and is checkpointed first"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+
+        if job.status in ACTIVE_STATES:
+            self._cancelled.add(job_id)
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished_at = datetime.utcnow().isoformat()
+                job.save()
+        return job
+
+    def _schedule(self, job: BulkJob):
+        self._tasks[job.job_id] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: BulkJob):
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+
+            try:
+                # Cancelled while queued: cancel() already marked it CANCELLED
+                if job.job_id in self._cancelled:
+                    return
+
+                job.status = RUNNING
+                job.save()
+
+                # Drop anything written after the last checkpoint
+                await loop.run_in_executor(None, _truncate_output, job.output_path, job.output_offset)
+
+                while job.job_id not in self._cancelled:
+                    lines, next_offset = await loop.run_in_executor(
+                        None, _read_batch, job.input_path, job.input_offset, job.batch_size
+                    )
+                    if not lines:
+                        break
+
+                    records = await self._process_batch(job, lines)
+                    job.output_offset = await loop.run_in_executor(
+                        None, _append_output, job.output_path, records
+                    )
+                    job.input_offset = next_offset
+                    job.save()
+
+                if job.job_id in self._cancelled:
+                    job.status = CANCELLED
+                    logger.info(f"🛑 Job {job.job_id} cancelled after {job.processed} records")
+                else:
+                    job.status = COMPLETED
+                    logger.info(f"✅ Job {job.job_id} completed: {job.processed} processed, {job.failed} failed")
+
+            except Exception as e:
+                logger.error(f"❌ Job {job.job_id} failed: {e}")
+                job.status = FAILED
+                job.error = str(e)
+
+            finally:
+                job.finished_at = datetime.utcnow().isoformat()
+                job.save()
+                self._cancelled.discard(job.job_id)
+                self._tasks.pop(job.job_id, None)
+
+    async def _process_batch(self, job: BulkJob, lines: List[bytes]) -> List[Dict[str, Any]]:
+        """Parse a batch of JSONL lines, run extraction and build output records"""
+        records: List[Optional[Dict[str, Any]]] = []
+        texts: List[str] = []
+        text_slots: List[int] = []
+
+        for line in lines:
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                records.append({'error': f"Invalid JSON: {e}"})
+                continue
+
+            text = "\n".join(str(item[f]) for f in job.text_fields if item.get(f))
+            record = {'id': item.get(job.id_field)}
+            if not text.strip():
+                record['error'] = 'Text cannot be empty'
+                records.append(record)
+                continue
+
+            records.append(record)
+            texts.append(text)
+            text_slots.append(len(records) - 1)
+
+        if texts:
+            for slot, result in zip(text_slots, await self.extract_batch(texts)):
+                records[slot].update(result)
+
+        job.processed += len(text_slots)
+        job.failed += len(records) - len(text_slots)
+        return records
+
+
+def _read_batch(path: str, offset: int, batch_size: int) -> tuple:
+    """Read up to batch_size non-empty lines starting at a byte offset"""
+    lines = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while len(lines) < batch_size:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                lines.append(line)
+        return lines, f.tell()
+
+
+def _append_output(path: str, records: List[Dict[str, Any]]) -> int:
+    """Append records to the output JSONL, fsync, and return the new file size"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'ab') as f:
+        for record in records:
+            f.write((json.dumps(record) + "\n").encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def _truncate_output(path: str, size: int):
+    if os.path.exists(path):
+        with open(path, 'r+b') as f:
+            f.truncate(size)
@@ -3,12 +3,21 @@ NER Service for RedCube XHS
 Extracts structured metadata from Reddit interview posts using Hugging Face transformers
 """
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel, Field
 from transformers import pipeline
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+import asyncio
 import re
 import logging
+import time
+
+from rules import CompiledRules, RuleStore
+from jobs import BulkJobManager, DEFAULT_BATCH_SIZE, MAX_UPLOAD_BYTES, UploadTooLarge, resolve_input_path, resolve_output_path
+from metrics import ERRORS, INPUT_LENGTH, REQUESTS, log_sampled, record_extraction, stage_timer
+from scheduler import BATCH, INTERACTIVE, MAX_QUEUE, PRIORITIES, DeadlineExceeded, PriorityScheduler, QueueFull
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -36,6 +45,8 @@ else:
 # Request/Response models
 class ExtractRequest(BaseModel):
     text: str
+    priority: Optional[str] = Field(None, description="interactive (default) or batch; overrides X-Priority")
+    deadline_ms: Optional[int] = Field(None, ge=1, description="Drop the request if inference has not started in time; overrides X-Deadline-Ms")
 
 class ExtractResponse(BaseModel):
     company: Optional[str] = None
@@ -44,132 +55,15 @@ class ExtractResponse(BaseModel):
     location: Optional[str] = None
     outcome: Optional[str] = None
     confidence: dict = {}
+    rules_version: Optional[str] = None
 
+class JobRequest(BaseModel):
+    input_path: str
+    output_path: Optional[str] = None
+    text_fields: List[str] = Field(default_factory=lambda: ['text'])
+    id_field: str = 'id'
+    batch_size: int = Field(DEFAULT_BATCH_SIZE, ge=1, le=512)
 
-# Company name mappings (common variations)
-COMPANY_MAPPINGS = {
-    # FAANG / Big Tech
-    'amazon': 'Amazon',
-    'amzn': 'Amazon',
-    'aws': 'Amazon',
-    'google': 'Google',
-    'alphabet': 'Google',
-    'meta': 'Meta',
-    'facebook': 'Meta',
-    'fb': 'Meta',
-    'microsoft': 'Microsoft',
-    'msft': 'Microsoft',
-    'apple': 'Apple',
-    'aapl': 'Apple',
-    'netflix': 'Netflix',
-    'tesla': 'Tesla',
-    'nvidia': 'Nvidia',
-    'intel': 'Intel',
-    'amd': 'AMD',
-    'ibm': 'IBM',
-    'oracle': 'Oracle',
-    'salesforce': 'Salesforce',
-
-    # Startups / Unicorns
-    'uber': 'Uber',
-    'lyft': 'Lyft',
-    'airbnb': 'Airbnb',
-    'stripe': 'Stripe',
-    'snowflake': 'Snowflake',
-    'databricks': 'Databricks',
-    'palantir': 'Palantir',
-    'coinbase': 'Coinbase',
-    'doordash': 'DoorDash',
-    'instacart': 'Instacart',
-    'reddit': 'Reddit',
-    'discord': 'Discord',
-    'roblox': 'Roblox',
-    'pinterest': 'Pinterest',
-    'snap': 'Snap',
-    'snapchat': 'Snap',
-    'twitter': 'Twitter',
-    'x corp': 'Twitter',
-    'linkedin': 'LinkedIn',
-    'tiktok': 'TikTok',
-    'bytedance': 'ByteDance',
-
-    # Finance / Banks (Major IT departments)
-    'jpmorgan': 'JPMorgan Chase',
-    'jp morgan': 'JPMorgan Chase',
-    'jpm': 'JPMorgan Chase',
-    'chase': 'JPMorgan Chase',
-    'goldman sachs': 'Goldman Sachs',
-    'goldman': 'Goldman Sachs',
-    'gs': 'Goldman Sachs',
-    'morgan stanley': 'Morgan Stanley',
-    'bank of america': 'Bank of America',
-    'bofa': 'Bank of America',
-    'boa': 'Bank of America',
-    'citigroup': 'Citigroup',
-    'citi': 'Citigroup',
-    'wells fargo': 'Wells Fargo',
-    'barclays': 'Barclays',
-    'credit suisse': 'Credit Suisse',
-    'ubs': 'UBS',
-    'deutsche bank': 'Deutsche Bank',
-    'hsbc': 'HSBC',
-
-    # Financial Services / FinTech
-    'visa': 'Visa',
-    'mastercard': 'Mastercard',
-    'paypal': 'PayPal',
-    'square': 'Block',
-    'block': 'Block',
-    'robinhood': 'Robinhood',
-    'capital one': 'Capital One',
-    'discover': 'Discover',
-    'american express': 'American Express',
-    'amex': 'American Express',
-    'fidelity': 'Fidelity',
-    'charles schwab': 'Charles Schwab',
-    'schwab': 'Charles Schwab',
-    'vanguard': 'Vanguard',
-    'blackrock': 'BlackRock',
-
-    # Hedge Funds / Trading Firms (Heavy tech users)
-    'two sigma': 'Two Sigma',
-    'jane street': 'Jane Street',
-    'citadel': 'Citadel',
-    'de shaw': 'D. E. Shaw',
-    'd.e. shaw': 'D. E. Shaw',
-    'hudson river trading': 'Hudson River Trading',
-    'hrt': 'Hudson River Trading',
-    'jump trading': 'Jump Trading',
-    'optiver': 'Optiver',
-    'akuna capital': 'Akuna Capital',
-    'virtu': 'Virtu Financial'
-}
-
-# Role type patterns
-ROLE_PATTERNS = {
-    'SWE': [
-        r'\bsoftware engineer\b', r'\bswe\b', r'\bengineering\b',
-        r'\bbackend\b', r'\bfrontend\b', r'\bfull[- ]?stack\b',
-        r'\bfullstack\b', r'\bweb developer\b', r'\bdeveloper\b'
-    ],
-    'DevOps': [
-        r'\bdevops\b', r'\bsre\b', r'\bsite reliability\b',
-        r'\binfrastructure\b', r'\bplatform engineer\b'
-    ],
-    'Data': [
-        r'\bdata scientist\b', r'\bdata engineer\b', r'\bml engineer\b',
-        r'\bmachine learning\b', r'\bai engineer\b', r'\bdata analyst\b'
-    ],
-    'PM': [
-        r'\bproduct manager\b', r'\bpm\b', r'\bproduct\b'
-    ],
-    'QA': [
-        r'\bqa\b', r'\bquality assurance\b', r'\btester\b', r'\btest engineer\b'
-    ],
-    'Security': [
-        r'\bsecurity engineer\b', r'\bappsec\b', r'\binfosec\b', r'\bcybersecurity\b'
-    ]
-}
 
 # Level extraction patterns
 LEVEL_PATTERNS = [
@@ -183,18 +77,17 @@ LEVEL_PATTERNS = [
     (r'\b([Ss]taff)\b', lambda m: 'Staff')
 ]
 
-# Outcome keywords
-OUTCOME_KEYWORDS = {
-    'offer': ['offer', 'accepted', 'got the job', 'hired', 'joining'],
-    'reject': ['rejected', 'didn\'t get', 'failed', 'rejection', 'turned down', 'no offer'],
-    'pending': ['waiting', 'in process', 'pending', 'under review', 'interviewing']
-}
+# Company, location, role and outcome tables live in the rule file (see rules.py)
+rule_store = RuleStore()
+rule_store.reload()
 
 
-def extract_companies(text: str, ner_entities: list) -> Tuple[Optional[str], float]:
+def extract_companies(text: str, ner_entities: list, rules: Optional[CompiledRules] = None) -> Tuple[Optional[str], float]:
     """
     Extract company name using NER ORG entities + keyword matching
     """
+    rules = rules or rule_store.active
+
     # Extract ORG entities from NER
     org_entities = [e['word'] for e in ner_entities if e['entity_group'] == 'ORG']
 
@@ -202,7 +95,7 @@ def extract_companies(text: str, ner_entities: list) -> Tuple[Optional[str], flo
     text_lower = text.lower()
     found_companies = []
 
-    for variant, canonical in COMPANY_MAPPINGS.items():
+    for variant, canonical in rules.company_variants:
         if variant in text_lower:
             found_companies.append(canonical)
 
@@ -218,16 +111,16 @@ def extract_companies(text: str, ner_entities: list) -> Tuple[Optional[str], flo
     return None, 0.0
 
 
-def extract_role_type(text: str) -> Tuple[Optional[str], float]:
+def extract_role_type(text: str, rules: Optional[CompiledRules] = None) -> Tuple[Optional[str], float]:
     """
     Extract role type using pattern matching
     """
+    rules = rules or rule_store.active
     text_lower = text.lower()
 
-    for role, patterns in ROLE_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, text_lower):
-                return role, 0.8  # Fixed confidence for pattern matching
+    for role, matcher in rules.role_matchers:
+        if matcher.search(text_lower):
+            return role, 0.8  # Fixed confidence for pattern matching
 
     return None, 0.0
 
@@ -245,33 +138,19 @@ def extract_level(text: str) -> Tuple[Optional[str], float]:
     return None, 0.0
 
 
-def extract_location(text: str, ner_entities: list) -> Tuple[Optional[str], float]:
+def extract_location(text: str, ner_entities: list, rules: Optional[CompiledRules] = None) -> Tuple[Optional[str], float]:
     """
     Extract location using NER GPE/LOC entities + keywords
     """
+    rules = rules or rule_store.active
+
     # Extract location entities from NER
     loc_entities = [e['word'] for e in ner_entities if e['entity_group'] in ['LOC', 'GPE']]
 
     # Check for common location keywords
     text_lower = text.lower()
-    location_keywords = {
-        'remote': 'Remote',
-        'wfh': 'Remote',
-        'work from home': 'Remote',
-        'seattle': 'Seattle',
-        'san francisco': 'San Francisco',
-        'sf': 'San Francisco',
-        'bay area': 'San Francisco',
-        'nyc': 'New York',
-        'new york': 'New York',
-        'austin': 'Austin',
-        'boston': 'Boston',
-        'chicago': 'Chicago',
-        'los angeles': 'Los Angeles',
-        'la': 'Los Angeles'
-    }
 
-    for keyword, canonical in location_keywords.items():
+    for keyword, canonical in rules.location_keywords:
         if keyword in text_lower:
             return canonical, 0.8
 
@@ -281,20 +160,151 @@ def extract_location(text: str, ner_entities: list) -> Tuple[Optional[str], floa
     return None, 0.0
 
 
-def extract_outcome(text: str) -> Tuple[Optional[str], float]:
+def extract_outcome(text: str, rules: Optional[CompiledRules] = None) -> Tuple[Optional[str], float]:
     """
     Extract outcome using keyword matching
     """
+    rules = rules or rule_store.active
     text_lower = text.lower()
 
-    for outcome, keywords in OUTCOME_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                return outcome, 0.7
+    for outcome, matcher in rules.outcome_matchers:
+        if matcher.search(text_lower):
+            return outcome, 0.7
 
     return None, 0.0
 
 
+def build_extraction(text: str, ner_entities: list) -> ExtractResponse:
+    """Run every field extractor over one text and its NER entities"""
+    # One rule snapshot per text, even if a reload lands mid-extraction
+    rules = rule_store.active
+
+    with stage_timer('extract_companies'):
+        company, company_conf = extract_companies(text, ner_entities, rules)
+    with stage_timer('extract_role_type'):
+        role_type, role_conf = extract_role_type(text, rules)
+    with stage_timer('extract_level'):
+        level, level_conf = extract_level(text)
+    with stage_timer('extract_location'):
+        location, location_conf = extract_location(text, ner_entities, rules)
+    with stage_timer('extract_outcome'):
+        outcome, outcome_conf = extract_outcome(text, rules)
+
+    result = ExtractResponse(
+        company=company,
+        role_type=role_type,
+        level=level,
+        location=location,
+        outcome=outcome,
+        confidence={
+            "company": round(company_conf, 2),
+            "role_type": round(role_conf, 2),
+            "level": round(level_conf, 2),
+            "location": round(location_conf, 2),
+            "outcome": round(outcome_conf, 2)
+        },
+        rules_version=rules.version
+    )
+    record_extraction(result.model_dump())
+    return result
+
+
+def ner_forward(texts: List[str]) -> List[list]:
+    """One batched NER forward pass; returns an entity list per text"""
+    for text in texts:
+        INPUT_LENGTH.observe(len(text))
+
+    with stage_timer('ner_forward' if len(texts) == 1 else 'ner_forward_batch'):
+        return ner_pipeline(texts, batch_size=len(texts))
+
+
+def extract_batch(texts: List[str]) -> List[dict]:
+    """Extract metadata for many texts with a single batched NER forward pass"""
+    return [
+        build_extraction(text, ner_entities).model_dump()
+        for text, ner_entities in zip(texts, ner_forward(texts))
+    ]
+
+
+scheduler = PriorityScheduler(ner_forward, workers=int(os.getenv('NER_INFERENCE_WORKERS', '1')))
+
+
+async def extract_batch_for_job(texts: List[str]) -> List[dict]:
+    """Bulk job extraction at batch priority, waiting out backpressure instead of failing"""
+    # A submission larger than the batch queue could never be admitted
+    step = max(1, MAX_QUEUE[BATCH])
+    entities_per_text = []
+    for start in range(0, len(texts), step):
+        chunk = texts[start:start + step]
+        while True:
+            try:
+                entities_per_text.extend(await scheduler.submit(chunk, BATCH))
+                break
+            except QueueFull as e:
+                await asyncio.sleep(e.retry_after)
+            except DeadlineExceeded:
+                logger.warning(f"Job batch of {len(chunk)} expired in queue, requeueing")
+
+    return [
+        build_extraction(text, ner_entities).model_dump()
+        for text, ner_entities in zip(texts, entities_per_text)
+    ]
+
+
+job_manager = BulkJobManager(extract_batch_for_job)
+
+
+def resolve_priority(field_value: Optional[str], header_value: Optional[str]) -> str:
+    priority = (field_value or header_value or INTERACTIVE).lower()
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"priority must be one of {', '.join(PRIORITIES)}")
+    return priority
+
+
+def resolve_deadline(field_value: Optional[int], header_value: Optional[str]) -> Optional[float]:
+    value = field_value if field_value is not None else header_value
+    if value is None:
+        return None
+    try:
+        return int(value) / 1000.0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="X-Deadline-Ms must be an integer")
+
+
+async def run_scheduled(text: str, priority: str, deadline: Optional[float], response: Response) -> list:
+    """Submit one text to the scheduler, translating queue errors to HTTP responses"""
+    try:
+        entities_per_text = await scheduler.submit([text], priority, deadline)
+    except QueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after), "X-Backpressure": "1"}
+        )
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+    response.headers["X-Queue-Depth"] = str(scheduler.depth[priority])
+    if scheduler.backpressure():
+        response.headers["X-Backpressure"] = "1"
+        response.headers["Retry-After"] = str(scheduler.retry_after(BATCH))
+    return entities_per_text[0]
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the rule watcher and inference scheduler, then resume interrupted jobs"""
+    rule_store.start_watcher()
+    scheduler.start()
+    job_manager.start()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -302,7 +312,8 @@ async def root():
         "service": "RedCube NER Service",
         "status": "healthy",
         "model": "dslim/bert-base-NER",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "rules_version": rule_store.version
     }
 
 
@@ -312,12 +323,19 @@ async def health():
     return {
         "status": "healthy",
         "model_loaded": ner_pipeline is not None,
-        "model_name": "dslim/bert-base-NER"
+        "model_name": "dslim/bert-base-NER",
+        "rules_version": rule_store.version,
+        "rules_error": rule_store.last_error
     }
 
 
 @app.post("/extract-metadata", response_model=ExtractResponse)
-async def extract_metadata(request: ExtractRequest):
+async def extract_metadata(
+    request: ExtractRequest,
+    response: Response,
+    x_priority: Optional[str] = Header(None),
+    x_deadline_ms: Optional[str] = Header(None)
+):
     """
     Extract all metadata from interview post text
 
@@ -328,64 +346,200 @@ async def extract_metadata(request: ExtractRequest):
     - location: Work location (Seattle, Remote, etc.)
     - outcome: Interview outcome (offer, reject, pending)
     - confidence: Confidence scores for each field
+
+    Priority (interactive or batch) and a deadline can be set with the
+    priority/deadline_ms fields or the X-Priority/X-Deadline-Ms headers.
+    Full queues return 429 with Retry-After; expired work returns 504.
+    Responses carry X-Backpressure when batch clients should slow down.
     """
+    REQUESTS.labels(endpoint='extract-metadata').inc()
     try:
         text = request.text
 
         if not text or len(text.strip()) == 0:
             raise HTTPException(status_code=400, detail="Text cannot be empty")
 
-        # Run NER pipeline
-        logger.info(f"Processing text: {text[:100]}...")
-        ner_entities = ner_pipeline(text)
-
-        # Extract each field
-        company, company_conf = extract_companies(text, ner_entities)
-        role_type, role_conf = extract_role_type(text)
-        level, level_conf = extract_level(text)
-        location, location_conf = extract_location(text, ner_entities)
-        outcome, outcome_conf = extract_outcome(text)
-
-        result = ExtractResponse(
-            company=company,
-            role_type=role_type,
-            level=level,
-            location=location,
-            outcome=outcome,
-            confidence={
-                "company": round(company_conf, 2),
-                "role_type": round(role_conf, 2),
-                "level": round(level_conf, 2),
-                "location": round(location_conf, 2),
-                "outcome": round(outcome_conf, 2)
-            }
+        priority = resolve_priority(request.priority, x_priority)
+        deadline = resolve_deadline(request.deadline_ms, x_deadline_ms)
+        started = time.perf_counter()
+
+        # Run NER pipeline through the priority scheduler
+        ner_entities = await run_scheduled(text, priority, deadline, response)
+
+        result = build_extraction(text, ner_entities)
+
+        log_sampled(
+            'extract_metadata',
+            text_length=len(text),
+            priority=priority,
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            rules_version=result.rules_version,
+            company=result.company,
+            role_type=result.role_type,
+            level=result.level,
+            location=result.location,
+            outcome=result.outcome
         )
 
-        logger.info(f"Extracted: company={company}, role={role_type}, level={level}, location={location}, outcome={outcome}")
-
         return result
 
+    except HTTPException:
+        ERRORS.labels(endpoint='extract-metadata').inc()
+        raise
     except Exception as e:
+        ERRORS.labels(endpoint='extract-metadata').inc()
         logger.error(f"Error extracting metadata: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/extract-company")
-async def extract_company_only(request: ExtractRequest):
+async def extract_company_only(
+    request: ExtractRequest,
+    response: Response,
+    x_priority: Optional[str] = Header(None),
+    x_deadline_ms: Optional[str] = Header(None)
+):
     """Extract only company name (faster endpoint)"""
+    REQUESTS.labels(endpoint='extract-company').inc()
     try:
-        ner_entities = ner_pipeline(request.text)
-        company, confidence = extract_companies(request.text, ner_entities)
+        priority = resolve_priority(request.priority, x_priority)
+        deadline = resolve_deadline(request.deadline_ms, x_deadline_ms)
+        ner_entities = await run_scheduled(request.text, priority, deadline, response)
+        with stage_timer('extract_companies'):
+            company, confidence = extract_companies(request.text, ner_entities)
 
         return {
             "company": company,
-            "confidence": round(confidence, 2)
+            "confidence": round(confidence, 2),
+            "rules_version": rule_store.version
         }
+    except HTTPException:
+        ERRORS.labels(endpoint='extract-company').inc()
+        raise
     except Exception as e:
+        ERRORS.labels(endpoint='extract-company').inc()
         logger.error(f"Error extracting company: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    """
+    Start a bulk extraction job over a local JSONL file
+
+    Each input line is a JSON object; text_fields are joined to form the text
+    and id_field is copied to the output record. Results are appended to
+    output_path (default: the job directory) as JSONL.
+    """
+    try:
+        input_path = resolve_input_path(request.input_path)
+        output_path = resolve_output_path(request.output_path, input_path) if request.output_path else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = job_manager.create_job(
+        input_path=input_path,
+        output_path=output_path,
+        text_fields=request.text_fields,
+        id_field=request.id_field,
+        batch_size=request.batch_size
+    )
+    return job.to_dict()
+
+
+@app.post("/jobs/upload", status_code=202)
+async def upload_job(
+    request: Request,
+    text_field: List[str] = Query(default=['text']),
+    id_field: str = 'id',
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=512)
+):
+    """Start a bulk extraction job from a JSONL request body streamed to disk"""
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=str(UploadTooLarge(MAX_UPLOAD_BYTES)))
+
+    try:
+        job_id, input_path = await job_manager.receive_upload(request.stream())
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    job = job_manager.create_job(
+        input_path=input_path,
+        text_fields=text_field,
+        id_field=id_field,
+        batch_size=batch_size,
+        job_id=job_id
+    )
+    return job.to_dict()
+
+
+@app.get("/jobs")
+async def list_jobs():
+    """List bulk extraction jobs, newest first"""
+    return [job.to_dict() for job in job_manager.list_jobs()]
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status and checkpointed progress"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a job; the in-flight batch is finished and checkpointed first"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str):
+    """Download the output JSONL written so far"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not os.path.exists(job.output_path):
+        raise HTTPException(status_code=404, detail="No results yet")
+    return FileResponse(job.output_path, media_type="application/x-ndjson")
+
+
+@app.get("/scheduler")
+async def scheduler_stats():
+    """Queue depths and scheduling settings per priority class"""
+    return {
+        "queues": scheduler.stats(),
+        "backpressure": scheduler.backpressure()
+    }
+
+
+@app.get("/admin/rules")
+async def get_rules():
+    """Active rule table version and table sizes"""
+    summary = rule_store.active.summary()
+    summary["last_error"] = rule_store.last_error
+    return summary
+
+
+@app.post("/admin/rules/reload")
+async def reload_rules():
+    """Recompile the rule file now instead of waiting for the watcher"""
+    loop = asyncio.get_running_loop()
+    try:
+        changed = await loop.run_in_executor(None, rule_store.reload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Rule file rejected: {e}")
+
+    return {
+        "changed": changed,
+        **rule_store.active.summary()
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,90 @@
+"""
+Prometheus metrics and sampled structured logging for the NER service
+"""
+
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Fraction of extractions that emit a structured log line (0 disables, 1 logs all)
+LOG_SAMPLE_RATE = float(os.getenv('NER_LOG_SAMPLE_RATE', '0.01'))
+
+EXTRACTED_FIELDS = ('company', 'role_type', 'level', 'location', 'outcome')
+
+STAGE_SECONDS = Histogram(
+    'ner_stage_duration_seconds',
+    'Time spent in each extraction stage',
+    ['stage'],
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+INPUT_LENGTH = Histogram(
+    'ner_input_length_chars',
+    'Length of input texts in characters',
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+)
+
+QUEUE_WAIT_SECONDS = Histogram(
+    'ner_queue_wait_seconds',
+    'Time between work being queued and inference starting',
+    ['priority'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+REQUESTS = Counter(
+    'ner_requests_total',
+    'Extraction requests handled',
+    ['endpoint']
+)
+
+ERRORS = Counter(
+    'ner_errors_total',
+    'Extraction requests that failed',
+    ['endpoint']
+)
+
+FIELDS_FILLED = Counter(
+    'ner_fields_filled_total',
+    'Extractions that produced a value, per field',
+    ['field']
+)
+
+FIELDS_FILLED_PER_POST = Histogram(
+    'ner_fields_filled_per_post',
+    'Number of fields filled per extraction',
+    buckets=(0, 1, 2, 3, 4, 5)
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time a block and record it in the per-stage histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def record_extraction(result: dict):
+    """Count which fields an extraction filled"""
+    filled = 0
+    for field in EXTRACTED_FIELDS:
+        if result.get(field) is not None:
+            FIELDS_FILLED.labels(field=field).inc()
+            filled += 1
+    FIELDS_FILLED_PER_POST.observe(filled)
+
+
+def log_sampled(event: str, **fields):
+    """Emit one JSON log line for a random sample of events"""
+    if LOG_SAMPLE_RATE <= 0 or random.random() >= LOG_SAMPLE_RATE:
+        return
+    logger.info(json.dumps({'event': event, 'sample_rate': LOG_SAMPLE_RATE, **fields}, default=str))
@@ -0,0 +1,171 @@
+"""
+Extraction rule tables for the NER service
+Loads company, location, role and outcome tables from a data file, compiles
+them into matchers and hot-swaps them when the file changes
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = os.getenv(
+    'NER_RULES_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules', 'extraction_rules.json')
+)
+RULES_POLL_SECONDS = float(os.getenv('NER_RULES_POLL_SECONDS', '30'))
+
+REQUIRED_TABLES = ('companies', 'locations', 'roles', 'outcomes')
+
+
+class CompiledRules:
+    """
+    Immutable, compiled view of one version of the rule tables
+
+    Extractors read a single CompiledRules instance per request, so a reload
+    that lands mid-request never mixes tables from two versions.
+    """
+
+    def __init__(self, tables: Dict[str, Any], version: str, source: str):
+        self.version = version
+        self.source = source
+        self.loaded_at = datetime.utcnow().isoformat()
+
+        # (variant, canonical) pairs in file order; variants are matched as substrings
+        self.company_variants: Tuple[Tuple[str, str], ...] = tuple(
+            (variant.lower(), canonical) for variant, canonical in tables['companies'].items()
+        )
+
+        # First keyword found (in file order) wins, so keep the pairs ordered
+        self.location_keywords: Tuple[Tuple[str, str], ...] = tuple(
+            (keyword.lower(), canonical) for keyword, canonical in tables['locations'].items()
+        )
+
+        # One alternation per role: a role matches if any of its patterns does
+        self.role_matchers: Tuple[Tuple[str, Pattern], ...] = tuple(
+            (role, re.compile('|'.join(f'(?:{p})' for p in patterns)))
+            for role, patterns in tables['roles'].items()
+            if patterns
+        )
+
+        # One alternation of literal keywords per outcome
+        self.outcome_matchers: Tuple[Tuple[str, Pattern], ...] = tuple(
+            (outcome, re.compile('|'.join(re.escape(k.lower()) for k in keywords)))
+            for outcome, keywords in tables['outcomes'].items()
+            if keywords
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'source': self.source,
+            'loaded_at': self.loaded_at,
+            'companies': len(self.company_variants),
+            'locations': len(self.location_keywords),
+            'roles': len(self.role_matchers),
+            'outcomes': len(self.outcome_matchers)
+        }
+
+
+def compile_rules(raw: bytes, source: str) -> CompiledRules:
+    """
+    Parse and compile a rule file
+
+    Raises:
+        ValueError: if the file is not valid JSON, a table is missing, or a
+            role pattern does not compile
+    """
+    try:
+        tables = json.loads(raw)
+    except ValueError as e:
+        raise ValueError(f"Rule file is not valid JSON: {e}")
+
+    missing = [name for name in REQUIRED_TABLES if not isinstance(tables.get(name), dict)]
+    if missing:
+        raise ValueError(f"Rule file is missing tables: {', '.join(missing)}")
+
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    try:
+        return CompiledRules(tables, version, source)
+    except re.error as e:
+        raise ValueError(f"Invalid role pattern: {e}")
+
+
+class RuleStore:
+    """
+    Holds the active CompiledRules and swaps in new versions
+
+    Compilation happens off the request path (watcher thread or admin call);
+    the swap itself is a single reference assignment.
+    """
+
+    def __init__(self, path: str = RULES_PATH):
+        self.path = path
+        self._active: Optional[CompiledRules] = None
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def active(self) -> CompiledRules:
+        return self._active
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._active.version if self._active else None
+
+    def reload(self) -> bool:
+        """
+        Re-read the rule file and swap it in if its content changed
+
+        Returns:
+            True if a new version became active
+        """
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+
+            version = hashlib.sha256(raw).hexdigest()[:12]
+            self._mtime = mtime
+            if self._active is not None and self._active.version == version:
+                return False
+
+            try:
+                compiled = compile_rules(raw, self.path)
+            except ValueError as e:
+                self.last_error = str(e)
+                raise
+
+            previous = self.version
+            self._active = compiled
+            self.last_error = None
+            logger.info(f"📚 Extraction rules {previous or 'none'} -> {compiled.version}")
+            return True
+
+    def start_watcher(self, interval: float = RULES_POLL_SECONDS):
+        """Poll the rule file's mtime in a daemon thread and reload on change"""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), daemon=True, name='rules-watcher')
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                if os.path.getmtime(self.path) != self._mtime:
+                    self.reload()
+            except Exception as e:
+                # Keep serving the previous version when the new file is bad
+                logger.error(f"❌ Rule reload failed, keeping {self.version}: {e}")
@@ -0,0 +1,228 @@
+"""
+Priority scheduling for NER inference
+Interactive and batch traffic wait in separate queues; a weighted scheduler
+feeds one inference executor, drops work whose deadline has passed, and
+reports backpressure so batch clients can slow down
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+from metrics import QUEUE_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Dispatches per scheduling round: 4 interactive batches for every batch-class batch
+WEIGHTS = {
+    INTERACTIVE: int(os.getenv('NER_WEIGHT_INTERACTIVE', '4')),
+    BATCH: int(os.getenv('NER_WEIGHT_BATCH', '1'))
+}
+
+# Hard queue limits (texts); beyond this requests are rejected with 429
+MAX_QUEUE = {
+    INTERACTIVE: int(os.getenv('NER_MAX_QUEUE_INTERACTIVE', '256')),
+    BATCH: int(os.getenv('NER_MAX_QUEUE_BATCH', '2048'))
+}
+
+# Default deadlines when the client does not send one
+DEFAULT_DEADLINE_SECONDS = {
+    INTERACTIVE: float(os.getenv('NER_DEADLINE_INTERACTIVE_SECONDS', '10')),
+    BATCH: float(os.getenv('NER_DEADLINE_BATCH_SECONDS', '300'))
+}
+
+# Texts coalesced into one forward pass
+MAX_BATCH_TEXTS = int(os.getenv('NER_MAX_BATCH_TEXTS', '32'))
+
+# Batch queue fill ratio above which responses ask batch clients to back off
+BACKPRESSURE_RATIO = float(os.getenv('NER_BACKPRESSURE_RATIO', '0.5'))
+
+QUEUE_DEPTH = Gauge('ner_queue_depth', 'Texts waiting for inference', ['priority'])
+DROPPED = Counter('ner_dropped_total', 'Work dropped before inference', ['priority', 'reason'])
+
+
+class QueueFull(Exception):
+    """Raised when a priority class is over its queue limit"""
+
+    def __init__(self, priority: str, retry_after: int):
+        super().__init__(f"{priority} queue is full")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work expired while waiting in the queue"""
+
+
+class WorkItem:
+    def __init__(self, texts: List[str], priority: str, deadline: float, future: asyncio.Future):
+        self.texts = texts
+        self.priority = priority
+        self.deadline = deadline
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class PriorityScheduler:
+    """
+    Weighted scheduler in front of the NER forward pass
+
+    forward receives a list of texts and returns one entity list per text.
+    It runs on a dedicated executor thread so the event loop stays responsive.
+    """
+
+    def __init__(self, forward: Callable[[List[str]], List[list]], workers: int = 1):
+        self.forward = forward
+        self.workers = workers
+        self.queues: Dict[str, Deque[WorkItem]] = {p: deque() for p in PRIORITIES}
+        self.depth: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ner-inference')
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._credits = dict(WEIGHTS)
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, texts: List[str], priority: str = INTERACTIVE,
+                     deadline_seconds: Optional[float] = None) -> List[list]:
+        """
+        Queue texts for inference and wait for their entities
+
+        Texts are queued as work items of at most MAX_BATCH_TEXTS so no single
+        submission can grow a forward pass past the batch limit.
+
+        Raises:
+            ValueError: more texts than the priority class can ever hold
+            QueueFull: the priority class is over its limit
+            DeadlineExceeded: the deadline passed before inference started
+        """
+        if len(texts) > MAX_QUEUE[priority]:
+            raise ValueError(
+                f"{len(texts)} texts exceed the {priority} queue limit of {MAX_QUEUE[priority]}"
+            )
+        if self.depth[priority] + len(texts) > MAX_QUEUE[priority]:
+            DROPPED.labels(priority=priority, reason='queue_full').inc(len(texts))
+            raise QueueFull(priority, self.retry_after(priority))
+
+        budget = deadline_seconds if deadline_seconds is not None else DEFAULT_DEADLINE_SECONDS[priority]
+        deadline = time.monotonic() + budget
+        loop = asyncio.get_running_loop()
+        items = [
+            WorkItem(texts[start:start + MAX_BATCH_TEXTS], priority, deadline, loop.create_future())
+            for start in range(0, len(texts), MAX_BATCH_TEXTS)
+        ]
+
+        self.queues[priority].extend(items)
+        self._set_depth(priority, self.depth[priority] + len(texts))
+        self._wakeup.set()
+
+        try:
+            results = await asyncio.gather(*(item.future for item in items))
+        except BaseException:
+            # Siblings of a failed chunk are skipped by _take once cancelled
+            for item in items:
+                item.future.cancel()
+            raise
+
+        return [entities for chunk in results for entities in chunk]
+
+    def backpressure(self) -> bool:
+        """True when batch clients should slow down"""
+        return self.depth[BATCH] >= MAX_QUEUE[BATCH] * BACKPRESSURE_RATIO
+
+    def retry_after(self, priority: str) -> int:
+        """Rough seconds until the queue drains below its limit"""
+        return max(1, int(self.depth[priority] / max(1, MAX_BATCH_TEXTS)))
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            priority: {
+                'queued_texts': self.depth[priority],
+                'queued_requests': len(self.queues[priority]),
+                'max_queue': MAX_QUEUE[priority],
+                'weight': WEIGHTS[priority],
+                'default_deadline_seconds': DEFAULT_DEADLINE_SECONDS[priority]
+            }
+            for priority in PRIORITIES
+        }
+
+    def _set_depth(self, priority: str, value: int):
+        self.depth[priority] = value
+        QUEUE_DEPTH.labels(priority=priority).set(value)
+
+    def _next_priority(self) -> Optional[str]:
+        """Weighted round robin over non-empty queues"""
+        ready = [p for p in PRIORITIES if self.queues[p]]
+        if not ready:
+            return None
+        if all(self._credits[p] <= 0 for p in ready):
+            self._credits = dict(WEIGHTS)
+        for priority in ready:
+            if self._credits[priority] > 0:
+                self._credits[priority] -= 1
+                return priority
+        return ready[0]
+
+    def _take(self, priority: str) -> List[WorkItem]:
+        """Pop live items of one class until the forward-pass batch is full"""
+        queue = self.queues[priority]
+        taken: List[WorkItem] = []
+        total = 0
+        now = time.monotonic()
+
+        while queue and (not taken or total + len(queue[0].texts) <= MAX_BATCH_TEXTS):
+            item = queue.popleft()
+            self._set_depth(priority, self.depth[priority] - len(item.texts))
+
+            if item.future.done():
+                continue
+            if now > item.deadline:
+                DROPPED.labels(priority=priority, reason='deadline').inc(len(item.texts))
+                item.future.set_exception(DeadlineExceeded("Deadline exceeded before inference"))
+                continue
+
+            QUEUE_WAIT_SECONDS.labels(priority=priority).observe(now - item.enqueued_at)
+            taken.append(item)
+            total += len(item.texts)
+
+        return taken
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            priority = self._next_priority()
+            if priority is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            items = self._take(priority)
+            if not items:
+                continue
+
+            texts = [text for item in items for text in item.texts]
+            try:
+                entities = await loop.run_in_executor(self._executor, self.forward, texts)
+            except Exception as e:
+                for item in items:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+                continue
+
+            offset = 0
+            for item in items:
+                if not item.future.done():
+                    item.future.set_result(entities[offset:offset + len(item.texts)])
+                offset += len(item.texts)
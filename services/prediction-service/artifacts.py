@@ -0,0 +1,328 @@
+"""
+Model artifact store for the prediction service
+Persists trained models as versioned, checksummed bundles so startup can load
+instead of retraining from Postgres
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from scipy import sparse
+
+from features import FEATURE_SCHEMA_VERSION
+from forest_engine import ARRAY_NAMES, load_forest, save_forest
+from models import InterviewSuccessPredictor, SkillGapAnalyzer
+from skill_index import SkillIndex
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = os.getenv('MODEL_ARTIFACT_DIR', '/app/artifacts')
+ARTIFACTS_TO_KEEP = int(os.getenv('MODEL_ARTIFACTS_TO_KEEP', '5'))
+
+# Bump when the bundle layout changes
+# 2: manifest checksums every bundle file (file_sha256), not only the model
+BUNDLE_FORMAT_VERSION = 2
+
+MANIFEST_FILE = 'manifest.json'
+MODEL_FILE = 'model.joblib'
+LATEST_FILE = 'LATEST'
+
+# Feature cache used by incremental training
+FEATURES_FILE = 'features.npy'
+SPARSE_FEATURES_FILE = 'features.npz'
+LABELS_FILE = 'labels.npy'
+POST_IDS_FILE = 'post_ids.npy'
+
+SKILL_INDEX_FILE = 'skill_index.npz'
+
+# Flat-array forest (forest_engine), one .npy per array
+FOREST_DIR = 'forest'
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _bundle_checksums(bundle_dir: str) -> Dict[str, str]:
+    """sha256 of every file in a bundle directory, keyed by path relative to it"""
+    checksums = {}
+    for directory, _, names in os.walk(bundle_dir):
+        for name in names:
+            path = os.path.join(directory, name)
+            checksums[os.path.relpath(path, bundle_dir)] = _sha256(path)
+    return checksums
+
+
+def _write_atomic(path: str, content: str):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ModelArtifactStore:
+    """
+    Directory of model bundles
+
+    Layout:
+        <root>/LATEST                   name of the newest bundle
+        <root>/<version>/manifest.json  feature names, skill frequencies, metrics, sha256 of every other file
+        <root>/<version>/model.joblib   fitted estimator (uncompressed, so numpy arrays can be memory-mapped)
+        <root>/<version>/forest/*.npy   flat-array copy of a forest model (forest_engine)
+        <root>/<version>/skill_index.npz  role x company x skill counts of the skill analyzer
+        <root>/<version>/features.npy   training feature matrix, with labels.npy and post_ids.npy
+                                        (optional; lets the next run train incrementally)
+
+    Bundles are written to a temporary directory and renamed into place, so a
+    reader never sees a half-written bundle.
+    """
+
+    def __init__(self, root: str = ARTIFACT_DIR):
+        self.root = root
+
+    def save(
+        self,
+        predictor: InterviewSuccessPredictor,
+        analyzer: SkillGapAnalyzer,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Write a new bundle and point LATEST at it
+
+        Returns:
+            The bundle manifest
+        """
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.root, prefix='.tmp-')
+
+        try:
+            model_path = os.path.join(tmp_dir, MODEL_FILE)
+            joblib.dump(predictor.model, model_path)
+            model_sha256 = _sha256(model_path)
+
+            feature_cache = self._save_feature_cache(tmp_dir, predictor)
+            flat_forest = save_forest(predictor.flat_forest, os.path.join(tmp_dir, FOREST_DIR)) if predictor.flat_forest else None
+            np.savez(os.path.join(tmp_dir, SKILL_INDEX_FILE), **analyzer.skill_index.to_arrays())
+
+            file_sha256 = _bundle_checksums(tmp_dir)
+
+            created_at = datetime.utcnow()
+            version = f"{created_at.strftime('%Y%m%d%H%M%S')}-{model_sha256[:8]}"
+
+            manifest = {
+                'version': version,
+                'format_version': BUNDLE_FORMAT_VERSION,
+                'feature_schema_version': FEATURE_SCHEMA_VERSION,
+                'created_at': created_at.isoformat(),
+                'model_type': type(predictor.model).__name__,
+                'model_file': MODEL_FILE,
+                'model_sha256': model_sha256,
+                'file_sha256': file_sha256,
+                'flat_forest': flat_forest,
+                'feature_names': predictor.feature_names,
+                'text_features': predictor.text_hashing.config() if predictor.text_hashing else None,
+                'metrics': {
+                    'accuracy': predictor.accuracy,
+                    'training_samples': predictor.training_samples,
+                    'last_trained': predictor.last_trained
+                },
+                'skill_analyzer': {
+                    'skill_frequency': analyzer.skill_frequency,
+                    'training_samples': analyzer.training_samples,
+                    'last_trained': analyzer.last_trained,
+                    'skill_index_file': SKILL_INDEX_FILE
+                },
+                'feature_cache': feature_cache,
+                'model_selection': predictor.model_selection,
+                **(extra or {})
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            os.rename(tmp_dir, os.path.join(self.root, version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        _write_atomic(os.path.join(self.root, LATEST_FILE), version)
+        logger.info(f"💾 Saved model bundle {version}")
+
+        self.prune()
+        return manifest
+
+    def _save_feature_cache(self, bundle_dir: str, predictor: InterviewSuccessPredictor) -> Optional[Dict[str, Any]]:
+        """Write the predictor's training matrix next to the model, if it has one"""
+        if predictor.training_features is None or predictor.training_post_ids is None:
+            return None
+
+        # Matrices with the hashed text block are sparse; those can't be memory-mapped
+        features_file = FEATURES_FILE
+        if sparse.issparse(predictor.training_features):
+            features_file = SPARSE_FEATURES_FILE
+            sparse.save_npz(os.path.join(bundle_dir, features_file), predictor.training_features.tocsr())
+        else:
+            np.save(os.path.join(bundle_dir, features_file), np.ascontiguousarray(predictor.training_features, dtype=np.float32))
+        np.save(os.path.join(bundle_dir, LABELS_FILE), np.asarray(predictor.training_labels, dtype=np.int8))
+        np.save(os.path.join(bundle_dir, POST_IDS_FILE), np.asarray(predictor.training_post_ids, dtype=str))
+
+        return {
+            'features_file': features_file,
+            'labels_file': LABELS_FILE,
+            'post_ids_file': POST_IDS_FILE,
+            'rows': int(len(predictor.training_labels))
+        }
+
+    def load_feature_cache(self, version: str) -> Optional[Tuple[Any, np.ndarray, np.ndarray]]:
+        """
+        Load the training matrix stored with a bundle
+
+        Returns:
+            (features, labels, post_ids), memory-mapped read-only (features
+            are an in-memory CSR matrix when the bundle has the hashed text
+            block), or None if the bundle has no compatible feature cache
+        """
+        manifest = self.read_manifest(version)
+        cache = manifest.get('feature_cache')
+        if not cache or not self.is_compatible(manifest):
+            return None
+
+        self.verify_files(version, manifest, [cache['features_file'], cache['labels_file'], cache['post_ids_file']])
+
+        bundle_dir = os.path.join(self.root, version)
+        features_path = os.path.join(bundle_dir, cache['features_file'])
+        if features_path.endswith('.npz'):
+            features = sparse.load_npz(features_path).tocsr()
+        else:
+            features = np.load(features_path, mmap_mode='r')
+        labels = np.load(os.path.join(bundle_dir, cache['labels_file']), mmap_mode='r')
+        post_ids = np.load(os.path.join(bundle_dir, cache['post_ids_file']))
+        return features, labels, post_ids
+
+    def versions(self) -> List[str]:
+        """Bundle versions, newest first"""
+        if not os.path.isdir(self.root):
+            return []
+        names = [
+            name for name in os.listdir(self.root)
+            if not name.startswith('.') and os.path.isfile(os.path.join(self.root, name, MANIFEST_FILE))
+        ]
+        return sorted(names, reverse=True)
+
+    def latest_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, LATEST_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def read_manifest(self, version: str) -> Dict[str, Any]:
+        with open(os.path.join(self.root, version, MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def is_compatible(self, manifest: Dict[str, Any]) -> bool:
+        return (
+            manifest.get('format_version') == BUNDLE_FORMAT_VERSION and
+            manifest.get('feature_schema_version') == FEATURE_SCHEMA_VERSION
+        )
+
+    def verify_files(self, version: str, manifest: Dict[str, Any], names: List[str]):
+        """
+        Check bundle files against the checksums recorded in the manifest
+
+        Raises:
+            ValueError: if a file has no recorded checksum or does not match it
+        """
+        checksums = manifest.get('file_sha256') or {}
+        for name in names:
+            expected = checksums.get(name)
+            if expected is None or _sha256(os.path.join(self.root, version, name)) != expected:
+                raise ValueError(f"Bundle {version} failed checksum verification ({name})")
+
+    def load(self, version: str) -> Tuple[InterviewSuccessPredictor, SkillGapAnalyzer, Dict[str, Any]]:
+        """
+        Load one bundle, verifying compatibility and checksums
+
+        Every file read here (model, flat forest, skill index) is checked against
+        the manifest; the feature cache is checked by load_feature_cache.
+
+        Raises:
+            ValueError: if the bundle is incompatible or one of its files is corrupt
+        """
+        manifest = self.read_manifest(version)
+        if not self.is_compatible(manifest):
+            raise ValueError(
+                f"Bundle {version} has format {manifest.get('format_version')} / "
+                f"feature schema {manifest.get('feature_schema_version')}"
+            )
+
+        names = [manifest['model_file']]
+        if manifest.get('flat_forest'):
+            names += [os.path.join(manifest['flat_forest']['dir'], f"{name}.npy") for name in ARRAY_NAMES]
+        if manifest['skill_analyzer'].get('skill_index_file'):
+            names.append(manifest['skill_analyzer']['skill_index_file'])
+        self.verify_files(version, manifest, names)
+
+        model_path = os.path.join(self.root, version, manifest['model_file'])
+        model = joblib.load(model_path, mmap_mode='r')
+
+        predictor = InterviewSuccessPredictor()
+        flat_forest = None
+        if manifest.get('flat_forest'):
+            entry = manifest['flat_forest']
+            flat_forest = load_forest(os.path.join(self.root, version, entry['dir']), entry)
+
+        predictor.load_trained(
+            model, manifest['feature_names'], manifest['metrics'], manifest.get('text_features'), flat_forest
+        )
+
+        analyzer = SkillGapAnalyzer()
+        analyzer.load_state(manifest['skill_analyzer'], self.load_skill_index(version, manifest))
+
+        return predictor, analyzer, manifest
+
+    def load_skill_index(self, version: str, manifest: Optional[Dict[str, Any]] = None) -> Optional[SkillIndex]:
+        """The bundle's skill index, or None for bundles written before it existed"""
+        manifest = manifest or self.read_manifest(version)
+        index_file = manifest['skill_analyzer'].get('skill_index_file')
+        if not index_file:
+            return None
+        with np.load(os.path.join(self.root, version, index_file)) as arrays:
+            return SkillIndex.from_arrays(arrays)
+
+    def load_latest(self) -> Optional[Tuple[InterviewSuccessPredictor, SkillGapAnalyzer, Dict[str, Any]]]:
+        """Load the newest compatible, intact bundle (LATEST first), or None if there is none"""
+        candidates = self.versions()
+        latest = self.latest_version()
+        if latest in candidates:
+            candidates.remove(latest)
+            candidates.insert(0, latest)
+
+        for version in candidates:
+            try:
+                return self.load(version)
+            except Exception as e:
+                logger.warning(f"⚠️  Skipping model bundle {version}: {e}")
+
+        return None
+
+    def prune(self, keep: int = ARTIFACTS_TO_KEEP):
+        """Delete all but the newest `keep` bundles (never the one LATEST points at)"""
+        latest = self.latest_version()
+        for version in self.versions()[keep:]:
+            if version != latest:
+                shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
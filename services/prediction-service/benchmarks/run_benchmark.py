@@ -0,0 +1,291 @@
+"""
+Prediction Service Benchmark
+Times data loading, feature extraction, training, skill gap fitting,
+prediction latency and sklearn vs flat-forest scoring against a synthetic scraped_posts table served by a local
+database stand-in (no Postgres needed), and writes the results as JSON so runs
+can be diffed across commits. Each scale runs in its own process so peak RSS
+is per scale.
+
+Usage:
+    python benchmarks/run_benchmark.py --output results.json
+    python benchmarks/run_benchmark.py --scales 10000 100000 1000000 --predictions 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+LEVELS = ['junior', 'mid', 'senior', None]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) in milliseconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+        'p50_ms': round(pick(0.50) * 1000, 4),
+        'p95_ms': round(pick(0.95) * 1000, 4),
+        'p99_ms': round(pick(0.99) * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4)
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 2)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVICE_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def timed(stages: Dict[str, Any], name: str, func: Callable[[], Any], **details) -> Any:
+    """Run one stage, recording wall time and the peak RSS reached so far"""
+    print(f"  ⏱️  {name}...", file=sys.stderr)
+    start = time.perf_counter()
+    result = func()
+    stages[name] = {
+        'seconds': round(time.perf_counter() - start, 4),
+        'peak_rss_mb': peak_rss_mb(),
+        **details
+    }
+    return result
+
+
+def prediction_requests(n: int, seed: int) -> List[Dict[str, Any]]:
+    from standin_db import COMPANIES, ROLES, TECHNOLOGIES
+
+    rng = random.Random(seed)
+    return [
+        {
+            'company': rng.choice(COMPANIES),
+            'role': rng.choice([r for r in ROLES if r]),
+            'experience_level': rng.choice(LEVELS),
+            'interview_topics': rng.sample(TECHNOLOGIES, rng.randint(0, 5)),
+            'preparation_time_weeks': rng.randint(1, 16)
+        }
+        for _ in range(n)
+    ]
+
+
+def measure_predictions(predictor, requests: List[Dict[str, Any]], batch_sizes: List[int]) -> Dict[str, Any]:
+    """Single-request latency through predict() and per-batch latency through predict_batch()"""
+    predictor.predict(**requests[0])
+
+    single = []
+    for request in requests:
+        start = time.perf_counter()
+        predictor.predict(**request)
+        single.append(time.perf_counter() - start)
+
+    batches = {}
+    for batch_size in batch_sizes:
+        chunks = [requests[i:i + batch_size] for i in range(0, len(requests), batch_size)]
+        latencies = []
+        start = time.perf_counter()
+        for chunk in chunks:
+            chunk_start = time.perf_counter()
+            predictor.predict_batch(chunk)
+            latencies.append(time.perf_counter() - chunk_start)
+        elapsed = time.perf_counter() - start
+        batches[str(batch_size)] = {
+            'batch_latency': percentiles(latencies),
+            'predictions_per_second': round(len(requests) / elapsed, 2) if elapsed else None
+        }
+
+    return {'single': percentiles(single), 'batch': batches}
+
+
+def measure_engines(predictor, batch_sizes: List[int], repeats: int) -> Dict[str, Any]:
+    """sklearn predict_proba vs the flat-array forest on training rows, per batch size"""
+    if predictor.flat_forest is None:
+        return {'skipped': f"{type(predictor.model).__name__} is not a forest"}
+
+    X = predictor.training_features
+    results: Dict[str, Any] = {'forest': predictor.flat_forest.describe(), 'batches': {}}
+    for batch_size in batch_sizes:
+        batch = X[:batch_size]
+        timings = {}
+        for name, score in (('sklearn', predictor.model.predict_proba), ('flat_forest', predictor.flat_forest.predict_proba)):
+            score(batch)
+            samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                score(batch)
+                samples.append(time.perf_counter() - start)
+            timings[name] = percentiles(samples)
+
+        difference = np.abs(predictor.model.predict_proba(batch) - predictor.flat_forest.predict_proba(batch)).max()
+        results['batches'][str(batch_size)] = {
+            **timings,
+            'speedup_p50': round(timings['sklearn']['p50_ms'] / timings['flat_forest']['p50_ms'], 2),
+            'max_abs_difference': float(difference)
+        }
+    return results
+
+
+def measure_skill_gap(analyzer, n: int, seed: int) -> Dict[str, Any]:
+    from standin_db import COMPANIES, ROLES, TECHNOLOGIES
+
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(n):
+        skills = rng.sample(TECHNOLOGIES, rng.randint(0, 5))
+        role = rng.choice([r for r in ROLES if r])
+        companies = rng.sample(COMPANIES, rng.randint(0, 3))
+        start = time.perf_counter()
+        analyzer.analyze(skills, role, companies)
+        latencies.append(time.perf_counter() - start)
+    return percentiles(latencies)
+
+
+def run_scale(rows: int, args) -> Dict[str, Any]:
+    """Benchmark one table size in this process"""
+    import database
+    from models import InterviewSuccessPredictor, SkillGapAnalyzer
+    from standin_db import SyntheticPosts, install
+
+    stages: Dict[str, Any] = {}
+    rss_baseline = peak_rss_mb()
+
+    table = timed(stages, 'generate_table', lambda: SyntheticPosts(rows, seed=args.seed))
+    stages['generate_table']['table_mb'] = round(table.nbytes() / 1024 / 1024, 2)
+    install(table)
+
+    df = timed(stages, 'get_training_data', lambda: database.get_training_data(args.min_confidence))
+    stages['get_training_data']['rows'] = len(df)
+
+    streamed = timed(stages, 'iter_training_data', lambda: sum(
+        len(chunk) for chunk in database.iter_training_data(args.min_confidence, chunk_size=args.chunk_size)
+    ))
+    stages['iter_training_data']['rows'] = streamed
+
+    predictor = InterviewSuccessPredictor()
+    X = timed(stages, 'extract_features', lambda: predictor._extract_features(df))
+    stages['extract_features']['shape'] = list(X.shape)
+    del X
+
+    training = timed(stages, 'train', lambda: predictor.train(df))
+    stages['train']['accuracy'] = training.get('accuracy') if isinstance(training, dict) else None
+    stages['train']['model'] = type(predictor.model).__name__
+
+    # What an incremental retrain pays: refit the selected model without a sweep
+    retrained = InterviewSuccessPredictor()
+    timed(stages, 'retrain_incremental', lambda: retrained.train_features(
+        predictor.training_features, predictor.training_labels, predictor.feature_names,
+        previous_selection=predictor.model_selection or {}
+    ))
+    stages['retrain_incremental']['model'] = type(retrained.model).__name__
+
+    analyzer = SkillGapAnalyzer()
+    timed(stages, 'skill_gap_fit', lambda: analyzer.fit(df))
+    del df
+
+    requests = prediction_requests(args.predictions, args.seed)
+    predictions = timed(stages, 'predictions', lambda: measure_predictions(predictor, requests, args.batch_sizes))
+    engines = timed(stages, 'inference_engines', lambda: measure_engines(predictor, args.batch_sizes, args.engine_repeats))
+    skill_gap = timed(stages, 'skill_gap_analyze', lambda: measure_skill_gap(analyzer, args.skill_gap_queries, args.seed))
+
+    return {
+        'rows': rows,
+        'stages': stages,
+        'prediction_latency': predictions,
+        'inference_engines': engines,
+        'skill_gap_latency': skill_gap,
+        'memory': {
+            'peak_rss_mb_baseline': rss_baseline,
+            'peak_rss_mb': peak_rss_mb()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the prediction service against a synthetic database")
+    parser.add_argument('--scales', type=int, nargs='+', default=[10000, 100000], help="scraped_posts row counts")
+    parser.add_argument('--min-confidence', type=float, default=0.5)
+    parser.add_argument('--chunk-size', type=int, default=5000, help="iter_training_data chunk size")
+    parser.add_argument('--predictions', type=int, default=1000, help="Requests for prediction latency")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 256])
+    parser.add_argument('--skill-gap-queries', type=int, default=500)
+    parser.add_argument('--engine-repeats', type=int, default=200, help="Timed calls per engine and batch size")
+    parser.add_argument('--sweep', action='store_true', help="Run the model selection sweep while training")
+    parser.add_argument('--text-hashing', action='store_true', help="Train with the hashed text feature block")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--single-scale', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    if args.single_scale:
+        print(json.dumps(run_scale(args.single_scale, args)))
+        return
+
+    # One process per scale so peak RSS is not carried over between scales
+    env = {
+        **os.environ,
+        'MODEL_SWEEP_ENABLED': 'true' if args.sweep else 'false',
+        'TEXT_HASHING_ENABLED': 'true' if args.text_hashing else 'false'
+    }
+    forwarded = [
+        '--min-confidence', str(args.min_confidence), '--chunk-size', str(args.chunk_size),
+        '--predictions', str(args.predictions), '--skill-gap-queries', str(args.skill_gap_queries),
+        '--engine-repeats', str(args.engine_repeats),
+        '--seed', str(args.seed), '--batch-sizes', *map(str, args.batch_sizes)
+    ]
+
+    scales = []
+    for rows in args.scales:
+        print(f"📊 Benchmarking {rows} rows...", file=sys.stderr)
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__), '--single-scale', str(rows), *forwarded],
+            cwd=SERVICE_DIR, env=env
+        )
+        scales.append(json.loads(output.decode().strip().splitlines()[-1]))
+
+    results = {
+        'benchmark': 'prediction-service',
+        'timestamp': datetime.utcnow().isoformat(),
+        'git_commit': git_commit(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('single_scale', 'output')},
+        'scales': scales
+    }
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(payload + "\n")
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
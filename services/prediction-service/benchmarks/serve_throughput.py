@@ -0,0 +1,228 @@
+"""
+Prediction Service multi-worker throughput benchmark
+Trains a bundle on synthetic posts, starts serve.py with each worker count,
+drives concurrent prediction and skill gap requests, and writes req/s and
+latency percentiles per worker count as JSON
+
+Usage:
+    python benchmarks/serve_throughput.py --output throughput.json
+    python benchmarks/serve_throughput.py --workers 1 2 4 8 --concurrency 32 --requests 4000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+COMPANIES = ['Google', 'Meta', 'Amazon', 'Stripe', 'Microsoft', 'Uber']
+ROLES = ['SWE', 'Data Scientist', 'Backend', 'ML Engineer', 'Product Manager']
+TECHNOLOGIES = ['Python', 'Java', 'Go', 'SQL', 'React', 'Kubernetes', 'System Design', 'AWS', 'Spark', 'C++']
+LEVELS = ['junior', 'mid', 'senior']
+POSITIVE_TEXT = "Got the offer after the onsite, the coding rounds went well and the team matched quickly."
+NEGATIVE_TEXT = "Rejected after the final round, struggled with the system design question and got ghosted."
+
+
+def build_bundle(artifact_dir: str, posts: int, seed: int = 42) -> str:
+    """Train both models on synthetic posts and save a bundle; returns its version"""
+    import pandas as pd
+    from artifacts import ModelArtifactStore
+    from models import InterviewSuccessPredictor, SkillGapAnalyzer
+
+    rng = random.Random(seed)
+    rows = []
+    for i in range(posts):
+        positive = rng.random() < 0.5
+        technologies = rng.sample(TECHNOLOGIES, rng.randint(1, 4))
+        company = rng.choice(COMPANIES)
+        text = f"{POSITIVE_TEXT if positive else NEGATIVE_TEXT} {company} {' '.join(technologies)}"
+        rows.append({
+            'post_id': f'bench-{i}',
+            'body_text': text,
+            'potential_outcome': 'positive' if positive else 'negative',
+            'word_count': len(text.split()),
+            'role_type': rng.choice(ROLES),
+            'company_count': 1,
+            'companies': [company],
+            'technologies': technologies,
+            'technology_count': len(technologies),
+            'metadata': {'company': company, 'technologies': technologies}
+        })
+    df = pd.DataFrame(rows)
+
+    predictor = InterviewSuccessPredictor()
+    predictor.train(df)
+    analyzer = SkillGapAnalyzer()
+    analyzer.fit(df)
+
+    manifest = ModelArtifactStore(artifact_dir).save(predictor, analyzer, extra={'training_mode': 'benchmark'})
+    return manifest['version']
+
+
+def random_request(rng: random.Random) -> tuple:
+    """(path, JSON body) for a prediction or skill gap request"""
+    if rng.random() < 0.7:
+        return '/api/predict/interview-success', {
+            'company': rng.choice(COMPANIES),
+            'role': rng.choice(ROLES),
+            'experience_level': rng.choice(LEVELS),
+            'interview_topics': rng.sample(TECHNOLOGIES, rng.randint(0, 4)),
+            'preparation_time_weeks': rng.randint(1, 16)
+        }
+    return '/api/analyze/skill-gap', {
+        'user_skills': rng.sample(TECHNOLOGIES, rng.randint(0, 4)),
+        'target_role': rng.choice(ROLES),
+        'target_companies': rng.sample(COMPANIES, rng.randint(0, 2))
+    }
+
+
+def post_json(base_url: str, path: str, body: Dict[str, Any], timeout: float = 30.0) -> float:
+    """Send one request and return its latency in milliseconds"""
+    data = json.dumps(body).encode()
+    request = urllib.request.Request(base_url + path, data=data, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def wait_healthy(base_url: str, process: subprocess.Popen, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"serve.py exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + '/health', timeout=2) as response:
+                if json.loads(response.read()).get('bundle_version'):
+                    return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Service at {base_url} not healthy after {timeout}s")
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def bench_workers(workers: int, artifact_dir: str, port: int, requests: int, concurrency: int, seed: int) -> Dict[str, Any]:
+    """Start serve.py with `workers` workers and drive it with `concurrency` clients"""
+    env = {
+        **os.environ,
+        'MODEL_ARTIFACT_DIR': artifact_dir,
+        # Measure model serving, not the response cache
+        'RESPONSE_CACHE_TTL_SECONDS': '0',
+        'PYTHONUNBUFFERED': '1'
+    }
+    base_url = f'http://127.0.0.1:{port}'
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SERVICE_DIR, 'serve.py'), '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning'],
+        cwd=SERVICE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_healthy(base_url, process)
+
+        rng = random.Random(seed)
+        payloads = [random_request(rng) for _ in range(requests)]
+
+        # Warm up every worker before timing
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda p: post_json(base_url, *p), payloads[:min(len(payloads), concurrency * 4)]))
+
+        errors = 0
+        latencies: List[float] = []
+
+        def send(payload):
+            nonlocal errors
+            try:
+                latencies.append(post_json(base_url, *payload))
+            except Exception:
+                errors += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(send, payloads))
+        elapsed = time.perf_counter() - started
+
+        return {
+            'workers': workers,
+            'requests': requests,
+            'concurrency': concurrency,
+            'errors': errors,
+            'seconds': round(elapsed, 3),
+            'requests_per_second': round(len(latencies) / elapsed, 1),
+            'latency_ms': {
+                'mean': round(statistics.mean(latencies), 2),
+                'p50': round(percentile(latencies, 0.5), 2),
+                'p95': round(percentile(latencies, 0.95), 2),
+                'p99': round(percentile(latencies, 0.99), 2)
+            } if latencies else None
+        }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prediction service multi-worker throughput benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--posts', type=int, default=2000, help='Synthetic posts to train the bundle on')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results JSON here (stdout otherwise)')
+    args = parser.parse_args()
+
+    artifact_dir = tempfile.mkdtemp(prefix='prediction-bench-')
+    try:
+        version = build_bundle(artifact_dir, args.posts, args.seed)
+        runs = [
+            bench_workers(workers, artifact_dir, args.port, args.requests, args.concurrency, args.seed)
+            for workers in args.workers
+        ]
+    finally:
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+
+    baseline = runs[0]['requests_per_second'] if runs and runs[0]['requests_per_second'] else None
+    for run in runs:
+        run['speedup'] = round(run['requests_per_second'] / baseline, 2) if baseline else None
+
+    results = {
+        'benchmark': 'prediction-service-serve-throughput',
+        'generated_at': datetime.utcnow().isoformat(),
+        'cpu_count': os.cpu_count(),
+        'bundle_version': version,
+        'posts': args.posts,
+        'runs': runs
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"Results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
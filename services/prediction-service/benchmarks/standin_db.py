@@ -0,0 +1,233 @@
+"""
+Local stand-in for the prediction service's Postgres connection
+Serves a synthetic scraped_posts table through the subset of the psycopg2
+connection/cursor API that database.py uses, so the real query helpers run
+unchanged without a live database.
+
+The table is stored column-wise as small integer codes (a few bytes per
+row) and rows are rendered when fetched, so a 1M-row table costs little
+memory until a helper materializes it.
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+import database
+
+COMPANIES = ['Google', 'Meta', 'Amazon', 'Microsoft', 'Apple', 'Netflix', 'Stripe', 'Uber', 'Airbnb', 'Citadel', 'Snowflake', 'Datadog']
+ROLES = ['SWE', 'Data Scientist', 'Product Manager', 'Data Engineer', 'ML Engineer', 'DevOps', 'Frontend', 'Backend', None]
+TECHNOLOGIES = [
+    'Python', 'Java', 'Go', 'SQL', 'React', 'Kubernetes', 'AWS', 'System Design', 'Spark', 'C++',
+    'TypeScript', 'Docker', 'Kafka', 'PyTorch', 'Redis', 'GraphQL', 'Terraform'
+]
+OUTCOMES = ['positive', 'negative', 'unknown']
+OUTCOME_SENTENCES = [
+    'Got the offer and accepted it, so the prep clearly paid off.',
+    'Rejected after the onsite, I failed the system design round.',
+    'Still waiting to hear back from the recruiter.'
+]
+# Used instead of the outcome sentence for posts that don't state it, so the
+# labels are not perfectly predictable from the text
+UNSTATED_OUTCOME = 'Sharing my experience for anyone preparing.'
+FILLER = [
+    "The first round was a phone screen with two medium coding questions.",
+    "Onsite had system design, two coding rounds and a behavioral interview.",
+    "I prepared for about six weeks using mock interviews and past questions.",
+    "The interviewers asked about trade-offs in my previous projects.",
+    "Recruiter communication was quick and the process took three weeks overall.",
+    "The hiring manager focused on ownership and cross-team impact.",
+    "One interviewer seemed distracted but the rest were friendly.",
+    "Team matching took longer than the interviews themselves."
+]
+
+# Columns of database.get_training_data's SELECT
+LEGACY_COLUMNS = [
+    'post_id', 'title', 'body_text', 'potential_outcome', 'confidence_score',
+    'subreddit', 'metadata', 'word_count', 'created_at', 'scraped_at'
+]
+
+BASE_TIME = datetime(2025, 1, 1)
+
+
+class SyntheticPosts:
+    """
+    Synthetic scraped_posts table
+
+    Row i was scraped i seconds before BASE_TIME, so index order is the
+    ORDER BY scraped_at DESC order the training queries use.
+    """
+
+    def __init__(self, n_rows: int, seed: int = 42, unlabelled_fraction: float = 0.1, stated_fraction: float = 0.7):
+        rng = np.random.default_rng(seed)
+        labelled = (1 - unlabelled_fraction) / 2
+
+        self.n_rows = n_rows
+        self.company = rng.integers(0, len(COMPANIES), n_rows, dtype=np.int16)
+        self.role = rng.integers(0, len(ROLES), n_rows, dtype=np.int16)
+        self.outcome = rng.choice(3, n_rows, p=[labelled, labelled, unlabelled_fraction]).astype(np.int8)
+        self.outcome_stated = rng.random(n_rows) < stated_fraction
+        self.confidence = (0.3 + 0.7 * rng.random(n_rows)).astype(np.float32)
+        self.tech_start = rng.integers(0, len(TECHNOLOGIES), n_rows, dtype=np.int16)
+        self.tech_count = rng.integers(0, 5, n_rows, dtype=np.int8)
+        self.filler_start = rng.integers(0, len(FILLER), n_rows, dtype=np.int16)
+        self.filler_count = rng.integers(1, 12, n_rows, dtype=np.int8)
+
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in (
+            'company', 'role', 'outcome', 'outcome_stated', 'confidence', 'tech_start', 'tech_count', 'filler_start', 'filler_count'
+        ))
+
+    def select(self, min_confidence: float, since: Optional[Any] = None) -> np.ndarray:
+        """Row indices matching the training WHERE clause, in scraped_at DESC order"""
+        mask = (self.outcome < 2) & (self.confidence >= min_confidence)
+        if since is not None:
+            since_at = since if isinstance(since, datetime) else datetime.fromisoformat(str(since))
+            newer_than = int((BASE_TIME - since_at).total_seconds())
+            mask[max(0, newer_than):] = False
+        return np.flatnonzero(mask)
+
+    def _technologies(self, i: int) -> List[str]:
+        # Stride 3 is coprime with len(TECHNOLOGIES), so picks are distinct
+        start = int(self.tech_start[i])
+        return [TECHNOLOGIES[(start + 3 * k) % len(TECHNOLOGIES)] for k in range(int(self.tech_count[i]))]
+
+    def _body(self, i: int, company: str, role: Optional[str], technologies: List[str]) -> str:
+        start = int(self.filler_start[i])
+        filler = ' '.join(FILLER[(start + k) % len(FILLER)] for k in range(int(self.filler_count[i])))
+        role_text = f" for a {role.lower()} role" if role else ''
+        topics = f" Topics: {', '.join(technologies)}." if technologies else ''
+        outcome = OUTCOME_SENTENCES[self.outcome[i]] if self.outcome_stated[i] else UNSTATED_OUTCOME
+        return f"{company} interview{role_text}. {filler}{topics} {outcome}"
+
+    def row(self, i: int, columns: Sequence[str]) -> tuple:
+        """One row rendered as psycopg2 would return it"""
+        company = COMPANIES[self.company[i]]
+        role = ROLES[self.role[i]]
+        technologies = self._technologies(i)
+        body = self._body(i, company, role, technologies)
+        scraped_at = BASE_TIME - timedelta(seconds=int(i))
+
+        values = {
+            'post_id': f"synthetic_{i:08d}",
+            'title': f"{company} {role or 'interview'} experience",
+            'body_text': body,
+            'potential_outcome': OUTCOMES[self.outcome[i]],
+            'confidence_score': float(self.confidence[i]),
+            'subreddit': 'cscareerquestions',
+            'metadata': {'company': company, 'companies': [company], 'technologies': technologies},
+            'word_count': len(body.split()),
+            'created_at': scraped_at,
+            'scraped_at': scraped_at,
+            'role_type': role,
+            'company_count': 1,
+            'companies': [company],
+            'technologies': technologies
+        }
+        return tuple(values[c] for c in columns)
+
+
+class StandInCursor:
+    """Cursor answering the training queries from a SyntheticPosts table"""
+
+    def __init__(self, table: SyntheticPosts, name: Optional[str] = None):
+        self.table = table
+        self.name = name
+        self.itersize = 2000
+        self.description = None
+        self._columns: List[str] = []
+        self._indices = np.empty(0, dtype=np.int64)
+        self._position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, query: str, params: Optional[Sequence[Any]] = None):
+        sql = ' '.join(query.split())
+        params = list(params or [])
+        self._position = 0
+
+        if sql == 'SELECT 1':
+            self._columns = ['?column?']
+            self._indices = np.array([-1])
+        elif 'FROM scraped_posts' in sql and 'company_count' in sql:
+            self._columns = list(database.TRAINING_COLUMNS)
+            self._indices = self.table.select(*params)
+        elif 'FROM scraped_posts' in sql and re.search(r'\bconfidence_score,', sql):
+            self._columns = LEGACY_COLUMNS
+            self._indices = self.table.select(*params)
+        else:
+            raise NotImplementedError(f"Stand-in database cannot answer: {sql[:120]}")
+
+        self.description = [(c, None, None, None, None, None, None) for c in self._columns]
+
+    def _render(self, indices: np.ndarray) -> List[tuple]:
+        if self._columns == ['?column?']:
+            return [(1,)]
+        return [self.table.row(int(i), self._columns) for i in indices]
+
+    def fetchmany(self, size: Optional[int] = None) -> List[tuple]:
+        size = size or self.itersize
+        chunk = self._indices[self._position:self._position + size]
+        self._position += len(chunk)
+        return self._render(chunk)
+
+    def fetchall(self) -> List[tuple]:
+        chunk = self._indices[self._position:]
+        self._position = len(self._indices)
+        return self._render(chunk)
+
+    def fetchone(self) -> Optional[tuple]:
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        self._indices = np.empty(0, dtype=np.int64)
+
+
+class StandInConnection:
+    def __init__(self, table: SyntheticPosts):
+        self.table = table
+
+    def cursor(self, name: Optional[str] = None, **kwargs) -> StandInCursor:
+        return StandInCursor(self.table, name)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StandInPool:
+    """Drop-in for database.pool"""
+
+    def __init__(self, table: SyntheticPosts):
+        self.table = table
+        self.borrowed = 0
+
+    @contextmanager
+    def connection(self):
+        self.borrowed += 1
+        yield StandInConnection(self.table)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'stand_in': True, 'rows': self.table.n_rows, 'borrowed': self.borrowed}
+
+    def close(self):
+        pass
+
+
+def install(table: SyntheticPosts) -> StandInPool:
+    """Route every database.db_connection() to the stand-in table"""
+    database.pool = StandInPool(table)
+    return database.pool
@@ -1,41 +1,259 @@
 """
 Database utilities for prediction service
-Connects to PostgreSQL and loads training data from scraped_posts table
+Connects to PostgreSQL through a connection pool and loads training data from
+scraped_posts table
 """
 
 import psycopg2
+import psycopg2.errors
+import psycopg2.pool
 import pandas as pd
 import os
-from typing import Optional
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+import asyncio
 import logging
+import threading
+import time
+import uuid
+
+from metrics import record_fallback, stage_timer
 
 logger = logging.getLogger(__name__)
 
+# Connection pool settings
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '10'))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv('DB_POOL_TIMEOUT_SECONDS', '10'))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+
+# Idle connections older than this are pinged before being handed out
+DB_HEALTH_CHECK_IDLE_SECONDS = float(os.getenv('DB_HEALTH_CHECK_IDLE_SECONDS', '30'))
+
+# Rows fetched per round trip by the streaming training loader
+TRAINING_FETCH_SIZE = int(os.getenv('TRAINING_FETCH_SIZE', '2000'))
+
+# Only the columns training needs: metadata is reduced to company and
+# technology lists in SQL so the JSON blob never leaves the database
+TRAINING_COLUMNS = [
+    'post_id', 'body_text', 'potential_outcome', 'word_count', 'scraped_at',
+    'role_type', 'company_count', 'companies', 'technologies'
+]
+
+def _connection_kwargs() -> Dict[str, Any]:
+    return {
+        'host': os.getenv('DB_HOST', 'postgres'),
+        'port': os.getenv('DB_PORT', '5432'),
+        'database': os.getenv('DB_NAME', 'redcube_content'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', 'postgres'),
+        'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT_SECONDS', '5')),
+        # Every statement on every connection is bounded server-side
+        'options': f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    }
+
+
 def get_db_connection():
-    """Create PostgreSQL database connection"""
-    return psycopg2.connect(
-        host=os.getenv('DB_HOST', 'postgres'),
-        port=os.getenv('DB_PORT', '5432'),
-        database=os.getenv('DB_NAME', 'redcube_content'),
-        user=os.getenv('DB_USER', 'postgres'),
-        password=os.getenv('DB_PASSWORD', 'postgres')
-    )
+    """Create a standalone PostgreSQL connection (prefer db_connection() for pooled access)"""
+    return psycopg2.connect(**_connection_kwargs())
+
+
+class PoolTimeout(Exception):
+    """No pooled connection became free within DB_POOL_TIMEOUT_SECONDS"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool
+
+    Wraps psycopg2's ThreadedConnectionPool with a semaphore, so callers wait
+    for a free connection (up to timeout) instead of failing when all maxconn
+    are in use. Connections idle longer than DB_HEALTH_CHECK_IDLE_SECONDS are
+    pinged before use and replaced if dead. The pool is created lazily and
+    per process, so forked or spawned workers never share sockets.
+    """
+
+    def __init__(self, minconn: int = DB_POOL_MIN, maxconn: int = DB_POOL_MAX, timeout: float = DB_POOL_TIMEOUT_SECONDS):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self._pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used: Dict[int, float] = {}
+
+        self.in_use = 0
+        self.acquired_total = 0
+        self.timeouts_total = 0
+        self.health_check_failures_total = 0
+        self.wait_seconds_total = 0.0
+
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = psycopg2.pool.ThreadedConnectionPool(self.minconn, self.maxconn, **_connection_kwargs())
+                self._pid = os.getpid()
+                self._slots = threading.BoundedSemaphore(self.maxconn)
+                self._last_used.clear()
+                self.in_use = 0
+                logger.info(f"🔌 Database pool created (min={self.minconn}, max={self.maxconn})")
+            return self._pool
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < DB_HEALTH_CHECK_IDLE_SECONDS:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self, pool: psycopg2.pool.ThreadedConnectionPool):
+        conn = pool.getconn()
+        if not self._is_healthy(conn):
+            with self._stats_lock:
+                self.health_check_failures_total += 1
+            logger.warning("⚠️  Replacing dead pooled database connection")
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a with block
+
+        Commits when the block succeeds and rolls back when it raises.
+        Connections broken mid-use are discarded instead of being returned.
+
+        Raises:
+            PoolTimeout: if no connection frees up within the pool timeout
+        """
+        pool = self._get_pool()
+        slots = self._slots
+
+        wait_start = time.monotonic()
+        if not slots.acquire(timeout=self.timeout):
+            with self._stats_lock:
+                self.timeouts_total += 1
+            raise PoolTimeout(f"No database connection available within {self.timeout}s")
+
+        conn = None
+        try:
+            conn = self._checkout(pool)
+            with self._stats_lock:
+                self.wait_seconds_total += time.monotonic() - wait_start
+                self.in_use += 1
+                self.acquired_total += 1
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+        finally:
+            if conn is not None:
+                with self._stats_lock:
+                    self.in_use -= 1
+                self._last_used[id(conn)] = time.monotonic()
+                pool.putconn(conn, close=bool(conn.closed))
+            slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilisation counters"""
+        open_connections = 0
+        if self._pool is not None and self._pid == os.getpid():
+            open_connections = len(self._pool._pool) + len(self._pool._used)
+        return {
+            'min_size': self.minconn,
+            'max_size': self.maxconn,
+            'open': open_connections,
+            'in_use': self.in_use,
+            'acquired_total': self.acquired_total,
+            'timeouts_total': self.timeouts_total,
+            'health_check_failures_total': self.health_check_failures_total,
+            'wait_seconds_total': round(self.wait_seconds_total, 6),
+            'statement_timeout_ms': DB_STATEMENT_TIMEOUT_MS
+        }
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+
+
+# Process-wide pool
+pool = ConnectionPool()
+
+
+def db_connection():
+    """Borrow a pooled connection: `with db_connection() as conn: ...`"""
+    return pool.connection()
+
+
+async def run_db(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking database helper on a worker thread so handlers can await it"""
+    with stage_timer(f"db_{func.__name__}"):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+def ping() -> bool:
+    """Check that the database answers"""
+    try:
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        return True
+    except Exception as e:
+        logger.error(f"Database ping failed: {str(e)}")
+        return False
+
+
+async def ping_async() -> bool:
+    return await run_db(ping)
+
 
+async def get_scraped_posts_count_async() -> dict:
+    return await run_db(get_scraped_posts_count)
 
-def get_training_data(min_confidence: float = 0.5) -> Optional[pd.DataFrame]:
+
+async def get_skill_frequency_data_async(min_total: int = 1, limit: Optional[int] = None) -> pd.DataFrame:
+    return await run_db(get_skill_frequency_data, min_total, limit)
+
+
+async def refresh_skill_frequency_summary_async() -> int:
+    return await run_db(refresh_skill_frequency_summary)
+
+
+def get_training_data(min_confidence: float = 0.5, since: Optional[str] = None) -> Optional[pd.DataFrame]:
     """
     Load training data from scraped_posts table
 
     Args:
         min_confidence: Minimum confidence score for including posts
+        since: Only load posts scraped after this timestamp (the watermark of
+            the previous training run); loads everything when omitted
 
     Returns:
         DataFrame with training data or None if no data available
     """
     try:
-        conn = get_db_connection()
+        params = [min_confidence]
+        since_clause = ""
+        if since:
+            since_clause = "AND scraped_at > %s"
+            params.append(since)
 
-        query = """
+        query = f"""
             SELECT
                 post_id,
                 title,
@@ -50,17 +268,21 @@ def get_training_data(min_confidence: float = 0.5) -> Optional[pd.DataFrame]:
             FROM scraped_posts
             WHERE potential_outcome IN ('positive', 'negative')
               AND confidence_score >= %s
+              {since_clause}
             ORDER BY scraped_at DESC
         """
 
-        df = pd.read_sql_query(query, conn, params=(min_confidence,))
-        conn.close()
+        with db_connection() as conn:
+            df = pd.read_sql_query(query, conn, params=tuple(params))
 
         if len(df) == 0:
-            logger.warning("No training data found in database")
+            if since:
+                logger.info(f"No new training data since {since}")
+            else:
+                logger.warning("No training data found in database")
             return None
 
-        logger.info(f"Loaded {len(df)} training samples")
+        logger.info(f"Loaded {len(df)} training samples" + (f" scraped after {since}" if since else ""))
         logger.info(f"Distribution: {df['potential_outcome'].value_counts().to_dict()}")
 
         # Parse JSON metadata if it exists
@@ -74,23 +296,99 @@ def get_training_data(min_confidence: float = 0.5) -> Optional[pd.DataFrame]:
         return None
 
 
+def iter_training_data(
+    min_confidence: float = 0.5,
+    since: Optional[str] = None,
+    chunk_size: int = TRAINING_FETCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream training data from scraped_posts in typed chunks
+
+    Uses a server-side (named) cursor, so at most chunk_size rows are held in
+    memory at a time regardless of table size.
+
+    Args:
+        min_confidence: Minimum confidence score for including posts
+        since: Only load posts scraped after this timestamp
+        chunk_size: Rows per chunk (also the cursor fetch size)
+
+    Yields:
+        DataFrames with TRAINING_COLUMNS plus technology_count
+    """
+    params = [min_confidence]
+    since_clause = ""
+    if since:
+        since_clause = "AND scraped_at > %s"
+        params.append(since)
+
+    query = f"""
+        SELECT
+            post_id,
+            body_text,
+            potential_outcome,
+            word_count,
+            scraped_at,
+            role_type,
+            CASE WHEN jsonb_typeof(metadata->'companies') = 'array'
+                 THEN jsonb_array_length(metadata->'companies') ELSE 0 END AS company_count,
+            CASE WHEN jsonb_typeof(metadata->'companies') = 'array' THEN metadata->'companies'
+                 WHEN metadata->>'company' IS NOT NULL THEN jsonb_build_array(metadata->>'company')
+                 ELSE '[]'::jsonb END AS companies,
+            CASE WHEN jsonb_typeof(metadata->'technologies') = 'array'
+                 THEN metadata->'technologies' ELSE '[]'::jsonb END AS technologies
+        FROM scraped_posts
+        WHERE potential_outcome IN ('positive', 'negative')
+          AND confidence_score >= %s
+          {since_clause}
+        ORDER BY scraped_at DESC
+    """
+
+    with db_connection() as conn:
+        # Named cursors must run inside a transaction; it is read-only here
+        with conn.cursor(name=f"training_{uuid.uuid4().hex[:8]}") as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(query, tuple(params))
+
+            total = 0
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                total += len(rows)
+                yield _typed_training_chunk(rows)
+
+        logger.info(f"Streamed {total} training samples" + (f" scraped after {since}" if since else ""))
+
+
+def _typed_training_chunk(rows: list) -> pd.DataFrame:
+    """Build a compactly typed DataFrame from training rows"""
+    df = pd.DataFrame.from_records(rows, columns=TRAINING_COLUMNS)
+    df['post_id'] = df['post_id'].astype(str)
+    df['potential_outcome'] = df['potential_outcome'].astype('category')
+    df['word_count'] = pd.to_numeric(df['word_count'], errors='coerce').fillna(0).astype('int32')
+    df['scraped_at'] = pd.to_datetime(df['scraped_at'])
+    df['company_count'] = df['company_count'].fillna(0).astype('int16')
+    df['companies'] = df['companies'].apply(lambda x: x if isinstance(x, list) else [])
+    df['technologies'] = df['technologies'].apply(lambda x: x if isinstance(x, list) else [])
+    df['technology_count'] = df['technologies'].str.len().astype('int16')
+    return df
+
+
 def get_scraped_posts_count() -> dict:
     """Get count of scraped posts by outcome"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT
+                        potential_outcome,
+                        COUNT(*) as count,
+                        AVG(confidence_score) as avg_confidence
+                    FROM scraped_posts
+                    GROUP BY potential_outcome
+                """)
 
-        cursor.execute("""
-            SELECT
-                potential_outcome,
-                COUNT(*) as count,
-                AVG(confidence_score) as avg_confidence
-            FROM scraped_posts
-            GROUP BY potential_outcome
-        """)
-
-        results = cursor.fetchall()
-        conn.close()
+                results = cursor.fetchall()
 
         return {
             row[0]: {
@@ -105,51 +403,87 @@ def get_scraped_posts_count() -> dict:
         return {}
 
 
-def get_skill_frequency_data() -> pd.DataFrame:
+SKILL_FREQUENCY_COLUMNS = ['skill', 'positive', 'negative', 'total', 'success_rate']
+
+# Reads the incrementally maintained summary (migration 44)
+SKILL_SUMMARY_QUERY = """
+    SELECT
+        skill,
+        positive_count AS positive,
+        negative_count AS negative,
+        total,
+        positive_count::float / total AS success_rate
+    FROM skill_frequency_summary
+    WHERE total >= %s
+    ORDER BY total DESC, skill
+    LIMIT %s
+"""
+
+# Same aggregate computed directly, for databases without the summary tables
+SKILL_AGGREGATE_QUERY = """
+    SELECT
+        lower(t.skill) AS skill,
+        COUNT(*) FILTER (WHERE p.potential_outcome = 'positive') AS positive,
+        COUNT(*) FILTER (WHERE p.potential_outcome = 'negative') AS negative,
+        COUNT(*) AS total,
+        (COUNT(*) FILTER (WHERE p.potential_outcome = 'positive'))::float / COUNT(*) AS success_rate
+    FROM scraped_posts p
+    CROSS JOIN LATERAL jsonb_array_elements_text(p.metadata->'technologies') AS t(skill)
+    WHERE p.potential_outcome IN ('positive', 'negative')
+      AND jsonb_typeof(p.metadata->'technologies') = 'array'
+    GROUP BY lower(t.skill)
+    HAVING COUNT(*) >= %s
+    ORDER BY total DESC, skill
+    LIMIT %s
+"""
+
+
+def refresh_skill_frequency_summary() -> int:
     """
-    Extract skill/technology frequency from scraped posts metadata
+    Fold posts changed or deleted since the last refresh into skill_frequency_summary
+
+    Runs in the background (main.refresh_skill_summary_periodically) and
+    after ingestion, never on the read path.
 
     Returns:
-        DataFrame with skills and their frequency across positive outcomes
+        Number of posts reprocessed
     """
-    try:
-        conn = get_db_connection()
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT refresh_skill_frequency_summary()")
+            return cursor.fetchone()[0]
 
-        query = """
-            SELECT
-                metadata,
-                potential_outcome
-            FROM scraped_posts
-            WHERE metadata IS NOT NULL
-              AND potential_outcome IN ('positive', 'negative')
-        """
 
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+def get_skill_frequency_data(min_total: int = 1, limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Skill/technology frequency and success rate across labelled posts
 
-        # Extract technologies from metadata
-        skills_data = []
-        for _, row in df.iterrows():
-            metadata = row['metadata']
-            if isinstance(metadata, dict) and 'technologies' in metadata:
-                for skill in metadata['technologies']:
-                    skills_data.append({
-                        'skill': skill.lower(),
-                        'outcome': row['potential_outcome']
-                    })
+    Counts are aggregated in Postgres. The incrementally maintained summary
+    table is read as of its last refresh (see refresh_skill_frequency_summary);
+    if the summary tables do not exist yet, the same aggregate is computed
+    directly with jsonb_array_elements_text.
 
-        if not skills_data:
-            return pd.DataFrame(columns=['skill', 'positive_count', 'negative_count', 'success_rate'])
+    Args:
+        min_total: Only include skills mentioned in at least this many posts
+        limit: Maximum number of skills, most frequent first (all when None)
 
-        skills_df = pd.DataFrame(skills_data)
+    Returns:
+        DataFrame with columns skill, positive, negative, total, success_rate
+    """
+    params = (min_total, limit)
+    try:
+        try:
+            with db_connection() as conn:
+                df = pd.read_sql_query(SKILL_SUMMARY_QUERY, conn, params=params)
 
-        # Calculate frequency and success rate
-        skill_stats = skills_df.groupby('skill')['outcome'].value_counts().unstack(fill_value=0)
-        skill_stats['total'] = skill_stats.sum(axis=1)
-        skill_stats['success_rate'] = skill_stats.get('positive', 0) / skill_stats['total']
+        except (psycopg2.errors.UndefinedTable, psycopg2.errors.UndefinedFunction):
+            logger.warning("Skill frequency summary not installed, aggregating scraped_posts directly")
+            record_fallback('skill_frequency_aggregate')
+            with db_connection() as conn:
+                df = pd.read_sql_query(SKILL_AGGREGATE_QUERY, conn, params=params)
 
-        return skill_stats.reset_index()
+        return df
 
     except Exception as e:
         logger.error(f"Error getting skill frequency data: {str(e)}")
-        return pd.DataFrame()
+        return pd.DataFrame(columns=SKILL_FREQUENCY_COLUMNS)
@@ -0,0 +1,479 @@
+"""
+Batched enrichment worker for scraped_posts
+Claims relevant posts waiting for embeddings, runs NER and BGE embeddings
+over the whole batch in-process and writes the results back with one COPY
+and one UPDATE per batch, instead of content-service calling /extract-metadata
+and /embed once per post over HTTP.
+
+A claim selects rows with FOR UPDATE SKIP LOCKED and marks them 'processing'
+in a short transaction, so several workers can run side by side and model
+inference never holds row locks. Each worker checkpoints the ids it claimed
+in enrichment_checkpoints (migration 46): a restarted worker hands its
+unfinished batch back straight away, and the batch of a worker that never
+comes back is reclaimed once its lease expires.
+
+NER is ner-service's own extract_batch (model and rule file from
+NER_SERVICE_DIR). Its company, role_type, level and outcome fill the
+scraped_posts fields downstream queries read wherever ingestion left them
+empty; the full result is also kept under metadata->'ner'. Embeddings use
+the embedding server's model and the same text layout as content-service's
+embeddingService, written to embedding / title_embedding.
+
+It ships as its own image (Dockerfile.enrichment, built from services/ so
+ner-service is alongside; dependencies in requirements-enrichment.txt) and
+runs as the enrichment-worker compose service under the "enrichment"
+profile. When it is deployed, set ENRICHMENT_WORKER_ENABLED=true for
+content-service so its scheduler and ingestion webhook stop queueing the
+per-post embedding job for the same rows.
+
+Usage:
+    python enrichment_worker.py
+    python enrichment_worker.py --once --batch-size 128
+"""
+
+import argparse
+import csv
+import importlib
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from database import db_connection
+from metrics import record_enrichment_batch
+
+logger = logging.getLogger('enrichment_worker')
+
+# Posts claimed per batch
+ENRICHMENT_BATCH_SIZE = int(os.getenv('ENRICHMENT_BATCH_SIZE', '256'))
+
+# Texts per NER / embedding forward pass within a batch
+ENRICHMENT_NER_BATCH_SIZE = int(os.getenv('ENRICHMENT_NER_BATCH_SIZE', '32'))
+ENRICHMENT_EMBED_BATCH_SIZE = int(os.getenv('ENRICHMENT_EMBED_BATCH_SIZE', '64'))
+
+# A 'processing' post not written back within this long is claimable again
+ENRICHMENT_LEASE_SECONDS = int(os.getenv('ENRICHMENT_LEASE_SECONDS', '900'))
+
+# Posts that failed this many times are left alone (embedding_retry_count)
+ENRICHMENT_MAX_RETRIES = int(os.getenv('ENRICHMENT_MAX_RETRIES', '3'))
+
+# Wait between polls when nothing is pending
+ENRICHMENT_IDLE_SECONDS = float(os.getenv('ENRICHMENT_IDLE_SECONDS', '10'))
+
+# Checkpoint key; keep it stable across restarts (the container hostname by default)
+ENRICHMENT_WORKER_ID = os.getenv('ENRICHMENT_WORKER_ID', socket.gethostname())
+
+# Serve Prometheus metrics on this port (0 disables)
+ENRICHMENT_METRICS_PORT = int(os.getenv('ENRICHMENT_METRICS_PORT', '0'))
+
+NER_SERVICE_DIR = os.getenv(
+    'NER_SERVICE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ner-service')
+)
+
+# Same model as the embedding server; scraped_posts.embedding is vector(384)
+EMBEDDING_MODEL = os.getenv('ENRICHMENT_EMBEDDING_MODEL', 'BAAI/bge-small-en-v1.5')
+EMBEDDING_DIMENSIONS = int(os.getenv('ENRICHMENT_EMBEDDING_DIMENSIONS', '384'))
+
+# content-service sends NER the first 2000 characters of a post
+NER_TEXT_CHARS = 2000
+
+CLAIM_QUERY = """
+    WITH claimed AS (
+        SELECT id
+        FROM scraped_posts
+        WHERE is_relevant = true
+          AND embedding_retry_count < %(max_retries)s
+          AND (
+              embedding_status IN ('pending', 'failed')
+              OR (embedding_status = 'processing'
+                  AND updated_at < NOW() - %(lease_seconds)s * INTERVAL '1 second')
+          )
+        ORDER BY scraped_at DESC
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE scraped_posts p
+    SET embedding_status = 'processing', updated_at = NOW()
+    FROM claimed
+    WHERE p.id = claimed.id
+    RETURNING p.id, p.post_id, p.title, p.body_text, p.comments
+"""
+
+CHECKPOINT_CLAIM_QUERY = """
+    INSERT INTO enrichment_checkpoints (worker_id, in_flight, updated_at)
+    VALUES (%s, %s, NOW())
+    ON CONFLICT (worker_id) DO UPDATE
+    SET in_flight = EXCLUDED.in_flight, updated_at = NOW()
+"""
+
+CHECKPOINT_DONE_QUERY = """
+    UPDATE enrichment_checkpoints
+    SET in_flight = '{}',
+        batches = batches + 1,
+        posts_enriched = posts_enriched + %s,
+        posts_failed = posts_failed + %s,
+        last_post_id = %s,
+        last_batch_posts_per_second = %s,
+        updated_at = NOW()
+    WHERE worker_id = %s
+"""
+
+RESULTS_TABLE_QUERY = """
+    CREATE TEMP TABLE enrichment_results (
+        id INTEGER PRIMARY KEY,
+        embedding TEXT NOT NULL,
+        title_embedding TEXT NOT NULL,
+        ner JSONB
+    ) ON COMMIT DROP
+"""
+
+# Only posts still claimed: a post reclaimed after an expired lease is written by its new owner.
+# NER fills role_type, level, outcome and metadata.company where ingestion left them empty
+# (the columns the prediction and analysis queries read); the raw result is kept under
+# metadata->'ner'. Values ingestion already set are never overwritten.
+APPLY_RESULTS_QUERY = """
+    UPDATE scraped_posts p
+    SET embedding = r.embedding::vector,
+        title_embedding = r.title_embedding::vector,
+        embedding_model = %s,
+        embedding_status = 'completed',
+        embedding_generated_at = NOW(),
+        title_embedding_generated_at = NOW(),
+        embedding_error = NULL,
+        role_type = COALESCE(p.role_type, left(r.ner->>'role_type', 100)),
+        level = COALESCE(p.level, left(r.ner->>'level', 10)),
+        outcome = COALESCE(p.outcome, left(r.ner->>'outcome', 50)),
+        metadata = CASE WHEN r.ner IS NULL THEN p.metadata
+                        ELSE COALESCE(p.metadata, '{}'::jsonb)
+                             || jsonb_build_object('ner', r.ner)
+                             || CASE WHEN p.metadata->>'company' IS NULL AND r.ner->>'company' IS NOT NULL
+                                     THEN jsonb_build_object('company', r.ner->'company')
+                                     ELSE '{}'::jsonb END
+                   END,
+        updated_at = NOW()
+    FROM enrichment_results r
+    WHERE p.id = r.id AND p.embedding_status = 'processing'
+"""
+
+FAIL_QUERY = """
+    UPDATE scraped_posts
+    SET embedding_status = 'failed',
+        embedding_error = %s,
+        embedding_retry_count = embedding_retry_count + 1,
+        updated_at = NOW()
+    WHERE id = ANY(%s) AND embedding_status = 'processing'
+"""
+
+
+def load_ner_extractor(directory: str = NER_SERVICE_DIR) -> Callable[[List[str]], List[Dict[str, Any]]]:
+    """
+    Import ner-service in this process and return its extract_batch
+
+    ner-service has its own main and metrics modules, so it is imported with
+    this service's modules of the same names set aside and restored
+    afterwards; its functions keep the modules they were loaded with.
+    """
+    shadowed = ('main', 'metrics', 'rules', 'jobs', 'scheduler')
+    saved = {name: sys.modules.pop(name) for name in shadowed if name in sys.modules}
+    sys.path.insert(0, directory)
+    try:
+        service = importlib.import_module('main')
+    finally:
+        sys.path.remove(directory)
+        for name in shadowed:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+    logger.info(f"✅ NER loaded from {directory} (rules {service.rule_store.version})")
+    return service.extract_batch
+
+
+def load_embedder(model_name: str = EMBEDDING_MODEL):
+    """SentenceTransformer for model_name, checked against the embedding column width"""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+    dimensions = model.get_sentence_embedding_dimension()
+    if dimensions != EMBEDDING_DIMENSIONS:
+        raise ValueError(f"{model_name} produces {dimensions}-d embeddings, scraped_posts expects {EMBEDDING_DIMENSIONS}")
+    logger.info(f"✅ Embedding model {model_name} loaded ({dimensions} dimensions)")
+    return model
+
+
+def embedding_text(post: Dict[str, Any]) -> str:
+    """Title, body and top comments, laid out like content-service's prepareTextForEmbedding"""
+    parts = []
+    if post.get('title'):
+        parts.append(f"Title: {post['title']}")
+
+    body = post.get('body_text')
+    if body:
+        parts.append(f"Body: {body[:3000] + '...' if len(body) > 3000 else body}")
+
+    comments = post.get('comments')
+    if isinstance(comments, list):
+        for i, comment in enumerate(comments[:3]):
+            text = comment.get('body') if isinstance(comment, dict) else None
+            if text:
+                parts.append(f"Comment {i + 1}: {text[:200] + '...' if len(text) > 200 else text}")
+
+    full_text = "\n\n".join(parts)
+    return full_text[:32000] + '...' if len(full_text) > 32000 else full_text
+
+
+def ner_text(post: Dict[str, Any]) -> str:
+    return f"{post.get('title') or ''}\n\n{post.get('body_text') or ''}".strip()[:NER_TEXT_CHARS]
+
+
+def vector_literal(vector: np.ndarray) -> str:
+    """pgvector text input: [x,y,...]"""
+    return '[' + ','.join(format(x, '.7g') for x in vector.tolist()) + ']'
+
+
+@contextmanager
+def _stage(timings: Dict[str, float], name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round(time.perf_counter() - start, 4)
+
+
+class EnrichmentWorker:
+    """
+    Claims, enriches and writes back batches of scraped_posts
+
+    Args:
+        worker_id: Checkpoint key
+        batch_size: Posts claimed per batch
+        extract_batch: texts -> NER results (ner-service's extract_batch)
+        embedder: Object with encode(texts, batch_size=...) -> array
+    """
+
+    def __init__(
+        self,
+        worker_id: str = ENRICHMENT_WORKER_ID,
+        batch_size: int = ENRICHMENT_BATCH_SIZE,
+        extract_batch: Optional[Callable[[List[str]], List[Dict[str, Any]]]] = None,
+        embedder: Any = None
+    ):
+        self.worker_id = worker_id
+        self.batch_size = batch_size
+        self.extract_batch = extract_batch
+        self.embedder = embedder
+        self.stopping = threading.Event()
+
+        self.batches = 0
+        self.enriched = 0
+        self.failed = 0
+
+    def load_models(self):
+        if self.extract_batch is None:
+            self.extract_batch = load_ner_extractor()
+        if self.embedder is None:
+            self.embedder = load_embedder()
+
+    def resume(self):
+        """Load this worker's totals and hand back a batch it claimed before a restart"""
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT in_flight, batches, posts_enriched, posts_failed FROM enrichment_checkpoints WHERE worker_id = %s",
+                    (self.worker_id,)
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    return
+
+                in_flight, self.batches, self.enriched, self.failed = row
+                if in_flight:
+                    cursor.execute(
+                        "UPDATE scraped_posts SET embedding_status = 'pending', updated_at = NOW() "
+                        "WHERE id = ANY(%s) AND embedding_status = 'processing'",
+                        (in_flight,)
+                    )
+                    released = cursor.rowcount
+                    cursor.execute(
+                        "UPDATE enrichment_checkpoints SET in_flight = '{}', updated_at = NOW() WHERE worker_id = %s",
+                        (self.worker_id,)
+                    )
+                    logger.info(f"♻️  Released {released} posts claimed before restart")
+
+        logger.info(f"📍 Resuming {self.worker_id}: {self.batches} batches, {self.enriched} enriched, {self.failed} failed")
+
+    def claim(self) -> List[Dict[str, Any]]:
+        """Mark up to batch_size pending posts as processing and checkpoint their ids"""
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CLAIM_QUERY, {
+                    'max_retries': ENRICHMENT_MAX_RETRIES,
+                    'lease_seconds': ENRICHMENT_LEASE_SECONDS,
+                    'limit': self.batch_size
+                })
+                columns = [c[0] for c in cursor.description]
+                posts = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                if posts:
+                    cursor.execute(CHECKPOINT_CLAIM_QUERY, (self.worker_id, [p['id'] for p in posts]))
+        return posts
+
+    def enrich(self, posts: List[Dict[str, Any]], timings: Dict[str, float]) -> Dict[str, Any]:
+        """NER results and full/title embeddings for a claimed batch"""
+        with _stage(timings, 'ner'):
+            texts = [ner_text(p) for p in posts]
+            ner = []
+            for i in range(0, len(texts), ENRICHMENT_NER_BATCH_SIZE):
+                ner.extend(self.extract_batch(texts[i:i + ENRICHMENT_NER_BATCH_SIZE]))
+
+        with _stage(timings, 'embed'):
+            embeddings = self._embed([embedding_text(p) for p in posts])
+            title_embeddings = self._embed([p.get('title') or '' for p in posts])
+
+        return {'ner': ner, 'embeddings': embeddings, 'title_embeddings': title_embeddings}
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """One encode call over the non-empty texts; empty texts get a zero vector like embeddingService"""
+        vectors = np.zeros((len(texts), EMBEDDING_DIMENSIONS), dtype=np.float32)
+        filled = [i for i, text in enumerate(texts) if text.strip()]
+        if filled:
+            vectors[filled] = self.embedder.encode(
+                [texts[i] for i in filled], batch_size=ENRICHMENT_EMBED_BATCH_SIZE, convert_to_numpy=True
+            )
+        return vectors
+
+    def write(self, posts: List[Dict[str, Any]], enriched: Dict[str, Any], posts_per_second: float) -> int:
+        """COPY the batch into a temp table, apply it with one UPDATE and checkpoint, in one transaction"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for post, ner, embedding, title_embedding in zip(
+            posts, enriched['ner'], enriched['embeddings'], enriched['title_embeddings']
+        ):
+            writer.writerow([
+                post['id'],
+                vector_literal(embedding),
+                vector_literal(title_embedding),
+                json.dumps(ner) if ner is not None else ''
+            ])
+        buffer.seek(0)
+
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(RESULTS_TABLE_QUERY)
+                cursor.copy_expert("COPY enrichment_results FROM STDIN WITH (FORMAT csv)", buffer)
+                cursor.execute(APPLY_RESULTS_QUERY, (EMBEDDING_MODEL,))
+                written = cursor.rowcount
+                cursor.execute(CHECKPOINT_DONE_QUERY, (
+                    written, 0, posts[-1]['post_id'], posts_per_second, self.worker_id
+                ))
+        return written
+
+    def fail(self, posts: List[Dict[str, Any]], error: str):
+        """Mark a batch failed (retried up to ENRICHMENT_MAX_RETRIES times) and clear the checkpoint"""
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(FAIL_QUERY, (error[:500], [p['id'] for p in posts]))
+                cursor.execute(CHECKPOINT_DONE_QUERY, (0, len(posts), posts[-1]['post_id'], None, self.worker_id))
+
+    def run_batch(self) -> Optional[Dict[str, Any]]:
+        """
+        Claim, enrich and write back one batch
+
+        Returns:
+            Batch stats, or None when no post was pending
+        """
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        with _stage(timings, 'claim'):
+            posts = self.claim()
+        if not posts:
+            return None
+
+        enriched_count, failed_count = 0, 0
+        try:
+            enriched = self.enrich(posts, timings)
+            posts_per_second = len(posts) / (time.perf_counter() - started)
+            with _stage(timings, 'write'):
+                enriched_count = self.write(posts, enriched, posts_per_second)
+        except Exception as e:
+            logger.error(f"❌ Enrichment batch of {len(posts)} posts failed: {str(e)}")
+            self.fail(posts, str(e))
+            failed_count = len(posts)
+
+        elapsed = time.perf_counter() - started
+        self.batches += 1
+        self.enriched += enriched_count
+        self.failed += failed_count
+
+        result = {
+            'claimed': len(posts),
+            'enriched': enriched_count,
+            'failed': failed_count,
+            'seconds': round(elapsed, 3),
+            'posts_per_second': round(len(posts) / elapsed, 2) if elapsed else None,
+            'stage_seconds': timings
+        }
+        record_enrichment_batch(result)
+        logger.info(
+            f"✅ Batch {self.batches}: {enriched_count}/{len(posts)} posts enriched in {elapsed:.1f}s "
+            f"({result['posts_per_second']} posts/s; {self.enriched} enriched, {self.failed} failed in total)"
+        )
+        return result
+
+    def run(self, once: bool = False):
+        """Process batches until stopped; with once, until nothing is pending"""
+        self.load_models()
+        self.resume()
+
+        while not self.stopping.is_set():
+            try:
+                result = self.run_batch()
+            except Exception as e:
+                logger.error(f"❌ Enrichment worker error: {str(e)}")
+                result = None
+                if once:
+                    raise
+
+            if result is None:
+                if once:
+                    break
+                self.stopping.wait(ENRICHMENT_IDLE_SECONDS)
+
+        logger.info(f"👋 Enrichment worker stopped: {self.enriched} enriched, {self.failed} failed")
+
+    def stop(self, *args):
+        """Finish (and checkpoint) the current batch, then exit"""
+        self.stopping.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Enrich scraped_posts with NER metadata and embeddings in batches')
+    parser.add_argument('--batch-size', type=int, default=ENRICHMENT_BATCH_SIZE)
+    parser.add_argument('--worker-id', default=ENRICHMENT_WORKER_ID)
+    parser.add_argument('--once', action='store_true', help="Exit when no post is pending")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if ENRICHMENT_METRICS_PORT:
+        from prometheus_client import start_http_server
+        start_http_server(ENRICHMENT_METRICS_PORT)
+        logger.info(f"📈 Metrics on :{ENRICHMENT_METRICS_PORT}/metrics")
+
+    worker = EnrichmentWorker(args.worker_id, max(1, args.batch_size))
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(once=args.once)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
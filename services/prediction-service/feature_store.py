@@ -0,0 +1,224 @@
+"""
+Per-post feature store for the prediction service
+Keeps KeywordFeatureEngine vectors in post_features (migration 45), keyed by
+post_id and feature schema version, so retraining reads vectors instead of
+re-extracting post text
+"""
+
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from database import TRAINING_FETCH_SIZE, db_connection
+from features import FEATURE_SCHEMA_VERSION, KeywordFeatureEngine
+
+logger = logging.getLogger(__name__)
+
+FEATURE_STORE_ENABLED = os.getenv('FEATURE_STORE_ENABLED', 'true').lower() == 'true'
+
+# Posts featurized per transaction when refreshing
+REFRESH_BATCH_SIZE = int(os.getenv('FEATURE_STORE_BATCH_SIZE', '1000'))
+
+COMPANY_COUNT_SQL = """
+    CASE WHEN jsonb_typeof(p.metadata->'companies') = 'array'
+         THEN jsonb_array_length(p.metadata->'companies') ELSE 0 END
+"""
+
+TECHNOLOGY_COUNT_SQL = """
+    CASE WHEN jsonb_typeof(p.metadata->'technologies') = 'array'
+         THEN jsonb_array_length(p.metadata->'technologies') ELSE 0 END
+"""
+
+# Digest of everything a vector is computed from, so posts whose other columns
+# change (status, embeddings, labels) keep their vector
+SOURCE_HASH_SQL = f"""
+    md5(
+        COALESCE(p.body_text, '') || chr(31) ||
+        COALESCE(p.word_count::text, '') || chr(31) ||
+        ({COMPANY_COUNT_SQL})::text || chr(31) ||
+        ({TECHNOLOGY_COUNT_SQL})::text
+    )
+"""
+
+# Next page, in post_id order after a cursor, of labelled posts that have no
+# vector for this schema version or were updated after theirs was checked.
+# updated_at only picks which posts get their hash compared; a vector is
+# recomputed when the hash differs, and post text is only sent back then.
+CANDIDATES_QUERY = f"""
+    SELECT
+        p.post_id,
+        f.source_hash IS DISTINCT FROM h.source_hash AS changed,
+        CASE WHEN f.source_hash IS DISTINCT FROM h.source_hash THEN p.body_text END AS body_text,
+        p.word_count,
+        {COMPANY_COUNT_SQL} AS company_count,
+        {TECHNOLOGY_COUNT_SQL} AS technology_count,
+        h.source_hash,
+        p.updated_at
+    FROM scraped_posts p
+    LEFT JOIN post_features f
+      ON f.post_id = p.post_id AND f.schema_version = %(schema_version)s
+    CROSS JOIN LATERAL (SELECT {SOURCE_HASH_SQL} AS source_hash) h
+    WHERE p.potential_outcome IN ('positive', 'negative')
+      AND p.post_id > %(after)s
+      AND (f.post_id IS NULL OR f.source_updated_at IS DISTINCT FROM p.updated_at)
+    ORDER BY p.post_id
+    LIMIT %(limit)s
+"""
+
+UPSERT_QUERY = """
+    INSERT INTO post_features (post_id, schema_version, features, source_hash, source_updated_at)
+    VALUES %s
+    ON CONFLICT (post_id, schema_version) DO UPDATE
+    SET features = EXCLUDED.features,
+        source_hash = EXCLUDED.source_hash,
+        source_updated_at = EXCLUDED.source_updated_at,
+        computed_at = NOW()
+"""
+
+# Inputs unchanged: only record that the post was checked at this updated_at
+TOUCH_QUERY = """
+    UPDATE post_features f
+    SET source_updated_at = v.source_updated_at
+    FROM (VALUES %s) AS v (post_id, schema_version, source_updated_at)
+    WHERE f.post_id = v.post_id AND f.schema_version = v.schema_version
+"""
+
+STORED_COLUMNS = ['post_id', 'features', 'potential_outcome', 'scraped_at', 'role_type', 'companies', 'technologies']
+
+
+def refresh_feature_store(engine: KeywordFeatureEngine, batch_size: int = REFRESH_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Compute vectors for new labelled posts and posts whose featurized inputs changed
+
+    Walks candidates in post_id order, one committed batch at a time, so each
+    query continues from the previous page instead of rescanning the table,
+    and an interrupted refresh keeps its progress.
+
+    Returns:
+        Posts featurized, posts checked but unchanged, and elapsed time
+    """
+    started = time.perf_counter()
+    computed = 0
+    unchanged = 0
+    after = ''
+
+    while True:
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CANDIDATES_QUERY, {
+                    'schema_version': FEATURE_SCHEMA_VERSION,
+                    'after': after,
+                    'limit': batch_size
+                })
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                after = rows[-1][0]
+
+                changed = [row for row in rows if row[1]]
+                if changed:
+                    post_ids, _, texts, word_counts, company_counts, technology_counts, hashes, updated_at = zip(*changed)
+                    X = engine.transform(texts, word_counts, company_counts, technology_counts)
+                    execute_values(
+                        cursor,
+                        UPSERT_QUERY,
+                        [
+                            (post_id, FEATURE_SCHEMA_VERSION, row.tolist(), source_hash, source_updated_at)
+                            for post_id, row, source_hash, source_updated_at in zip(post_ids, X, hashes, updated_at)
+                        ],
+                        page_size=batch_size
+                    )
+
+                touched = [(row[0], FEATURE_SCHEMA_VERSION, row[7]) for row in rows if not row[1]]
+                if touched:
+                    execute_values(cursor, TOUCH_QUERY, touched, template="(%s, %s, %s::timestamp)", page_size=batch_size)
+
+        computed += len(changed)
+        unchanged += len(touched)
+        logger.info(f"Feature store: {computed} posts featurized, {unchanged} unchanged")
+
+        if len(rows) < batch_size:
+            break
+
+    result = {
+        'schema_version': FEATURE_SCHEMA_VERSION,
+        'computed': computed,
+        'unchanged': unchanged,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+    if computed:
+        logger.info(f"✅ Feature store refreshed: {computed} posts in {result['seconds']:.1f}s")
+    return result
+
+
+def iter_stored_features(
+    min_confidence: float = 0.5,
+    since: Optional[str] = None,
+    chunk_size: int = TRAINING_FETCH_SIZE
+) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Stream stored vectors with the post columns training needs
+
+    Same rows and order as database.iter_training_data, but without post
+    text: run refresh_feature_store first so every labelled post has a
+    current vector.
+
+    Yields:
+        (DataFrame with post_id, potential_outcome, scraped_at, role_type,
+        companies, technologies; float32 feature matrix)
+    """
+    params = [FEATURE_SCHEMA_VERSION, min_confidence]
+    since_clause = ""
+    if since:
+        since_clause = "AND p.scraped_at > %s"
+        params.append(since)
+
+    query = f"""
+        SELECT
+            p.post_id,
+            f.features,
+            p.potential_outcome,
+            p.scraped_at,
+            p.role_type,
+            CASE WHEN jsonb_typeof(p.metadata->'companies') = 'array' THEN p.metadata->'companies'
+                 WHEN p.metadata->>'company' IS NOT NULL THEN jsonb_build_array(p.metadata->>'company')
+                 ELSE '[]'::jsonb END AS companies,
+            CASE WHEN jsonb_typeof(p.metadata->'technologies') = 'array'
+                 THEN p.metadata->'technologies' ELSE '[]'::jsonb END AS technologies
+        FROM post_features f
+        JOIN scraped_posts p ON p.post_id = f.post_id
+        WHERE f.schema_version = %s
+          AND p.potential_outcome IN ('positive', 'negative')
+          AND p.confidence_score >= %s
+          {since_clause}
+        ORDER BY p.scraped_at DESC
+    """
+
+    with db_connection() as conn:
+        with conn.cursor(name=f"stored_features_{uuid.uuid4().hex[:8]}") as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(query, tuple(params))
+
+            total = 0
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                total += len(rows)
+
+                df = pd.DataFrame.from_records(rows, columns=STORED_COLUMNS)
+                X = np.array(df.pop('features').tolist(), dtype=np.float32)
+                df['post_id'] = df['post_id'].astype(str)
+                df['potential_outcome'] = df['potential_outcome'].astype('category')
+                df['scraped_at'] = pd.to_datetime(df['scraped_at'])
+                df['companies'] = df['companies'].apply(lambda x: x if isinstance(x, list) else [])
+                df['technologies'] = df['technologies'].apply(lambda x: x if isinstance(x, list) else [])
+                yield df, X
+
+        logger.info(f"Read {total} stored feature vectors" + (f" scraped after {since}" if since else ""))
@@ -0,0 +1,237 @@
+"""
+Feature extraction for interview predictions
+Builds the keyword/metadata feature matrix in a single pass over the corpus
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from typing import Any, Dict, List, Optional, Sequence
+
+# Bump when feature columns or their semantics change; persisted artifacts
+# and cached features are only reused when their schema version matches
+FEATURE_SCHEMA_VERSION = 1
+
+# Optional hashed text block appended after the keyword features. Off by
+# default; bundles record their own setting, so serving follows the bundle
+TEXT_HASHING_ENABLED = os.getenv('TEXT_HASHING_ENABLED', 'false').lower() == 'true'
+TEXT_HASH_FEATURES = int(os.getenv('TEXT_HASH_FEATURES', str(2 ** 14)))
+TEXT_HASH_MAX_NGRAM = int(os.getenv('TEXT_HASH_MAX_NGRAM', '2'))
+
+POSITIVE_KEYWORDS = ['offer', 'accepted', 'hired', 'passed', 'success']
+NEGATIVE_KEYWORDS = ['rejected', 'failed', 'ghosted', 'denied']
+
+
+def _list_length(value: Any) -> int:
+    return len(value) if isinstance(value, (list, tuple)) else 0
+
+
+class KeywordFeatureEngine:
+    """
+    Keyword and metadata features for interview posts
+
+    Each document is lowercased once and checked against every term in one
+    loop, and results are written straight into a preallocated float32
+    matrix. Column names and meanings match the original per-keyword pandas
+    implementation:
+
+        text_length, word_count, mentions_<company>..., role_<role>...,
+        pos_<keyword>..., neg_<keyword>..., [has_companies, has_technologies]
+    """
+
+    def __init__(
+        self,
+        companies: Sequence[str],
+        roles: Sequence[str],
+        positive_keywords: Sequence[str] = POSITIVE_KEYWORDS,
+        negative_keywords: Sequence[str] = NEGATIVE_KEYWORDS
+    ):
+        self.term_names: List[str] = (
+            [f'mentions_{c}' for c in companies] +
+            [f'role_{r.replace(" ", "_")}' for r in roles] +
+            [f'pos_{k}' for k in positive_keywords] +
+            [f'neg_{k}' for k in negative_keywords]
+        )
+        self.terms: List[str] = [t.lower() for t in (*companies, *roles, *positive_keywords, *negative_keywords)]
+
+        # Column layout: two length columns, then one column per term
+        self.term_offset = 2
+        self.term_end = self.term_offset + len(self.terms)
+
+    def feature_names(self, with_metadata: bool = True) -> List[str]:
+        names = ['text_length', 'word_count'] + self.term_names
+        if with_metadata:
+            names += ['has_companies', 'has_technologies']
+        return names
+
+    def match_terms(self, text: Optional[str]) -> List[bool]:
+        """Which terms occur in a text (substring match on the lowercased text)"""
+        if not text:
+            return [False] * len(self.terms)
+        lower = text.lower()
+        return [term in lower for term in self.terms]
+
+    def transform(
+        self,
+        texts: Sequence[Optional[str]],
+        word_counts: Optional[Sequence[Any]] = None,
+        company_counts: Optional[Sequence[Any]] = None,
+        technology_counts: Optional[Sequence[Any]] = None
+    ) -> np.ndarray:
+        """
+        Build the feature matrix
+
+        Args:
+            texts: Post bodies (None is treated as empty)
+            word_counts: Precomputed word counts; computed from the text when omitted
+            company_counts: Number of companies in metadata; with technology_counts,
+                adds the has_companies/has_technologies columns
+            technology_counts: Number of technologies in metadata
+
+        Returns:
+            float32 matrix with columns in feature_names() order
+        """
+        with_metadata = company_counts is not None or technology_counts is not None
+        n_rows = len(texts)
+        X = np.zeros((n_rows, len(self.feature_names(with_metadata))), dtype=np.float32)
+
+        compute_word_count = word_counts is None
+        for i, text in enumerate(texts):
+            if not isinstance(text, str) or not text:
+                continue
+            X[i, 0] = len(text)
+            if compute_word_count:
+                X[i, 1] = len(text.split())
+            X[i, self.term_offset:self.term_end] = self.match_terms(text)
+
+        if not compute_word_count:
+            X[:, 1] = np.nan_to_num(np.asarray(word_counts, dtype=np.float64))
+
+        if with_metadata:
+            if company_counts is not None:
+                X[:, self.term_end] = np.nan_to_num(np.asarray(company_counts, dtype=np.float64))
+            if technology_counts is not None:
+                X[:, self.term_end + 1] = np.nan_to_num(np.asarray(technology_counts, dtype=np.float64))
+
+        return X
+
+    def transform_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Build the feature matrix from a scraped_posts DataFrame
+
+        Uses word_count when present, and metadata counts from either a
+        'metadata' dict column or precomputed 'company_count' /
+        'technology_count' columns.
+        """
+        texts = df['body_text'].tolist()
+        word_counts = df['word_count'].tolist() if 'word_count' in df.columns else None
+
+        company_counts = technology_counts = None
+        if 'company_count' in df.columns or 'technology_count' in df.columns:
+            company_counts = df['company_count'].tolist() if 'company_count' in df.columns else [0] * len(df)
+            technology_counts = df['technology_count'].tolist() if 'technology_count' in df.columns else [0] * len(df)
+        elif 'metadata' in df.columns:
+            metadata = df['metadata'].tolist()
+            company_counts = [_list_length(m.get('companies')) if isinstance(m, dict) else 0 for m in metadata]
+            technology_counts = [_list_length(m.get('technologies')) if isinstance(m, dict) else 0 for m in metadata]
+
+        return self.transform(texts, word_counts, company_counts, technology_counts)
+
+    def has_metadata_columns(self, df: pd.DataFrame) -> bool:
+        return any(col in df.columns for col in ('metadata', 'company_count', 'technology_count'))
+
+
+class TextHashingEngine:
+    """
+    Hashed word n-gram features for post text
+
+    Stateless: n-grams are hashed straight into n_features columns, so there
+    is no vocabulary to fit or store, memory is fixed by n_features, and
+    chunks can be transformed independently while streaming. Output is a
+    sparse float32 CSR matrix (non-negative counts, rows L2-normalized).
+    """
+
+    def __init__(self, n_features: int = TEXT_HASH_FEATURES, max_ngram: int = TEXT_HASH_MAX_NGRAM):
+        self.n_features = n_features
+        self.max_ngram = max_ngram
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, max_ngram),
+            alternate_sign=False,
+            norm='l2',
+            dtype=np.float32
+        )
+
+    def config(self) -> Dict[str, Any]:
+        """Settings persisted with a bundle (the block is reproducible from them)"""
+        return {'n_features': self.n_features, 'max_ngram': self.max_ngram}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['TextHashingEngine']:
+        if not config:
+            return None
+        return cls(config['n_features'], config['max_ngram'])
+
+    def transform(self, texts: Sequence[Optional[str]]) -> sparse.csr_matrix:
+        return self.vectorizer.transform([t if isinstance(t, str) else '' for t in texts]).tocsr()
+
+    def append_to(self, X: Any, texts: Sequence[Optional[str]]) -> sparse.csr_matrix:
+        """Keyword feature rows followed by the hashed text block, as one CSR matrix"""
+        return sparse.hstack([sparse.csr_matrix(X), self.transform(texts)], format='csr', dtype=np.float32)
+
+
+def stack_rows(blocks: Sequence[Any]) -> Any:
+    """Concatenate feature blocks row-wise, staying sparse if any block is"""
+    if any(sparse.issparse(b) for b in blocks):
+        return sparse.vstack([sparse.csr_matrix(b) for b in blocks], format='csr', dtype=np.float32)
+    return np.concatenate(blocks)
+
+
+class FeatureLayout:
+    """
+    Precomputed mapping from request inputs to model feature slots
+
+    Built once from the trained feature_names, so scoring a request writes
+    straight into a numpy row in the model's column order: no DataFrame, no
+    column padding, no reordering. Columns the engine does not produce stay 0,
+    matching the old pad-with-zeros behaviour.
+    """
+
+    def __init__(self, engine: KeywordFeatureEngine, feature_names: Sequence[str]):
+        index = {name: i for i, name in enumerate(feature_names)}
+        self.width = len(feature_names)
+
+        self.text_length_slot = index.get('text_length', -1)
+        self.word_count_slot = index.get('word_count', -1)
+        self.companies_slot = index.get('has_companies', -1)
+        self.technologies_slot = index.get('has_technologies', -1)
+
+        pairs = [(term, index[name]) for term, name in zip(engine.terms, engine.term_names) if name in index]
+        self.terms = tuple(term for term, _ in pairs)
+        self.term_slots = np.array([slot for _, slot in pairs], dtype=np.intp)
+
+    def fill_row(
+        self,
+        row: np.ndarray,
+        text: str,
+        word_count: int,
+        company_count: int,
+        technology_count: int
+    ):
+        """Write one request's features into a zeroed-or-reused row of length width"""
+        row.fill(0)
+        if self.text_length_slot >= 0:
+            row[self.text_length_slot] = len(text)
+        if self.word_count_slot >= 0:
+            row[self.word_count_slot] = word_count
+        if self.companies_slot >= 0:
+            row[self.companies_slot] = company_count
+        if self.technologies_slot >= 0:
+            row[self.technologies_slot] = technology_count
+
+        if text:
+            lower = text.lower()
+            row[self.term_slots] = [term in lower for term in self.terms]
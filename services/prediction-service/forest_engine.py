@@ -0,0 +1,169 @@
+"""
+Flat-array inference for tree ensembles
+Compiles a fitted RandomForestClassifier / ExtraTreesClassifier into a few
+contiguous numpy arrays and scores a batch by walking every tree at once, so
+one- or few-row predictions skip sklearn's per-call validation and joblib
+dispatch
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+from scipy import sparse
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+logger = logging.getLogger(__name__)
+
+# Set FLAT_FOREST_ENABLED=false to always score through sklearn
+FLAT_FOREST_ENABLED = os.getenv('FLAT_FOREST_ENABLED', 'true').lower() == 'true'
+
+FOREST_TYPES = (RandomForestClassifier, ExtraTreesClassifier)
+
+# Arrays persisted with a bundle, one .npy file each
+ARRAY_NAMES = ('feature', 'threshold', 'left', 'right', 'value', 'roots', 'used_features', 'classes')
+
+
+class FlatForest:
+    """
+    A forest as flat node arrays
+
+    Nodes of all trees live in one set of arrays; roots holds each tree's
+    first node. Leaves point to themselves on both sides with an infinite
+    threshold, so every tree can be advanced max_depth times without
+    checking which rows have already reached a leaf. Split features are
+    renumbered to positions in used_features, so scoring only gathers the
+    columns the forest actually splits on (which keeps sparse inputs sparse
+    until a handful of columns are pulled out).
+
+    value holds each leaf's class probabilities, so predict_proba is the
+    mean of the reached leaves, as in sklearn.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], max_depth: int, n_features_in: int):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.used_features = arrays['used_features']
+        self.classes_ = arrays['classes']
+        self.max_depth = max_depth
+        self.n_features_in = n_features_in
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, 'classes_' if name == 'classes' else name) for name in ARRAY_NAMES}
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'n_trees': self.n_trees,
+            'n_nodes': self.n_nodes,
+            'max_depth': self.max_depth,
+            'n_features_in': self.n_features_in,
+            'used_features': int(len(self.used_features))
+        }
+
+    def _gather(self, X: Any) -> np.ndarray:
+        """The used feature columns of X as a dense float64 matrix"""
+        if sparse.issparse(X):
+            columns = X.tocsr()[:, self.used_features].toarray()
+        else:
+            columns = np.asarray(X)[:, self.used_features]
+        # sklearn compares float32 features against float64 thresholds
+        return columns.astype(np.float32).astype(np.float64)
+
+    def apply(self, X: Any) -> np.ndarray:
+        """Reached leaf (global node id) per row and tree, shape (n_samples, n_trees)"""
+        if X.shape[1] != self.n_features_in:
+            raise ValueError(f"X has {X.shape[1]} features, forest expects {self.n_features_in}")
+
+        columns = self._gather(X)
+        n_samples = columns.shape[0]
+        rows = np.arange(n_samples)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_samples, self.n_trees)).copy()
+
+        for _ in range(self.max_depth):
+            go_left = columns[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        return self.value[self.apply(X)].mean(axis=1)
+
+
+def compile_forest(model: Any) -> Optional[FlatForest]:
+    """
+    Flatten a fitted forest classifier
+
+    Returns:
+        The flat forest, or None when the model is not a single-output
+        RandomForestClassifier / ExtraTreesClassifier
+    """
+    if not isinstance(model, FOREST_TYPES) or getattr(model, 'n_outputs_', 1) != 1:
+        return None
+
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+    feature = np.concatenate([tree.feature for tree in trees]).astype(np.int64)
+    threshold = np.concatenate([tree.threshold for tree in trees]).astype(np.float64)
+    left = np.concatenate([tree.children_left + offset for tree, offset in zip(trees, offsets)]).astype(np.int32)
+    right = np.concatenate([tree.children_right + offset for tree, offset in zip(trees, offsets)]).astype(np.int32)
+
+    # Per-node class distribution normalized to probabilities
+    value = np.concatenate([tree.value[:, 0, :] for tree in trees]).astype(np.float64)
+    totals = value.sum(axis=1, keepdims=True)
+    value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+
+    is_leaf = np.concatenate([tree.children_left for tree in trees]) == -1
+    node_ids = np.arange(len(feature), dtype=np.int32)
+    left[is_leaf] = node_ids[is_leaf]
+    right[is_leaf] = node_ids[is_leaf]
+    threshold[is_leaf] = np.inf
+
+    used_features = np.unique(feature[~is_leaf])
+    position = np.zeros(max(int(model.n_features_in_), 1), dtype=np.int32)
+    position[used_features] = np.arange(len(used_features), dtype=np.int32)
+    feature_position = np.where(is_leaf, 0, position[np.where(is_leaf, 0, feature)]).astype(np.int32)
+
+    # A forest of single-leaf trees still needs one column to gather
+    if len(used_features) == 0:
+        used_features = np.array([0])
+
+    arrays = {
+        'feature': feature_position,
+        'threshold': threshold,
+        'left': left,
+        'right': right,
+        'value': value,
+        'roots': offsets[:-1].astype(np.int32),
+        'used_features': used_features.astype(np.int64),
+        'classes': np.asarray(model.classes_)
+    }
+    max_depth = max(tree.max_depth for tree in trees)
+    return FlatForest(arrays, max_depth, int(model.n_features_in_))
+
+
+def save_forest(forest: FlatForest, directory: str) -> Dict[str, Any]:
+    """Write the arrays as .npy files (memory-mappable); returns the manifest entry"""
+    os.makedirs(directory, exist_ok=True)
+    for name, array in forest.arrays().items():
+        np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array))
+    return {'dir': os.path.basename(directory), **forest.describe()}
+
+
+def load_forest(directory: str, entry: Dict[str, Any]) -> FlatForest:
+    """Memory-map a saved flat forest, so serving workers share its pages"""
+    arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in ARRAY_NAMES}
+    return FlatForest(arrays, entry['max_depth'], entry['n_features_in'])
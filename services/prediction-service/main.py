@@ -3,17 +3,32 @@ RedCube XHS - Prediction Service
 FastAPI-based microservice for ML predictions and analytics
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+import asyncio
+import os
+import random
+import threading
+import time
 import uvicorn
 import logging
 from datetime import datetime
+import psycopg2.errors
 
 # Local imports
-from database import get_training_data, get_db_connection
+import database
 from models import InterviewSuccessPredictor, SkillGapAnalyzer
+from artifacts import ModelArtifactStore
+from training import TrainingJobManager, TRAINING_MODES, FULL
+from cache import TTLCache
+from feature_store import refresh_feature_store
+from skill_index import normalize_role
+from worker_state import is_locked, read_json, try_lock, write_json
+import metrics
+from profiling import PROFILE_SAMPLE_RATE, RequestProfiles, SamplingProfiler, list_profiles, profile_path
 
 # Configure logging
 logging.basicConfig(
@@ -38,9 +53,124 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global ML models (loaded on startup)
-success_predictor: Optional[InterviewSuccessPredictor] = None
-skill_analyzer: Optional[SkillGapAnalyzer] = None
+# Folded stacks of sampled API requests (see PROFILE_SAMPLE_RATE)
+request_profiles = RequestProfiles()
+
+
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """Per-endpoint latency and errors, and profiling of a sample of API requests"""
+    profiler = None
+    if PROFILE_SAMPLE_RATE > 0 and request.url.path.startswith('/api/') and random.random() < PROFILE_SAMPLE_RATE:
+        profiler = SamplingProfiler(threading.get_ident()).start()
+
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Label by route template so path parameters don't create new series
+        route = request.scope.get('route')
+        endpoint = getattr(route, 'path', None) or 'unmatched'
+        metrics.REQUEST_SECONDS.labels(endpoint=endpoint).observe(time.perf_counter() - start)
+        if status_code >= 500:
+            metrics.ERRORS.labels(endpoint=endpoint).inc()
+        if profiler:
+            request_profiles.add(endpoint, profiler.stop())
+
+
+class ActiveModels:
+    """
+    The models serving requests
+
+    Replaced as a whole by a single assignment, so a request that reads
+    active_models once never sees a predictor and analyzer from different
+    training runs.
+    """
+
+    def __init__(
+        self,
+        predictor: InterviewSuccessPredictor,
+        analyzer: SkillGapAnalyzer,
+        bundle_version: Optional[str] = None
+    ):
+        self.predictor = predictor
+        self.analyzer = analyzer
+        self.bundle_version = bundle_version
+        self.loaded_at = datetime.utcnow().isoformat()
+
+
+# Global ML models: rule-based fallbacks until a bundle is loaded or trained
+active_models = ActiveModels(InterviewSuccessPredictor(), SkillGapAnalyzer())
+
+# Persisted model bundles
+artifact_store = ModelArtifactStore()
+
+# How often to check for bundles trained by another worker
+BUNDLE_WATCH_INTERVAL_SECONDS = float(os.getenv('BUNDLE_WATCH_INTERVAL_SECONDS', '5'))
+bundle_watcher: Optional[asyncio.Task] = None
+
+# How often worker 0 folds changed and deleted posts into the skill frequency summary
+SKILL_SUMMARY_REFRESH_INTERVAL_SECONDS = float(os.getenv('SKILL_SUMMARY_REFRESH_INTERVAL_SECONDS', '60'))
+skill_summary_refresher: Optional[asyncio.Task] = None
+
+# Set by serve.py when running several workers (0 in single-process mode)
+WORKER_ID = int(os.getenv('PREDICTION_WORKER_ID', '0'))
+
+
+async def install_bundle(result: Dict[str, Any]):
+    """Load a freshly trained bundle off the event loop and swap it in"""
+    global active_models
+
+    if result['bundle_version'] == active_models.bundle_version:
+        logger.info(f"Model bundle {result['bundle_version']} already serving, nothing to swap")
+        return
+
+    predictor, analyzer, manifest = await asyncio.to_thread(artifact_store.load, result['bundle_version'])
+    active_models = ActiveModels(predictor, analyzer, manifest['version'])
+    clear_response_caches()
+    metrics.record_serving_model(predictor.training_samples, predictor.accuracy)
+    logger.info(f"🔁 Now serving model bundle {manifest['version']}")
+
+
+# Training runs in a separate process; install_bundle swaps the result in
+training_jobs = TrainingJobManager(artifact_store.root, on_complete=install_bundle)
+
+# Skill frequency responses, keyed by query parameters
+skill_frequency_cache = TTLCache(
+    maxsize=64,
+    ttl_seconds=float(os.getenv('SKILL_FREQUENCY_CACHE_TTL_SECONDS', '300'))
+)
+
+# Memoized prediction and skill gap responses, keyed by canonical request
+# and bundle version; cleared whenever new models are swapped in
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '1024'))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '600'))
+
+prediction_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS)
+skill_gap_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS)
+
+# Largest what-if grid (companies x topic variants x preparation values)
+WHAT_IF_MAX_CELLS = int(os.getenv('WHAT_IF_MAX_CELLS', '20000'))
+
+
+# Background feature store refresh, one at a time across all workers: the lock
+# file is held while a refresh runs and the state file keeps the last outcome
+FEATURE_REFRESH_LOCK_FILE = os.path.join(artifact_store.root, '.feature_refresh.lock')
+FEATURE_REFRESH_STATE_FILE = os.path.join(artifact_store.root, 'feature_refresh.json')
+feature_refresh_task: Optional[asyncio.Task] = None
+
+
+def clear_response_caches():
+    prediction_cache.clear()
+    skill_gap_cache.clear()
+
+
+def canonical_terms(values: Optional[List[str]]) -> List[str]:
+    """Lowercased, stripped, deduplicated and sorted list of skills/topics/companies"""
+    return sorted({v.lower().strip() for v in values or [] if v and v.strip()})
 
 # Pydantic models for request/response
 class InterviewPredictionRequest(BaseModel):
@@ -58,6 +188,34 @@ class InterviewPredictionResponse(BaseModel):
     factors: Dict[str, Any]
     recommendations: List[str]
 
+class BatchInterviewPredictionRequest(BaseModel):
+    """Request model for batch interview success prediction"""
+    requests: List[InterviewPredictionRequest] = Field(..., min_length=1, max_length=1000)
+
+class BatchInterviewPredictionResponse(BaseModel):
+    """Response model for batch interview success prediction (same order as requests)"""
+    predictions: List[InterviewPredictionResponse]
+    count: int
+
+class WhatIfRequest(BaseModel):
+    """Base profile plus the values to vary; an empty grid keeps the base value"""
+    base: InterviewPredictionRequest
+    preparation_time_weeks: List[Optional[int]] = Field(default_factory=list, max_length=104)
+    extra_topics: List[str] = Field(
+        default_factory=list, max_length=200,
+        description="Each topic is added to the base topics on its own; the base topics are always included"
+    )
+    companies: List[Optional[str]] = Field(default_factory=list, max_length=200)
+
+class WhatIfResponse(BaseModel):
+    """Probabilities indexed [company][extra_topic][preparation_time_weeks]"""
+    axes: Dict[str, List[Any]]
+    probabilities: List[List[List[float]]]
+    base_probability: float
+    confidence: float
+    source: str
+    cells: int
+
 class SkillGapRequest(BaseModel):
     """Request model for skill gap analysis"""
     user_skills: List[str]
@@ -71,6 +229,21 @@ class SkillGapResponse(BaseModel):
     learning_path: List[Dict[str, Any]]
     estimated_time_weeks: int
 
+class SkillFrequencyItem(BaseModel):
+    skill: str
+    positive: int
+    negative: int
+    total: int
+    success_rate: float
+
+
+class SkillFrequencyResponse(BaseModel):
+    skills: List[SkillFrequencyItem]
+    count: int
+    cached: bool
+    generated_at: str
+
+
 class ModelStatsResponse(BaseModel):
     """Model training statistics"""
     model_type: str
@@ -78,52 +251,127 @@ class ModelStatsResponse(BaseModel):
     last_trained: Optional[str]
     accuracy: Optional[float]
     features_used: List[str]
+    bundle_version: Optional[str] = None
+    cache: Optional[Dict[str, Any]] = None
 
 
-# Startup event - Load and train models
-@app.on_event("startup")
-async def startup_event():
-    """Initialize ML models on service startup"""
-    global success_predictor, skill_analyzer
+def preload_models() -> bool:
+    """
+    Load the latest bundle synchronously
 
-    logger.info("🚀 Starting Prediction Service...")
+    Used by serve.py in the parent process before forking workers, so every
+    worker starts with the models already in memory.
+    """
+    global active_models
 
     try:
-        # Test database connection
-        conn = get_db_connection()
-        conn.close()
-        logger.info("✅ Database connection successful")
+        loaded = artifact_store.load_latest()
+    except Exception as e:
+        logger.error(f"❌ Error loading model bundle: {str(e)}")
+        loaded = None
 
-        # Load training data
-        logger.info("📊 Loading training data from database...")
-        training_data = get_training_data()
+    if not loaded:
+        return False
 
-        if training_data is not None and len(training_data) > 0:
-            logger.info(f"📈 Loaded {len(training_data)} training samples")
+    predictor, analyzer, manifest = loaded
+    active_models = ActiveModels(predictor, analyzer, manifest['version'])
+    clear_response_caches()
+    metrics.record_serving_model(predictor.training_samples, predictor.accuracy)
+    logger.info(f"📦 Loaded model bundle {manifest['version']} ({manifest['metrics']['training_samples']} samples)")
+    return True
 
-            # Initialize and train success predictor
-            logger.info("🤖 Training Interview Success Predictor...")
-            success_predictor = InterviewSuccessPredictor()
-            success_predictor.train(training_data)
-            logger.info("✅ Success Predictor trained")
 
-            # Initialize skill gap analyzer
-            logger.info("🎯 Initializing Skill Gap Analyzer...")
-            skill_analyzer = SkillGapAnalyzer()
-            skill_analyzer.fit(training_data)
-            logger.info("✅ Skill Gap Analyzer ready")
+async def watch_bundles():
+    """
+    Swap in bundles written by other processes
 
-        else:
-            logger.warning("⚠️  No training data available. Models will use fallback logic.")
-            success_predictor = InterviewSuccessPredictor()
-            skill_analyzer = SkillGapAnalyzer()
+    With several workers only one of them trains; the rest notice the new
+    LATEST pointer here and load it (each worker unpickles its own copy of
+    the estimators; only the flat-forest arrays are shared page cache).
+    """
+    failed_versions = set()
+    while True:
+        await asyncio.sleep(BUNDLE_WATCH_INTERVAL_SECONDS)
+        latest = None
+        try:
+            latest = await asyncio.to_thread(artifact_store.latest_version)
+            if latest and latest != active_models.bundle_version and latest not in failed_versions:
+                await install_bundle({'bundle_version': latest})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            failed_versions.add(latest)
+            logger.error(f"❌ Could not load model bundle {latest}: {str(e)}")
+
+
+async def refresh_skill_summary_periodically():
+    """
+    Keep the skill frequency summary current off the request path
 
-    except Exception as e:
-        logger.error(f"❌ Error during startup: {str(e)}")
-        # Don't fail startup - use fallback models
-        success_predictor = InterviewSuccessPredictor()
-        skill_analyzer = SkillGapAnalyzer()
-        logger.info("⚠️  Using fallback prediction models")
+    Each refresh only reprocesses posts changed or deleted since the last
+    one; /api/analytics/skill-frequency just reads the summary.
+    """
+    while True:
+        try:
+            changed = await database.refresh_skill_frequency_summary_async()
+            if changed:
+                logger.info(f"Refreshed skill frequency summary ({changed} posts)")
+        except asyncio.CancelledError:
+            raise
+        except (psycopg2.errors.UndefinedTable, psycopg2.errors.UndefinedFunction):
+            logger.warning("Skill frequency summary not installed, not refreshing it")
+            return
+        except Exception as e:
+            logger.error(f"❌ Skill frequency summary refresh failed: {str(e)}")
+        await asyncio.sleep(SKILL_SUMMARY_REFRESH_INTERVAL_SECONDS)
+
+
+# Startup event - Load models, training in the background if needed
+@app.on_event("startup")
+async def startup_event():
+    """Initialize ML models on service startup"""
+    global bundle_watcher, skill_summary_refresher
+
+    logger.info(f"🚀 Starting Prediction Service (worker {WORKER_ID})...")
+    training_jobs.start()
+
+    if await database.ping_async():
+        logger.info("✅ Database connection successful")
+    else:
+        logger.warning("⚠️  Database unreachable, serving from persisted models only")
+
+    bundle_watcher = asyncio.create_task(watch_bundles())
+    if WORKER_ID == 0:
+        skill_summary_refresher = asyncio.create_task(refresh_skill_summary_periodically())
+
+    # Prefer the latest persisted bundle (possibly preloaded before fork); only train when there is none
+    if active_models.bundle_version:
+        metrics.record_serving_model(active_models.predictor.training_samples, active_models.predictor.accuracy)
+        return
+    if await asyncio.to_thread(preload_models):
+        return
+
+    # Don't block startup - serve fallback models until training finishes.
+    # With several workers only the first trains; the others pick the bundle up
+    if WORKER_ID == 0:
+        logger.info("⚠️  No model bundle found, using fallback models while training in the background")
+        try:
+            training_jobs.submit(reason='startup', mode=FULL)
+        except RuntimeError as e:
+            logger.warning(f"⚠️  Startup training not started: {str(e)}")
+    else:
+        logger.info("⚠️  No model bundle found, using fallback models until worker 0 finishes training")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the training process and close pooled connections"""
+    if bundle_watcher:
+        bundle_watcher.cancel()
+    if skill_summary_refresher:
+        skill_summary_refresher.cancel()
+    training_jobs.shutdown()
+    database.pool.close()
 
 
 @app.get("/")
@@ -136,8 +384,18 @@ async def root():
         "endpoints": {
             "health": "/health",
             "predict": "/api/predict/interview-success",
+            "predict_batch": "/api/predict/interview-success/batch",
+            "predict_what_if": "/api/predict/what-if",
             "skill_gap": "/api/analyze/skill-gap",
-            "stats": "/api/models/stats"
+            "skill_frequency": "/api/analytics/skill-frequency",
+            "feature_refresh": "/api/features/refresh",
+            "stats": "/api/models/stats",
+            "retrain": "/api/models/retrain",
+            "training_jobs": "/api/models/jobs",
+            "post_counts": "/api/data/posts",
+            "db_pool": "/api/db/pool",
+            "metrics": "/metrics",
+            "profiles": "/admin/profiles"
         }
     }
 
@@ -145,16 +403,34 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    models = active_models
+    training = training_jobs.active
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "models": {
-            "success_predictor": "loaded" if success_predictor and success_predictor.is_trained else "not_trained",
-            "skill_analyzer": "loaded" if skill_analyzer else "not_loaded"
-        }
+            "success_predictor": "loaded" if models.predictor and models.predictor.is_trained else "not_trained",
+            "skill_analyzer": "loaded" if models.analyzer else "not_loaded"
+        },
+        "bundle_version": models.bundle_version,
+        "worker_id": WORKER_ID,
+        "training_job": training.to_dict() if training else None,
+        "database_pool": database.pool.stats()
     }
 
 
+@app.get("/api/db/pool")
+async def db_pool_stats():
+    """Connection pool utilisation"""
+    return database.pool.stats()
+
+
+@app.get("/api/data/posts")
+async def post_counts():
+    """Scraped post counts and average confidence by outcome"""
+    return await database.get_scraped_posts_count_async()
+
+
 @app.post("/api/predict/interview-success", response_model=InterviewPredictionResponse)
 async def predict_interview_success(request: InterviewPredictionRequest):
     """
@@ -163,30 +439,145 @@ async def predict_interview_success(request: InterviewPredictionRequest):
     Uses trained ML model to predict the likelihood of interview success
     based on interview characteristics.
     """
-    if not success_predictor:
+    models = active_models
+    if not models.predictor:
         raise HTTPException(status_code=503, detail="Prediction model not available")
 
+    # The model gets the same canonical topics as the cache key, so a hit is
+    # what a fresh call returns. Order and case don't matter to the keyword
+    # features, but repeats and blank entries are dropped: technology_count,
+    # topics_covered and the >= 5 / < 3 topic thresholds count distinct topics
+    topics = canonical_terms(request.interview_topics)
+    key = (
+        models.bundle_version,
+        request.company.strip() if request.company else None,
+        request.role.strip() if request.role else None,
+        request.experience_level,
+        tuple(topics),
+        request.preparation_time_weeks
+    )
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
         logger.info(f"🔮 Predicting success for: company={request.company}, role={request.role}")
 
         # Make prediction
-        result = success_predictor.predict(
-            company=request.company,
-            role=request.role,
+        result = models.predictor.predict(
+            company=key[1],
+            role=key[2],
             experience_level=request.experience_level,
-            interview_topics=request.interview_topics,
+            interview_topics=topics,
             preparation_time_weeks=request.preparation_time_weeks
         )
 
         logger.info(f"✅ Prediction: {result['success_probability']:.2f} probability")
 
-        return InterviewPredictionResponse(**result)
+        response = InterviewPredictionResponse(**result)
+        prediction_cache.set(key, response)
+        return response
 
     except Exception as e:
         logger.error(f"❌ Prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+@app.post("/api/predict/interview-success/batch", response_model=BatchInterviewPredictionResponse)
+async def predict_interview_success_batch(request: BatchInterviewPredictionRequest):
+    """
+    Predict interview success for many profiles at once
+
+    Features for every profile are built together and scored with a single
+    model call; results come back in request order.
+    """
+    models = active_models
+    if not models.predictor:
+        raise HTTPException(status_code=503, detail="Prediction model not available")
+
+    try:
+        logger.info(f"🔮 Batch predicting success for {len(request.requests)} profiles")
+
+        # Same canonical company, role and topics as the single-profile endpoint,
+        # so a profile scores the same whichever endpoint it goes through
+        profiles = [
+            {
+                **item.model_dump(),
+                'company': item.company.strip() if item.company else None,
+                'role': item.role.strip() if item.role else None,
+                'interview_topics': canonical_terms(item.interview_topics)
+            }
+            for item in request.requests
+        ]
+        results = models.predictor.predict_batch(profiles)
+
+        return BatchInterviewPredictionResponse(
+            predictions=[InterviewPredictionResponse(**result) for result in results],
+            count=len(results)
+        )
+
+    except Exception as e:
+        logger.error(f"❌ Batch prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+
+@app.post("/api/predict/what-if", response_model=WhatIfResponse)
+async def predict_what_if(request: WhatIfRequest):
+    """
+    Interview success sensitivity to preparation time, extra topics and company
+
+    Scores every combination of the requested values in one vectorized call
+    instead of one prediction request per combination. The first entry of
+    each axis is the base value, so probabilities[0][0][0] is the base profile.
+    """
+    models = active_models
+    if not models.predictor:
+        raise HTTPException(status_code=503, detail="Prediction model not available")
+
+    base = request.base
+    base_company = base.company.strip() if base.company else None
+    base_topics = canonical_terms(base.interview_topics)
+
+    # Base value first on every axis, repeats dropped
+    companies = list(dict.fromkeys([base_company] + [c.strip() if c else None for c in request.companies]))
+    extra_topics = [t for t in canonical_terms(request.extra_topics) if t not in base_topics]
+    weeks = list(dict.fromkeys([base.preparation_time_weeks] + request.preparation_time_weeks))
+    topic_sets = [base_topics] + [base_topics + [topic] for topic in extra_topics]
+
+    cells = len(companies) * len(topic_sets) * len(weeks)
+    if cells > WHAT_IF_MAX_CELLS:
+        raise HTTPException(status_code=400, detail=f"Grid has {cells} cells, the limit is {WHAT_IF_MAX_CELLS}")
+
+    try:
+        logger.info(f"🔮 What-if grid of {cells} cells for: company={base_company}, role={base.role}")
+
+        result = models.predictor.predict_grid(
+            companies,
+            topic_sets,
+            weeks,
+            role=base.role.strip() if base.role else None,
+            experience_level=base.experience_level
+        )
+        probabilities = result['probabilities'].round(4)
+
+        return WhatIfResponse(
+            axes={
+                'company': companies,
+                'extra_topic': [None] + extra_topics,
+                'preparation_time_weeks': weeks
+            },
+            probabilities=probabilities.tolist(),
+            base_probability=float(probabilities[0, 0, 0]),
+            confidence=float(result['confidence']),
+            source=result['source'],
+            cells=cells
+        )
+
+    except Exception as e:
+        logger.error(f"❌ What-if prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"What-if prediction failed: {str(e)}")
+
+
 @app.post("/api/analyze/skill-gap", response_model=SkillGapResponse)
 async def analyze_skill_gap(request: SkillGapRequest):
     """
@@ -195,92 +586,235 @@ async def analyze_skill_gap(request: SkillGapRequest):
     Compares user's current skills with requirements for target role
     and provides personalized learning recommendations.
     """
-    if not skill_analyzer:
+    models = active_models
+    if not models.analyzer:
         raise HTTPException(status_code=503, detail="Skill analyzer not available")
 
+    # The analyzer lowercases skills and normalizes role and company names,
+    # so canonically equal requests get identical results
+    user_skills = canonical_terms(request.user_skills)
+    target_companies = canonical_terms(request.target_companies) or None
+    key = (
+        models.bundle_version,
+        normalize_role(request.target_role),
+        tuple(user_skills),
+        tuple(target_companies or ())
+    )
+    cached = skill_gap_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
         logger.info(f"🎯 Analyzing skill gap for role: {request.target_role}")
 
         # Perform analysis
-        result = skill_analyzer.analyze(
-            user_skills=request.user_skills,
+        result = models.analyzer.analyze(
+            user_skills=user_skills,
             target_role=request.target_role,
-            target_companies=request.target_companies
+            target_companies=target_companies
         )
 
         logger.info(f"✅ Found {len(result['missing_skills'])} skill gaps")
 
-        return SkillGapResponse(**result)
+        response = SkillGapResponse(**result)
+        skill_gap_cache.set(key, response)
+        return response
 
     except Exception as e:
         logger.error(f"❌ Skill gap analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+async def _run_feature_refresh(reason: str, lock_file):
+    started_at = datetime.utcnow().isoformat()
+    try:
+        result = await asyncio.to_thread(refresh_feature_store, active_models.predictor.feature_engine)
+        state = {'status': 'completed', 'reason': reason, 'started_at': started_at, 'worker_id': WORKER_ID, **result}
+    except Exception as e:
+        logger.error(f"❌ Feature store refresh failed: {str(e)}")
+        state = {'status': 'failed', 'reason': reason, 'started_at': started_at, 'worker_id': WORKER_ID, 'error': str(e)}
+    finally:
+        lock_file.close()
+    write_json(FEATURE_REFRESH_STATE_FILE, state)
+
+
+@app.post("/api/features/refresh", status_code=202)
+async def refresh_features(reason: str = 'api'):
+    """
+    Featurize new and changed posts into the feature store
+
+    Called after ingestion so retraining only has to fit models. Runs in the
+    background; a refresh that is already running absorbs the request.
+    """
+    global feature_refresh_task
+
+    lock_file = try_lock(FEATURE_REFRESH_LOCK_FILE)
+    if lock_file is None:
+        return {"status": "already_running"}
+
+    feature_refresh_task = asyncio.create_task(_run_feature_refresh(reason, lock_file))
+    return {"status": "started"}
+
+
+@app.get("/api/features/refresh")
+async def feature_refresh_status():
+    """Whether a feature store refresh is running, and how the last one went"""
+    return {
+        "running": is_locked(FEATURE_REFRESH_LOCK_FILE),
+        "last": read_json(FEATURE_REFRESH_STATE_FILE)
+    }
+
+
+@app.get("/api/analytics/skill-frequency", response_model=SkillFrequencyResponse)
+async def skill_frequency(
+    limit: int = Query(100, ge=1, le=1000),
+    min_total: int = Query(1, ge=1)
+):
+    """
+    Skill mention counts and success rates across labelled posts
+
+    Served from the Postgres skill frequency summary (refreshed in the
+    background every SKILL_SUMMARY_REFRESH_INTERVAL_SECONDS) and cached
+    in-process for SKILL_FREQUENCY_CACHE_TTL_SECONDS.
+    """
+    key = (limit, min_total)
+    cached = skill_frequency_cache.get(key)
+    if cached is not None:
+        return SkillFrequencyResponse(**cached, cached=True)
+
+    df = await database.get_skill_frequency_data_async(min_total=min_total, limit=limit)
+    skills = df.to_dict('records')
+    result = {
+        'skills': skills,
+        'count': len(skills),
+        'generated_at': datetime.utcnow().isoformat()
+    }
+    # Don't cache failures (empty results from an unreachable database)
+    if skills:
+        skill_frequency_cache.set(key, result)
+
+    return SkillFrequencyResponse(**result, cached=False)
+
+
 @app.get("/api/models/stats", response_model=List[ModelStatsResponse])
 async def get_model_stats():
     """Get statistics about trained models"""
     stats = []
+    models = active_models
 
-    if success_predictor:
+    if models.predictor:
         stats.append(ModelStatsResponse(
             model_type="InterviewSuccessPredictor",
-            training_samples=success_predictor.training_samples,
-            last_trained=success_predictor.last_trained,
-            accuracy=success_predictor.accuracy,
-            features_used=success_predictor.feature_names
+            training_samples=models.predictor.training_samples,
+            last_trained=models.predictor.last_trained,
+            accuracy=models.predictor.accuracy,
+            features_used=models.predictor.feature_names,
+            bundle_version=models.bundle_version,
+            cache=prediction_cache.stats()
         ))
 
-    if skill_analyzer:
+    if models.analyzer:
         stats.append(ModelStatsResponse(
             model_type="SkillGapAnalyzer",
-            training_samples=skill_analyzer.training_samples,
-            last_trained=skill_analyzer.last_trained,
+            training_samples=models.analyzer.training_samples,
+            last_trained=models.analyzer.last_trained,
             accuracy=None,  # Not applicable for skill analyzer
-            features_used=skill_analyzer.feature_names
+            features_used=models.analyzer.feature_names,
+            bundle_version=models.bundle_version,
+            cache=skill_gap_cache.stats()
         ))
 
     return stats
 
 
-@app.post("/api/models/retrain")
-async def retrain_models():
+@app.post("/api/models/retrain", status_code=202)
+async def retrain_models(mode: str = FULL, profile: bool = False):
     """
     Retrain models with latest data
 
-    Useful when new training data has been collected.
+    Useful when new training data has been collected. Training runs in a
+    background process; the current models keep serving until the new bundle
+    is ready and swapped in. Poll /api/models/jobs/{job_id} for progress.
+
+    mode=full (default) rebuilds from scratch and reruns the model selection
+    sweep. mode=incremental is opt-in: it only reads posts scraped since the
+    last bundle and reuses its cached features and selected model family.
+    Relabelled, edited or deleted posts keep their scraped_at (or are gone),
+    so they only reach the models through mode=full.
+    profile=true samples the whole run; the profile is listed under
+    /admin/profiles once the job finishes.
     """
-    global success_predictor, skill_analyzer
+    if mode not in TRAINING_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(TRAINING_MODES)}")
 
     try:
-        logger.info("🔄 Retraining models with latest data...")
+        job, started = training_jobs.submit(reason='api', mode=mode, profile=profile)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-        # Reload training data
-        training_data = get_training_data()
+    return {
+        "success": True,
+        "message": "Training job started" if started else "Training job already running",
+        "job": job.to_dict(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
 
-        if training_data is None or len(training_data) == 0:
-            raise HTTPException(status_code=400, detail="No training data available")
 
-        # Retrain success predictor
-        if success_predictor:
-            success_predictor.train(training_data)
-            logger.info("✅ Success Predictor retrained")
+@app.get("/api/models/jobs")
+async def list_training_jobs():
+    """Recent training jobs, newest first"""
+    return [job.to_dict() for job in training_jobs.list_jobs()]
 
-        # Refit skill analyzer
-        if skill_analyzer:
-            skill_analyzer.fit(training_data)
-            logger.info("✅ Skill Analyzer refitted")
 
-        return {
-            "success": True,
-            "message": "Models retrained successfully",
-            "training_samples": len(training_data),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+@app.get("/api/models/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """Status, stage and progress of a training job"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job.to_dict()
 
-    except Exception as e:
-        logger.error(f"❌ Retraining error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Retraining failed: {str(e)}")
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/admin/profiles")
+async def get_profiles():
+    """Saved retrain profiles and the sampled request profiles of this worker"""
+    return {
+        "request_sample_rate": PROFILE_SAMPLE_RATE,
+        "requests": request_profiles.stats(),
+        "saved": await asyncio.to_thread(list_profiles)
+    }
+
+
+@app.get("/admin/profiles/requests", response_class=PlainTextResponse)
+async def download_request_profile(endpoint: Optional[str] = None):
+    """Folded stacks of sampled requests (all endpoints, or one route template)"""
+    return PlainTextResponse(
+        request_profiles.folded(endpoint),
+        headers={"Content-Disposition": 'attachment; filename="requests.folded"'}
+    )
+
+
+@app.delete("/admin/profiles/requests")
+async def reset_request_profile():
+    """Discard the sampled request profiles"""
+    request_profiles.clear()
+    return {"success": True}
+
+
+@app.get("/admin/profiles/{name}")
+async def download_profile(name: str):
+    """Download a saved profile in folded-stack format (flamegraph.pl, speedscope)"""
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=os.path.basename(path))
 
 
 if __name__ == "__main__":
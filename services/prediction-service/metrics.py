@@ -0,0 +1,160 @@
+"""
+Prometheus metrics for the prediction service
+
+With several serve.py workers, set PROMETHEUS_MULTIPROC_DIR (serve.py does
+this itself) so /metrics aggregates every worker instead of whichever one
+answered the scrape.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+STAGE_SECONDS = Histogram(
+    'prediction_stage_duration_seconds',
+    'Time spent in each request stage',
+    ['stage'],
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+REQUEST_SECONDS = Histogram(
+    'prediction_request_duration_seconds',
+    'Request handling time per endpoint',
+    ['endpoint'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+ERRORS = Counter(
+    'prediction_errors_total',
+    'Requests that returned a 5xx response',
+    ['endpoint']
+)
+
+FALLBACKS = Counter(
+    'prediction_fallback_total',
+    'Work served by a fallback path instead of the primary one',
+    ['path']
+)
+
+TRAINING_SECONDS = Histogram(
+    'prediction_training_duration_seconds',
+    'Training job wall time',
+    ['mode', 'status'],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+)
+
+TRAINING_STAGE_SECONDS = Histogram(
+    'prediction_training_stage_duration_seconds',
+    'Time spent in each training stage',
+    ['stage'],
+    buckets=(0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+)
+
+TRAINING_SAMPLES = Gauge(
+    'prediction_training_samples',
+    'Samples the serving model was trained on',
+    multiprocess_mode='livemax'
+)
+
+TRAINING_NEW_SAMPLES = Gauge(
+    'prediction_training_new_samples',
+    'Posts read from the database by the last completed training job',
+    multiprocess_mode='livemax'
+)
+
+MODEL_ACCURACY = Gauge(
+    'prediction_model_accuracy',
+    'Hold-out accuracy of the serving model',
+    multiprocess_mode='livemax'
+)
+
+ENRICHMENT_POSTS = Counter(
+    'prediction_enrichment_posts_total',
+    'Posts processed by the enrichment worker',
+    ['status']
+)
+
+ENRICHMENT_STAGE_SECONDS = Histogram(
+    'prediction_enrichment_stage_duration_seconds',
+    'Time spent in each enrichment batch stage',
+    ['stage'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+
+ENRICHMENT_THROUGHPUT = Gauge(
+    'prediction_enrichment_posts_per_second',
+    'Posts per second over the last enrichment batch',
+    multiprocess_mode='livemax'
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time a block and record it in the per-stage histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def record_fallback(path: str):
+    FALLBACKS.labels(path=path).inc()
+
+
+def record_training_job(mode: str, status: str, duration_seconds: float, result: Optional[Dict[str, Any]] = None):
+    """Record a finished training job (stage timings and fallbacks come back in its result)"""
+    TRAINING_SECONDS.labels(mode=mode, status=status).observe(duration_seconds)
+    if not result:
+        return
+    for stage, seconds in result.get('stage_seconds', {}).items():
+        TRAINING_STAGE_SECONDS.labels(stage=stage).observe(seconds)
+    for path in result.get('fallbacks', []):
+        record_fallback(path)
+    if result.get('new_samples') is not None:
+        TRAINING_NEW_SAMPLES.set(result['new_samples'])
+
+
+def record_enrichment_batch(result: Dict[str, Any]):
+    """Record one enrichment worker batch (see EnrichmentWorker.run_batch)"""
+    for stage, seconds in result.get('stage_seconds', {}).items():
+        ENRICHMENT_STAGE_SECONDS.labels(stage=stage).observe(seconds)
+    ENRICHMENT_POSTS.labels(status='enriched').inc(result.get('enriched', 0))
+    ENRICHMENT_POSTS.labels(status='failed').inc(result.get('failed', 0))
+    if result.get('posts_per_second') is not None:
+        ENRICHMENT_THROUGHPUT.set(result['posts_per_second'])
+
+
+def record_serving_model(training_samples: Optional[int], accuracy: Optional[float]):
+    """Gauges describing the model currently being served"""
+    TRAINING_SAMPLES.set(training_samples or 0)
+    MODEL_ACCURACY.set(accuracy or 0.0)
+
+
+def render() -> tuple:
+    """(body, content type) for the /metrics endpoint"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Drop a dead worker's live gauges (called by the serve.py parent)"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
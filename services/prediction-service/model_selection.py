@@ -0,0 +1,264 @@
+"""
+Model selection sweep for the interview success predictor
+Cross-validates a small grid of classifiers in parallel worker processes and
+picks the best one by a configurable metric
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier
+)
+from sklearn.model_selection import StratifiedKFold, cross_validate, train_test_split
+
+logger = logging.getLogger(__name__)
+
+# Off by default: a sweep costs candidates x folds fits on top of the final
+# one. Turn it on for the occasional full rebuild; incremental runs keep
+# refitting the pick it stored in the bundle (reuse_selection)
+SWEEP_ENABLED = os.getenv('MODEL_SWEEP_ENABLED', 'false').lower() == 'true'
+
+# Comma-separated candidate families (keys of CANDIDATE_GRID)
+SWEEP_CANDIDATES = [
+    c.strip() for c in os.getenv(
+        'MODEL_SWEEP_CANDIDATES', 'random_forest,extra_trees,gradient_boosting,hist_gradient_boosting'
+    ).split(',') if c.strip()
+]
+
+# Any sklearn scorer name, e.g. roc_auc, f1, accuracy, balanced_accuracy
+SWEEP_METRIC = os.getenv('MODEL_SWEEP_METRIC', 'roc_auc')
+SWEEP_FOLDS = int(os.getenv('MODEL_SWEEP_FOLDS', '3'))
+SWEEP_WORKERS = int(os.getenv('MODEL_SWEEP_WORKERS', str(os.cpu_count() or 1)))
+
+# Training rows cross-validated per candidate (a stratified subsample; 0 for
+# all). Bounds sweep time on large corpora; the final fit still uses every row
+SWEEP_MAX_ROWS = int(os.getenv('MODEL_SWEEP_MAX_ROWS', '5000'))
+
+# Wall-clock budget for the whole sweep; candidates still running when it is
+# spent are dropped (0 for no limit)
+SWEEP_BUDGET_SECONDS = float(os.getenv('MODEL_SWEEP_BUDGET_SECONDS', '60'))
+
+# Cores for the final fit of estimators that take n_jobs (the forests);
+# candidates inside a sweep stay single-threaded, they run in parallel already
+FIT_JOBS = int(os.getenv('MODEL_FIT_JOBS', '-1'))
+
+RANDOM_STATE = 42
+
+# Families that can't fit sparse input (the hashed text block)
+DENSE_ONLY = {'hist_gradient_boosting'}
+
+# The first random_forest entry is the original production configuration
+BASELINE = ('random_forest', {'n_estimators': 100, 'max_depth': 10, 'min_samples_split': 10, 'class_weight': 'balanced'})
+
+CANDIDATE_GRID = {
+    'random_forest': (RandomForestClassifier, [
+        BASELINE[1],
+        {'n_estimators': 200, 'max_depth': 16, 'min_samples_leaf': 2, 'class_weight': 'balanced'}
+    ]),
+    'extra_trees': (ExtraTreesClassifier, [
+        {'n_estimators': 200, 'max_depth': 16, 'min_samples_leaf': 2, 'class_weight': 'balanced'}
+    ]),
+    'gradient_boosting': (GradientBoostingClassifier, [
+        {'n_estimators': 150, 'max_depth': 3, 'learning_rate': 0.1, 'subsample': 0.8}
+    ]),
+    'hist_gradient_boosting': (HistGradientBoostingClassifier, [
+        {'max_iter': 200, 'learning_rate': 0.1, 'max_leaf_nodes': 31, 'class_weight': 'balanced'},
+        {'max_iter': 300, 'learning_rate': 0.05, 'max_leaf_nodes': 15, 'l2_regularization': 1.0, 'class_weight': 'balanced'}
+    ])
+}
+
+
+def build_estimator(family: str, params: Dict[str, Any]):
+    """Unfitted estimator for a candidate"""
+    estimator_cls, _ = CANDIDATE_GRID[family]
+    return estimator_cls(random_state=RANDOM_STATE, **params)
+
+
+def baseline_estimator():
+    return build_estimator(*BASELINE)
+
+
+def sweep_candidates(families: Optional[List[str]] = None, sparse_input: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
+    candidates = []
+    for family in families or SWEEP_CANDIDATES:
+        if family not in CANDIDATE_GRID:
+            logger.warning(f"⚠️  Unknown model sweep candidate '{family}', skipping")
+            continue
+        if sparse_input and family in DENSE_ONLY:
+            logger.info(f"Model sweep candidate '{family}' does not accept sparse features, skipping")
+            continue
+        candidates.extend((family, params) for params in CANDIDATE_GRID[family][1])
+    return candidates
+
+
+def _evaluate_candidate(
+    family: str,
+    params: Dict[str, Any],
+    features_path: str,
+    labels_path: str,
+    folds: int,
+    metric: str
+) -> Dict[str, Any]:
+    """Cross-validate one candidate (runs in a worker process)"""
+    started = time.perf_counter()
+    X = sparse.load_npz(features_path) if features_path.endswith('.npz') else np.load(features_path, mmap_mode='r')
+    y = np.load(labels_path, mmap_mode='r')
+
+    scoring = {metric: metric, 'accuracy': 'accuracy'}
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=RANDOM_STATE)
+    scores = cross_validate(build_estimator(family, params), X, y, cv=cv, scoring=scoring)
+
+    return {
+        'family': family,
+        'params': params,
+        'score': float(np.mean(scores[f'test_{metric}'])),
+        'score_std': float(np.std(scores[f'test_{metric}'])),
+        'accuracy': float(np.mean(scores['test_accuracy'])),
+        'fit_seconds': float(np.sum(scores['fit_time'])),
+        'wall_seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def reuse_selection(previous: Optional[Dict[str, Any]]) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Unfitted estimator for the candidate an earlier sweep selected
+
+    Incremental retrains refit this instead of running select_model again;
+    the sweep only runs on full rebuilds.
+
+    Args:
+        previous: Sweep report of the bundle being extended. Without a
+            selection (sweep disabled or skipped), or if its family is no
+            longer in CANDIDATE_GRID, the baseline forest is used
+
+    Returns:
+        (unfitted estimator, report carrying the selection forward)
+    """
+    previous = previous or {}
+    selected = previous.get('selected')
+    if selected and selected['family'] in CANDIDATE_GRID:
+        logger.info(f"Reusing model selection {selected['family']} {selected['params']} without a sweep")
+        return build_estimator(selected['family'], selected['params']), {
+            'metric': previous.get('metric'),
+            'folds': previous.get('folds'),
+            'candidates': [],
+            'selected': selected,
+            'reused': True
+        }
+
+    if selected:
+        logger.warning(f"⚠️  Previously selected model family '{selected['family']}' is unknown, using baseline random forest")
+    return baseline_estimator(), {'candidates': [], 'selected': None, 'reused': True}
+
+
+def select_model(
+    X: np.ndarray,
+    y: np.ndarray,
+    families: Optional[List[str]] = None,
+    metric: str = SWEEP_METRIC,
+    folds: int = SWEEP_FOLDS,
+    workers: int = SWEEP_WORKERS,
+    max_rows: int = SWEEP_MAX_ROWS,
+    budget_seconds: float = SWEEP_BUDGET_SECONDS
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Cross-validate every candidate in parallel and return the best
+
+    The training matrix is written once to a temporary .npy file that each
+    worker memory-maps, so it is not pickled per candidate (sparse matrices
+    with the hashed text block go to a .npz file each worker loads).
+
+    Args:
+        X: Training features (the hold-out test split must not be included)
+        y: Training labels
+        families: Candidate families (defaults to MODEL_SWEEP_CANDIDATES)
+        metric: sklearn scorer used to rank candidates
+        folds: Cross-validation folds
+        workers: Worker processes
+        max_rows: Cross-validate on a stratified subsample of this many rows (0 for all)
+        budget_seconds: Drop candidates not finished this long after the
+            sweep starts (0 for no limit)
+
+    Returns:
+        (unfitted best estimator, sweep report). Falls back to the baseline
+        forest when there is too little data to cross-validate or every
+        candidate fails.
+    """
+    candidates = sweep_candidates(families, sparse_input=sparse.issparse(X))
+    report: Dict[str, Any] = {'metric': metric, 'folds': folds, 'candidates': [], 'selected': None}
+
+    if max_rows and len(y) > max_rows:
+        X, _, y, _ = train_test_split(X, y, train_size=max_rows, random_state=RANDOM_STATE, stratify=y)
+        report['subsampled_rows'] = max_rows
+
+    class_counts = np.bincount(np.asarray(y, dtype=np.int64), minlength=2)
+    if not candidates or class_counts.min() < folds:
+        report['skipped'] = 'too few samples per class for cross-validation' if candidates else 'no candidates'
+        logger.info(f"Model sweep skipped ({report['skipped']}), using baseline random forest")
+        return baseline_estimator(), report
+
+    started = time.perf_counter()
+    tmp_dir = tempfile.mkdtemp(prefix='model-sweep-')
+    try:
+        labels_path = os.path.join(tmp_dir, 'y.npy')
+        if sparse.issparse(X):
+            features_path = os.path.join(tmp_dir, 'X.npz')
+            sparse.save_npz(features_path, X.tocsr())
+        else:
+            features_path = os.path.join(tmp_dir, 'X.npy')
+            np.save(features_path, np.ascontiguousarray(X, dtype=np.float32))
+        np.save(labels_path, np.asarray(y, dtype=np.int8))
+
+        deadline = started + budget_seconds if budget_seconds else None
+        pool = ProcessPoolExecutor(max_workers=max(1, min(workers, len(candidates))))
+        try:
+            futures = [
+                (family, params, pool.submit(_evaluate_candidate, family, params, features_path, labels_path, folds, metric))
+                for family, params in candidates
+            ]
+            for family, params, future in futures:
+                try:
+                    timeout = max(0.0, deadline - time.perf_counter()) if deadline else None
+                    result = future.result(timeout=timeout)
+                except FuturesTimeoutError:
+                    future.cancel()
+                    logger.warning(f"⚠️  Model sweep candidate {family} {params} dropped: over the {budget_seconds:.0f}s budget")
+                    result = {'family': family, 'params': params, 'error': 'time budget exceeded'}
+                except Exception as e:
+                    logger.error(f"❌ Model sweep candidate {family} {params} failed: {str(e)}")
+                    result = {'family': family, 'params': params, 'error': str(e)}
+                report['candidates'].append(result)
+                if 'score' in result:
+                    logger.info(
+                        f"   {family} {params}: {metric}={result['score']:.4f}±{result['score_std']:.4f} "
+                        f"accuracy={result['accuracy']:.4f} ({result['wall_seconds']:.1f}s)"
+                    )
+        finally:
+            # Candidates still running past the budget finish in the background and are ignored
+            pool.shutdown(wait=False, cancel_futures=True)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    report['wall_seconds'] = round(time.perf_counter() - started, 3)
+
+    scored = [c for c in report['candidates'] if 'score' in c]
+    if not scored:
+        logger.warning("⚠️  Every model sweep candidate failed, using baseline random forest")
+        return baseline_estimator(), report
+
+    best = max(scored, key=lambda c: c['score'])
+    report['selected'] = {'family': best['family'], 'params': best['params'], 'score': best['score']}
+    logger.info(f"✅ Model sweep selected {best['family']} ({metric}={best['score']:.4f}) in {report['wall_seconds']:.1f}s")
+
+    return build_estimator(best['family'], best['params']), report
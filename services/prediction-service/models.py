@@ -5,14 +5,20 @@ Implements classification models and skill gap analysis
 
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
 import json
+import threading
+from collections import Counter
+
+from features import TEXT_HASHING_ENABLED, FeatureLayout, KeywordFeatureEngine, TextHashingEngine
+from forest_engine import FLAT_FOREST_ENABLED, FlatForest, compile_forest
+from metrics import record_fallback, stage_timer
+from model_selection import FIT_JOBS, SWEEP_ENABLED, baseline_estimator, reuse_selection, select_model
+from skill_index import SkillIndex, normalize_role
 
 logger = logging.getLogger(__name__)
 
@@ -21,12 +27,21 @@ class InterviewSuccessPredictor:
     """
     ML model to predict interview success probability
 
-    Uses Random Forest classifier trained on historical interview data
+    Uses the classifier chosen by the model selection sweep (Random Forest
+    baseline) trained on historical interview data
     """
 
+    # Companies the rule-based fallback treats as harder to get into
+    TOP_TIER_COMPANIES = ('google', 'meta', 'amazon', 'microsoft', 'apple')
+
     def __init__(self):
-        self.model: Optional[RandomForestClassifier] = None
-        self.vectorizer: Optional[TfidfVectorizer] = None
+        self.model: Optional[Any] = None
+        self.model_selection: Optional[Dict[str, Any]] = None
+        # Flat-array copy of a forest model used for scoring (FLAT_FOREST_ENABLED)
+        self.flat_forest: Optional[FlatForest] = None
+        # Hashed text block after the keyword features (TEXT_HASHING_ENABLED);
+        # a loaded bundle restores the setting it was trained with
+        self.text_hashing: Optional[TextHashingEngine] = TextHashingEngine() if TEXT_HASHING_ENABLED else None
         self.is_trained = False
         self.training_samples = 0
         self.accuracy: Optional[float] = None
@@ -46,6 +61,15 @@ class InterviewSuccessPredictor:
             'frontend', 'backend', 'fullstack', 'full stack'
         ]
 
+        self.feature_engine = KeywordFeatureEngine(self.tech_companies, self.tech_roles)
+        self.feature_layout: Optional[FeatureLayout] = None
+        self._buffers = threading.local()
+
+        # Training matrix of the last train() call (not restored from bundles)
+        self.training_features: Optional[Any] = None
+        self.training_labels: Optional[np.ndarray] = None
+        self.training_post_ids: Optional[np.ndarray] = None
+
     def train(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         Train the prediction model on scraped interview data
@@ -53,31 +77,72 @@ class InterviewSuccessPredictor:
         Args:
             df: DataFrame with columns: body_text, potential_outcome, metadata
 
+        Returns:
+            Training statistics
+        """
+        # Prepare features
+        X = self._extract_features(df)
+        y = (df['potential_outcome'] == 'positive').astype(np.int8).to_numpy()
+        post_ids = df['post_id'].astype(str).to_numpy() if 'post_id' in df.columns else None
+
+        return self.train_features(X, y, self._feature_names_for(df), post_ids)
+
+    def train_features(
+        self,
+        X: Any,
+        y: np.ndarray,
+        feature_names: List[str],
+        post_ids: Optional[np.ndarray] = None,
+        previous_selection: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Train on an already-extracted feature matrix
+
+        Used directly by incremental training, which combines the feature
+        cache of the previous bundle with features for newly scraped posts
+        instead of re-extracting the whole corpus.
+
+        Args:
+            X: float32 feature matrix with columns feature_names, then the
+                hashed text block if text hashing is on (sparse CSR)
+            y: 1 for positive outcomes, 0 for negative
+            feature_names: Column names of X
+            post_ids: Post id per row, kept with the features for the next incremental run
+            previous_selection: Sweep report of the bundle an incremental run
+                extends; its selected model is refit instead of sweeping
+
         Returns:
             Training statistics
         """
         try:
-            logger.info(f"Training with {len(df)} samples...")
+            logger.info(f"Training with {len(y)} samples...")
 
-            # Prepare features
-            X = self._extract_features(df)
-            y = (df['potential_outcome'] == 'positive').astype(int)
+            self.feature_names = list(feature_names)
+            self._build_layout()
 
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(
                 X, y, test_size=0.2, random_state=42, stratify=y
             )
 
-            # Train Random Forest model
-            self.model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                min_samples_split=10,
-                random_state=42,
-                class_weight='balanced'
-            )
-
+            # Pick the model family and hyperparameters on the training split only;
+            # incremental runs keep the previous bundle's pick rather than paying for candidates x folds fits
+            if previous_selection is not None:
+                self.model, self.model_selection = reuse_selection(previous_selection)
+            elif SWEEP_ENABLED:
+                self.model, self.model_selection = select_model(X_train, y_train)
+            else:
+                self.model, self.model_selection = baseline_estimator(), None
+
+            # Forests fit on every core; serving then scores a handful of rows per
+            # call, where a thread pool per call would only add overhead
+            parallel = 'n_jobs' in self.model.get_params()
+            if parallel:
+                self.model.set_params(n_jobs=FIT_JOBS)
             self.model.fit(X_train, y_train)
+            if parallel:
+                self.model.set_params(n_jobs=None)
+            self.flat_forest = compile_forest(self.model) if FLAT_FOREST_ENABLED else None
 
             # Evaluate
             y_pred = self.model.predict(X_test)
@@ -87,9 +152,14 @@ class InterviewSuccessPredictor:
             logger.info("\n" + classification_report(y_test, y_pred, target_names=['Negative', 'Positive']))
 
             self.is_trained = True
-            self.training_samples = len(df)
+            self.training_samples = len(y)
             self.last_trained = datetime.utcnow().isoformat()
 
+            # Kept so the bundle can carry a feature cache for incremental runs
+            self.training_features = X
+            self.training_labels = y
+            self.training_post_ids = post_ids
+
             return {
                 'success': True,
                 'training_samples': self.training_samples,
@@ -102,47 +172,53 @@ class InterviewSuccessPredictor:
             logger.error(f"Training error: {str(e)}")
             raise
 
-    def _extract_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Extract features from raw data"""
-        features = pd.DataFrame()
-
-        # Text length features
-        features['text_length'] = df['body_text'].str.len()
-        features['word_count'] = df.get('word_count', df['body_text'].str.split().str.len())
-
-        # Company features
-        for company in self.tech_companies:
-            features[f'mentions_{company}'] = df['body_text'].str.lower().str.contains(company, regex=False).astype(int)
-
-        # Role features
-        for role in self.tech_roles:
-            features[f'role_{role.replace(" ", "_")}'] = df['body_text'].str.lower().str.contains(role, regex=False).astype(int)
-
-        # Keyword features
-        positive_keywords = ['offer', 'accepted', 'hired', 'passed', 'success']
-        for keyword in positive_keywords:
-            features[f'pos_{keyword}'] = df['body_text'].str.lower().str.contains(keyword, regex=False).astype(int)
-
-        negative_keywords = ['rejected', 'failed', 'ghosted', 'denied']
-        for keyword in negative_keywords:
-            features[f'neg_{keyword}'] = df['body_text'].str.lower().str.contains(keyword, regex=False).astype(int)
-
-        # Metadata features (if available)
-        if 'metadata' in df.columns:
-            features['has_companies'] = df['metadata'].apply(
-                lambda x: len(x.get('companies', [])) if isinstance(x, dict) else 0
-            )
-            features['has_technologies'] = df['metadata'].apply(
-                lambda x: len(x.get('technologies', [])) if isinstance(x, dict) else 0
-            )
-
-        # Store feature names
-        self.feature_names = list(features.columns)
-
-        # Fill any NaN values
-        features = features.fillna(0)
+    def load_trained(
+        self,
+        model: Any,
+        feature_names: List[str],
+        metrics: Dict[str, Any],
+        text_features: Optional[Dict[str, Any]] = None,
+        flat_forest: Optional[FlatForest] = None
+    ):
+        """Restore a fitted model persisted in a model bundle (compiling the flat forest if it has none)"""
+        self.model = model
+        self.flat_forest = None
+        if FLAT_FOREST_ENABLED:
+            self.flat_forest = flat_forest if flat_forest is not None else compile_forest(model)
+        self.feature_names = list(feature_names)
+        self.text_hashing = TextHashingEngine.from_config(text_features)
+        self.accuracy = metrics.get('accuracy')
+        self.training_samples = metrics.get('training_samples', 0)
+        self.last_trained = metrics.get('last_trained')
+        self._build_layout()
+        self.is_trained = True
+
+    def _extract_features(self, df: pd.DataFrame) -> Any:
+        """
+        Extract features from raw data as a float32 matrix
 
-        return features
+        Columns are feature_names, followed by the hashed text block when
+        text hashing is on (the result is then sparse CSR).
+        """
+        X = self.feature_engine.transform_frame(df)
+        if self.text_hashing:
+            X = self.text_hashing.append_to(X, df['body_text'].tolist())
+        return X
+
+    def _feature_names_for(self, df: pd.DataFrame) -> List[str]:
+        return self.feature_engine.feature_names(self.feature_engine.has_metadata_columns(df))
+
+    def _row_buffer(self) -> np.ndarray:
+        """Per-thread (1, n_features) float32 buffer reused across single predictions"""
+        row = getattr(self._buffers, 'row', None)
+        if row is None or row.shape[1] != self.feature_layout.width:
+            row = np.zeros((1, self.feature_layout.width), dtype=np.float32)
+            self._buffers.row = row
+        return row
+
+    def _build_layout(self):
+        """Precompute request-to-slot mapping for the current feature_names"""
+        self.feature_layout = FeatureLayout(self.feature_engine, self.feature_names)
 
     def predict(
         self,
@@ -167,64 +243,232 @@ class InterviewSuccessPredictor:
         """
         # If model not trained, use rule-based fallback
         if not self.is_trained or self.model is None:
+            record_fallback('predictor_untrained')
             return self._fallback_prediction(company, role, experience_level, interview_topics, preparation_time_weeks)
 
         try:
-            # Create synthetic text for feature extraction
-            text_parts = []
-            if company:
-                text_parts.append(f"company {company}")
-            if role:
-                text_parts.append(f"role {role}")
-            if interview_topics:
-                text_parts.extend(interview_topics)
-
-            synthetic_text = " ".join(text_parts).lower()
-
-            # Create DataFrame for feature extraction
-            df_pred = pd.DataFrame({
-                'body_text': [synthetic_text],
-                'word_count': [len(synthetic_text.split())],
-                'metadata': [{'companies': [company] if company else [], 'technologies': interview_topics or []}]
-            })
+            with stage_timer('feature_build'):
+                # Create synthetic text for feature extraction
+                synthetic_text = self._synthetic_text(company, role, interview_topics)
+
+                # Map the request straight into the reusable row, in trained column order
+                row = self._row_buffer()
+                self.feature_layout.fill_row(
+                    row[0],
+                    synthetic_text,
+                    word_count=len(synthetic_text.split()),
+                    company_count=1 if company else 0,
+                    technology_count=len(interview_topics) if interview_topics else 0
+                )
+
+            # The text block stays sparse: one short synthetic text touches a few columns
+            if self.text_hashing:
+                with stage_timer('text_hashing'):
+                    row = self.text_hashing.append_to(row, [synthetic_text])
 
-            # Extract features
-            X_pred = self._extract_features(df_pred)
+            # Make prediction
+            with stage_timer('predict_proba'):
+                prob = self._predict_proba(row)[0][1]  # Probability of positive outcome
 
-            # Ensure all training features are present
-            for col in self.feature_names:
-                if col not in X_pred.columns:
-                    X_pred[col] = 0
+            return self._model_result(prob, company, role, experience_level, interview_topics, preparation_time_weeks)
 
-            X_pred = X_pred[self.feature_names]
+        except Exception as e:
+            logger.error(f"Prediction error: {str(e)}")
+            record_fallback('predictor_error')
+            return self._fallback_prediction(company, role, experience_level, interview_topics, preparation_time_weeks)
 
-            # Make prediction
-            prob = self.model.predict_proba(X_pred)[0][1]  # Probability of positive outcome
+    def predict_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Predict interview success for many profiles with one predict_proba call
+
+        Args:
+            requests: Dicts with the keyword arguments accepted by predict()
+
+        Returns:
+            One prediction result per request, in order. Items whose features
+            cannot be built, or every item if the model is unavailable or
+            scoring fails, get the rule-based fallback.
+        """
+        params = [
+            (r.get('company'), r.get('role'), r.get('experience_level'),
+             r.get('interview_topics') or [], r.get('preparation_time_weeks'))
+            for r in requests
+        ]
+
+        if not self.is_trained or self.model is None:
+            record_fallback('predictor_untrained')
+            return [self._fallback_prediction(*p) for p in params]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(params)
+        texts, company_counts, technology_counts, scored = [], [], [], []
+
+        for i, (company, role, experience_level, topics, weeks) in enumerate(params):
+            try:
+                texts.append(self._synthetic_text(company, role, topics))
+                company_counts.append(1 if company else 0)
+                technology_counts.append(len(topics))
+                scored.append(i)
+            except Exception as e:
+                logger.error(f"Batch item {i} feature error: {str(e)}")
+                record_fallback('predictor_error')
+                results[i] = self._fallback_prediction(*params[i])
+
+        if scored:
+            try:
+                with stage_timer('batch_feature_build'):
+                    X = np.empty((len(scored), self.feature_layout.width), dtype=np.float32)
+                    for row, text, companies, technologies in zip(X, texts, company_counts, technology_counts):
+                        self.feature_layout.fill_row(row, text, len(text.split()), companies, technologies)
+                    if self.text_hashing:
+                        X = self.text_hashing.append_to(X, texts)
+                with stage_timer('batch_predict_proba'):
+                    probs = self._predict_proba(X)[:, 1]
+
+                for i, prob in zip(scored, probs):
+                    results[i] = self._model_result(prob, *params[i])
+
+            except Exception as e:
+                logger.error(f"Batch prediction error: {str(e)}")
+                record_fallback('predictor_error')
+                for i in scored:
+                    results[i] = self._fallback_prediction(*params[i])
+
+        return results
+
+    def predict_grid(
+        self,
+        companies: List[Optional[str]],
+        topic_sets: List[List[str]],
+        preparation_weeks: List[Optional[int]],
+        role: Optional[str] = None,
+        experience_level: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Success probability for every combination of company, topics and preparation time
+
+        The model's features come from the company, role and topics only, so
+        one row per (company, topics) pair is built and scored in a single
+        predict_proba call, then broadcast along the preparation axis. The
+        rule-based fallback is evaluated over the whole grid with numpy.
+
+        Args:
+            companies: Company axis
+            topic_sets: Topic list axis
+            preparation_weeks: Preparation time axis
+            role: Target role shared by every cell
+            experience_level: Experience level shared by every cell
 
-            # Generate recommendations
+        Returns:
+            Dict with 'probabilities' (array of shape companies x topic_sets x
+            preparation_weeks), 'confidence' and 'source' ('model' or 'fallback')
+        """
+        shape = (len(companies), len(topic_sets), len(preparation_weeks))
+
+        if self.is_trained and self.model is not None:
+            try:
+                with stage_timer('grid_feature_build'):
+                    X = np.empty((shape[0] * shape[1], self.feature_layout.width), dtype=np.float32)
+                    texts = []
+                    for company in companies:
+                        for topics in topic_sets:
+                            text = self._synthetic_text(company, role, topics)
+                            self.feature_layout.fill_row(
+                                X[len(texts)], text, len(text.split()), 1 if company else 0, len(topics)
+                            )
+                            texts.append(text)
+                    if self.text_hashing:
+                        X = self.text_hashing.append_to(X, texts)
+                with stage_timer('grid_predict_proba'):
+                    probs = self._predict_proba(X)[:, 1].reshape(shape[0], shape[1], 1)
+
+                return {
+                    'probabilities': np.broadcast_to(probs, shape),
+                    'confidence': min(0.95, 0.5 + (self.training_samples / 1000) * 0.45),
+                    'source': 'model'
+                }
+
+            except Exception as e:
+                logger.error(f"Grid prediction error: {str(e)}")
+                record_fallback('predictor_error')
+        else:
+            record_fallback('predictor_untrained')
+
+        return {
+            'probabilities': self._fallback_probabilities(companies, topic_sets, preparation_weeks, experience_level),
+            'confidence': 0.6,
+            'source': 'fallback'
+        }
+
+    def _fallback_probabilities(
+        self,
+        companies: List[Optional[str]],
+        topic_sets: List[List[str]],
+        preparation_weeks: List[Optional[int]],
+        experience_level: Optional[str]
+    ) -> np.ndarray:
+        """_fallback_prediction's probability over a companies x topic_sets x preparation_weeks grid"""
+        top_tier = np.array([bool(c) and c.lower() in self.TOP_TIER_COMPANIES for c in companies])
+        many_topics = np.array([len(topics) >= 5 for topics in topic_sets])
+        weeks = np.array([w or 0 for w in preparation_weeks])
+
+        prob = (
+            0.5
+            - 0.1 * top_tier[:, None, None]
+            + 0.1 * many_topics[None, :, None]
+            + np.select([weeks >= 8, weeks >= 4], [0.15, 0.08], 0.0)[None, None, :]
+            + (0.05 if experience_level == 'senior' else 0.0)
+        )
+        return np.clip(prob, 0.0, 1.0)
+
+    def _predict_proba(self, X: Any) -> np.ndarray:
+        """Class probabilities, through the flat forest when the model has one"""
+        if self.flat_forest is not None:
+            return self.flat_forest.predict_proba(X)
+        return self.model.predict_proba(X)
+
+    def _synthetic_text(self, company: Optional[str], role: Optional[str], interview_topics: Optional[List[str]]) -> str:
+        """Text standing in for a post body when scoring a request"""
+        text_parts = []
+        if company:
+            text_parts.append(f"company {company}")
+        if role:
+            text_parts.append(f"role {role}")
+        if interview_topics:
+            text_parts.extend(interview_topics)
+
+        return " ".join(text_parts).lower()
+
+    def _model_result(
+        self,
+        prob: float,
+        company: Optional[str],
+        role: Optional[str],
+        experience_level: Optional[str],
+        interview_topics: List[str],
+        preparation_time_weeks: Optional[int]
+    ) -> Dict[str, Any]:
+        """Wrap a model probability with confidence, factors and recommendations"""
+        # Generate recommendations
+        with stage_timer('recommendations'):
             recommendations = self._generate_recommendations(
                 prob, company, role, experience_level, interview_topics, preparation_time_weeks
             )
 
-            # Calculate confidence based on training data size
-            confidence = min(0.95, 0.5 + (self.training_samples / 1000) * 0.45)
+        # Calculate confidence based on training data size
+        confidence = min(0.95, 0.5 + (self.training_samples / 1000) * 0.45)
 
-            return {
-                'success_probability': float(prob),
-                'confidence': float(confidence),
-                'factors': {
-                    'company': company,
-                    'role': role,
-                    'experience_level': experience_level,
-                    'topics_covered': len(interview_topics) if interview_topics else 0,
-                    'preparation_weeks': preparation_time_weeks
-                },
-                'recommendations': recommendations
-            }
-
-        except Exception as e:
-            logger.error(f"Prediction error: {str(e)}")
-            return self._fallback_prediction(company, role, experience_level, interview_topics, preparation_time_weeks)
+        return {
+            'success_probability': float(prob),
+            'confidence': float(confidence),
+            'factors': {
+                'company': company,
+                'role': role,
+                'experience_level': experience_level,
+                'topics_covered': len(interview_topics) if interview_topics else 0,
+                'preparation_weeks': preparation_time_weeks
+            },
+            'recommendations': recommendations
+        }
 
     def _fallback_prediction(
         self,
@@ -240,7 +484,7 @@ class InterviewSuccessPredictor:
         adjustments = []
 
         # Company factor
-        if company and company.lower() in ['google', 'meta', 'amazon', 'microsoft', 'apple']:
+        if company and company.lower() in self.TOP_TIER_COMPANIES:
             base_prob -= 0.1
             adjustments.append("Top-tier company: slightly lower success rate")
         else:
@@ -325,37 +569,70 @@ class SkillGapAnalyzer:
     Analyzes skill gaps between user's current skills and target role requirements
     """
 
+    # Skills taken from the index per analysis
+    TOP_K_SKILLS = 15
+
     def __init__(self):
         self.skill_frequency: Dict[str, int] = {}
+        self.skill_index: SkillIndex = SkillIndex.empty()
         self.role_skills: Dict[str, List[str]] = {}
         self.training_samples = 0
         self.last_trained: Optional[str] = None
-        self.feature_names: List[str] = ['skill_frequency', 'role_requirements']
+        self.feature_names: List[str] = ['skill_frequency', 'role_requirements', 'role_company_skill_index']
 
     def fit(self, df: pd.DataFrame):
-        """Build skill frequency database from training data"""
+        """Build skill frequency database and role/company/skill index from training data"""
         try:
             logger.info("Building skill frequency database...")
 
-            # Extract skills from metadata
-            all_skills = []
-            for _, row in df.iterrows():
-                metadata = row.get('metadata', {})
-                if isinstance(metadata, dict) and 'technologies' in metadata:
-                    all_skills.extend([s.lower() for s in metadata['technologies']])
-
-            # Calculate frequency
-            from collections import Counter
-            self.skill_frequency = dict(Counter(all_skills))
+            self.skill_frequency = dict(self._count_skills(df))
+            self.skill_index = SkillIndex.from_frame(df)
 
             self.training_samples = len(df)
             self.last_trained = datetime.utcnow().isoformat()
 
-            logger.info(f"✅ Analyzed {len(self.skill_frequency)} unique skills")
+            logger.info(f"✅ Analyzed {len(self.skill_frequency)} unique skills ({len(self.skill_index)} index cells)")
 
         except Exception as e:
             logger.error(f"Skill analyzer fit error: {str(e)}")
 
+    def partial_fit(self, df: pd.DataFrame):
+        """Add skill counts from newly scraped posts to the existing frequencies and index"""
+        try:
+            new_counts = self._count_skills(df)
+            for skill, count in new_counts.items():
+                self.skill_frequency[skill] = self.skill_frequency.get(skill, 0) + count
+            self.skill_index = self.skill_index.merge(SkillIndex.from_frame(df))
+
+            self.training_samples += len(df)
+            self.last_trained = datetime.utcnow().isoformat()
+
+            logger.info(f"✅ Added {len(df)} posts ({len(new_counts)} skills) to skill frequencies")
+
+        except Exception as e:
+            logger.error(f"Skill analyzer partial fit error: {str(e)}")
+
+    def _count_skills(self, df: pd.DataFrame) -> Counter:
+        """Count technologies mentioned in post metadata"""
+        if 'technologies' in df.columns:
+            # Streamed chunks carry the technology list already pulled out of metadata
+            technologies = df['technologies']
+        elif 'metadata' in df.columns:
+            technologies = df['metadata'].map(lambda m: m.get('technologies') if isinstance(m, dict) else None)
+        else:
+            return Counter()
+
+        skills = technologies.explode().dropna()
+        skills = skills[skills.map(lambda s: isinstance(s, str))]
+        return Counter(skills.str.lower().value_counts().to_dict())
+
+    def load_state(self, state: Dict[str, Any], skill_index: Optional[SkillIndex] = None):
+        """Restore skill frequencies and index persisted in a model bundle"""
+        self.skill_frequency = dict(state.get('skill_frequency', {}))
+        self.skill_index = skill_index if skill_index is not None else SkillIndex.empty()
+        self.training_samples = state.get('training_samples', 0)
+        self.last_trained = state.get('last_trained')
+
     def analyze(
         self,
         user_skills: List[str],
@@ -373,22 +650,35 @@ class SkillGapAnalyzer:
         Returns:
             Analysis with missing skills and learning recommendations
         """
-        # Common skill requirements by role
-        role_requirements = self._get_role_requirements(target_role)
-
         # User's skills (normalized)
         user_skills_normalized = set(s.lower().strip() for s in user_skills)
 
-        # Find missing skills
+        # Skills most mentioned in posts for this role at the target companies
+        with stage_timer('skill_index_lookup'):
+            indexed = self.skill_index.top_skills(
+                target_role, target_companies, k=self.TOP_K_SKILLS, exclude=user_skills_normalized
+            )
+
         missing_skills = []
-        for skill in role_requirements:
-            if skill.lower() not in user_skills_normalized:
-                importance = self.skill_frequency.get(skill.lower(), 1)
+        # An empty list means the user already has every indexed skill for the role
+        if indexed is not None:
+            for skill, frequency in indexed:
                 missing_skills.append({
                     'skill': skill,
-                    'importance': min(100, importance * 10),  # Scale to 0-100
-                    'frequency': importance
+                    'importance': min(100, frequency * 10),  # Scale to 0-100
+                    'frequency': frequency
                 })
+        else:
+            # No post data for the role: common skill requirements by role
+            record_fallback('skill_gap_role_requirements')
+            for skill in self._get_role_requirements(target_role):
+                if skill.lower() not in user_skills_normalized:
+                    importance = self.skill_frequency.get(skill.lower(), 1)
+                    missing_skills.append({
+                        'skill': skill,
+                        'importance': min(100, importance * 10),  # Scale to 0-100
+                        'frequency': importance
+                    })
 
         # Sort by importance
         missing_skills.sort(key=lambda x: x['importance'], reverse=True)
@@ -397,7 +687,8 @@ class SkillGapAnalyzer:
         priority_skills = [s['skill'] for s in missing_skills[:5]]
 
         # Generate learning path
-        learning_path = self._generate_learning_path(missing_skills[:10])
+        with stage_timer('learning_path'):
+            learning_path = self._generate_learning_path(missing_skills[:10])
 
         # Estimate time
         estimated_weeks = len(priority_skills) * 2  # 2 weeks per skill
@@ -411,7 +702,7 @@ class SkillGapAnalyzer:
 
     def _get_role_requirements(self, role: str) -> List[str]:
         """Get common skill requirements for a role"""
-        role_lower = role.lower()
+        role_lower = normalize_role(role)
 
         # Define skill sets for common roles
         skill_sets = {
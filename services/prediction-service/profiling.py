@@ -0,0 +1,166 @@
+"""
+Opt-in sampling profiler for the prediction service
+Samples a thread's Python stack at a fixed interval and collapses the samples
+into folded stacks ("frame;frame;frame count" per line), the input format of
+flamegraph.pl, speedscope and inferno.
+
+Request profiling samples a fraction of API requests (PROFILE_SAMPLE_RATE,
+off by default) on the event loop thread and aggregates them per endpoint in
+memory. A retrain can be profiled end to end in the training process; that
+profile is written to PROFILE_DIR.
+"""
+
+import os
+import re
+import sys
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Fraction of API requests to profile (0 disables)
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+
+PROFILE_INTERVAL_SECONDS = float(os.getenv('PROFILE_INTERVAL_SECONDS', '0.002'))
+
+# Where retrain profiles are written (shared by serve.py workers)
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'prediction-profiles'))
+
+PROFILE_FILE_SUFFIX = '.folded'
+
+_PROFILE_NAME = re.compile(r'^[\w.-]+$')
+
+
+def _collapse(frame) -> str:
+    """Root-first stack of one frame as 'func (file:line);...'"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(parts))
+
+
+def folded(stacks: Counter) -> str:
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack from a background thread
+
+    Usage:
+        with SamplingProfiler() as profiler:
+            work()
+        text = folded(profiler.stacks)
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def start(self) -> 'SamplingProfiler':
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.stacks
+
+    def __enter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+
+
+class RequestProfiles:
+    """
+    Folded stacks of sampled requests, aggregated per endpoint
+
+    The sampler watches the event loop thread, so samples taken while a
+    profiled request is awaiting can belong to other requests on the loop.
+    """
+
+    def __init__(self):
+        self._stacks: Dict[str, Counter] = {}
+        self._requests: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, endpoint: str, stacks: Counter):
+        with self._lock:
+            self._stacks.setdefault(endpoint, Counter()).update(stacks)
+            self._requests[endpoint] += 1
+
+    def folded(self, endpoint: Optional[str] = None) -> str:
+        with self._lock:
+            merged = Counter()
+            for name, stacks in self._stacks.items():
+                if endpoint is None or name == endpoint:
+                    merged.update(stacks)
+        return folded(merged)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                endpoint: {'requests': self._requests[endpoint], 'samples': sum(stacks.values())}
+                for endpoint, stacks in self._stacks.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._stacks.clear()
+            self._requests.clear()
+
+
+def save_profile(name: str, stacks: Counter, directory: str = PROFILE_DIR) -> str:
+    """Write folded stacks to <directory>/<name>.folded atomically; returns the path"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name + PROFILE_FILE_SUFFIX)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(folded(stacks))
+    os.replace(tmp_path, path)
+    return path
+
+
+def list_profiles(directory: str = PROFILE_DIR) -> List[Dict[str, Any]]:
+    """Saved profiles, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for filename in os.listdir(directory):
+        if not filename.endswith(PROFILE_FILE_SUFFIX) or filename.startswith('.'):
+            continue
+        stat = os.stat(os.path.join(directory, filename))
+        profiles.append({
+            'name': filename[:-len(PROFILE_FILE_SUFFIX)],
+            'bytes': stat.st_size,
+            'modified_at': datetime.utcfromtimestamp(stat.st_mtime).isoformat()
+        })
+    return sorted(profiles, key=lambda p: p['modified_at'], reverse=True)
+
+
+def profile_path(name: str, directory: str = PROFILE_DIR) -> Optional[str]:
+    """Path of a saved profile, or None if the name is invalid or unknown"""
+    if not _PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(directory, name + PROFILE_FILE_SUFFIX)
+    return path if os.path.isfile(path) else None
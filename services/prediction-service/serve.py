@@ -0,0 +1,161 @@
+"""
+RedCube XHS - Prediction Service multi-worker server
+Loads the latest model bundle once in a parent process, then forks N uvicorn
+workers that share one listening socket and, copy-on-write, the loaded
+models. A bundle loaded later (after a retrain) is loaded by each worker on
+its own: only the flat-forest .npy arrays are memory-mapped and shared
+through the page cache; the sklearn estimators are unpickled into every
+worker's memory.
+
+Only worker 0 trains on startup; every worker picks up new bundles through
+main.watch_bundles, so retrains reach all workers without a restart.
+Training job and feature refresh state live in the artifact directory
+(worker_state), so any worker answers /api/models/jobs and
+/api/features/refresh, and only one retrain or refresh runs at a time.
+
+Usage:
+    python serve.py --workers 4
+    PREDICTION_WORKERS=4 python serve.py --port 8000
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict
+
+import uvicorn
+
+logger = logging.getLogger('serve')
+
+RESTART_BACKOFF_SECONDS = 1.0
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(worker_id: int, sock: socket.socket, log_level: str):
+    """Serve main.app on the shared socket (runs in the forked child)"""
+    os.environ['PREDICTION_WORKER_ID'] = str(worker_id)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    import main
+    main.WORKER_ID = worker_id
+
+    config = uvicorn.Config(main.app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn_worker(worker_id: int, sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(worker_id, sock, log_level)
+        except Exception:
+            logger.exception(f"❌ Worker {worker_id} crashed")
+            code = 1
+        finally:
+            os._exit(code)
+    logger.info(f"👷 Started worker {worker_id} (pid {pid})")
+    return pid
+
+
+def serve(host: str, port: int, workers: int, log_level: str = 'info'):
+    """
+    Preload models, fork the workers and restart any that die
+
+    Args:
+        host: Bind address
+        port: Bind port
+        workers: Number of worker processes
+        log_level: uvicorn log level
+    """
+    sock = bind_socket(host, port)
+
+    # /metrics aggregates every worker through a shared directory, which
+    # prometheus_client reads when metrics are created, so before importing main
+    multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        for name in os.listdir(multiproc_dir):
+            if name.endswith('.db'):
+                os.remove(os.path.join(multiproc_dir, name))
+    elif workers > 1:
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='prediction-metrics-')
+
+    # Import and load before forking so workers inherit the models
+    import main
+    import metrics
+    if main.preload_models():
+        logger.info(f"📦 Workers will share model bundle {main.active_models.bundle_version}")
+    else:
+        logger.info("⚠️  No model bundle yet, worker 0 will train one")
+    # The parent serves no requests; its gauges must not count as a live worker
+    metrics.mark_process_dead(os.getpid())
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for worker_id in range(workers):
+        children[spawn_worker(worker_id, sock, log_level)] = worker_id
+
+    logger.info(f"🚀 Prediction Service listening on {host}:{port} with {workers} workers")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        worker_id = children.pop(pid, None)
+        metrics.mark_process_dead(pid)
+        if worker_id is None or stopping:
+            continue
+
+        logger.warning(f"⚠️  Worker {worker_id} (pid {pid}) exited with status {status}, restarting")
+        time.sleep(RESTART_BACKOFF_SECONDS)
+        children[spawn_worker(worker_id, sock, log_level)] = worker_id
+
+    sock.close()
+    logger.info("👋 Prediction Service stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the prediction service with several workers')
+    parser.add_argument('--host', default=os.getenv('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '8000')))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('PREDICTION_WORKERS', '2')))
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    serve(args.host, args.port, max(1, args.workers), args.log_level)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Role x company x skill index for skill gap analysis
+Sparse post counts built from post metadata with vectorized pandas operations,
+so analysis is a few dictionary lookups and one bincount
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Wildcard for "any role" / "any company" aggregates
+ANY = '*'
+
+# Role codes used in scraped_posts.role_type (see role_types) and common
+# spellings, mapped to the names used by the analyzer
+ROLE_ALIASES = {
+    'swe': 'software engineer',
+    'sde': 'software engineer',
+    'software development engineer': 'software engineer',
+    'software engineer': 'software engineer',
+    'fullstack': 'fullstack engineer',
+    'full stack': 'fullstack engineer',
+    'full stack engineer': 'fullstack engineer',
+    'frontend': 'frontend developer',
+    'frontend engineer': 'frontend developer',
+    'front end': 'frontend developer',
+    'backend': 'backend developer',
+    'backend engineer': 'backend developer',
+    'back end': 'backend developer',
+    'mle': 'machine learning engineer',
+    'ml engineer': 'machine learning engineer',
+    'ds': 'data scientist',
+    'de': 'data engineer',
+    'pm': 'product manager',
+    'tpm': 'technical program manager',
+    'sre': 'site reliability engineer',
+    'devops': 'devops engineer',
+    'em': 'engineering manager',
+    'tl': 'tech lead'
+}
+
+
+def normalize_role(role: Any) -> str:
+    """Lowercase, collapse whitespace and resolve aliases ('' for missing roles)"""
+    if not isinstance(role, str):
+        return ''
+    key = ' '.join(role.lower().replace('_', ' ').split())
+    return ROLE_ALIASES.get(key, key)
+
+
+def normalize_company(company: Any) -> str:
+    if not isinstance(company, str):
+        return ''
+    return ' '.join(company.lower().split())
+
+
+def _string_list(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [v for v in value if isinstance(v, str) and v.strip()]
+    if isinstance(value, str) and value.strip():
+        return [value]
+    return []
+
+
+def post_columns(df: pd.DataFrame) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Role, company list and skill list per post
+
+    Reads streamed training chunks (role_type, companies, technologies
+    columns) as well as raw scraped_posts frames with a metadata dict.
+    """
+    metadata = df['metadata'] if 'metadata' in df.columns else pd.Series([None] * len(df), index=df.index)
+
+    roles = df['role_type'] if 'role_type' in df.columns else pd.Series([None] * len(df), index=df.index)
+
+    if 'companies' in df.columns:
+        companies = df['companies'].map(_string_list)
+    else:
+        companies = metadata.map(
+            lambda m: _string_list(m.get('companies') or m.get('company')) if isinstance(m, dict) else []
+        )
+
+    if 'technologies' in df.columns:
+        skills = df['technologies'].map(_string_list)
+    else:
+        skills = metadata.map(lambda m: _string_list(m.get('technologies')) if isinstance(m, dict) else [])
+
+    return roles, companies, skills
+
+
+class SkillIndex:
+    """
+    Sparse (role, company, skill) -> number of posts index
+
+    Besides the exact (role, company) cells it holds the (role, ANY),
+    (ANY, company) and (ANY, ANY) aggregates, computed from distinct posts so
+    a post naming two companies is counted once at role level. Each cell is
+    stored as skill ids and counts sorted by count; a query concatenates the
+    cells of the target companies and merges them with one bincount.
+    """
+
+    def __init__(self, counts: pd.DataFrame, display: Dict[str, str]):
+        """
+        Args:
+            counts: Columns role, company, skill, count
+            display: Lowercased skill -> display spelling
+        """
+        self.counts = counts.reset_index(drop=True)
+        self.display = display
+
+        skill_ids, skills = pd.factorize(self.counts['skill'])
+        self.skills: List[str] = list(skills)
+        self.skill_ids: Dict[str, int] = {s: i for i, s in enumerate(self.skills)}
+        self.display_names: List[str] = [display.get(s, s) for s in self.skills]
+
+        ordered = self.counts.assign(skill_id=skill_ids).sort_values(['role', 'company', 'count'], ascending=[True, True, False])
+        self.cells: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {
+            key: (group['skill_id'].to_numpy(dtype=np.int32), group['count'].to_numpy(dtype=np.int32))
+            for key, group in ordered.groupby(['role', 'company'], sort=False)
+        }
+        self.roles = {role for role, _ in self.cells if role != ANY}
+        self.companies = {company for _, company in self.cells if company != ANY}
+
+    @classmethod
+    def empty(cls) -> 'SkillIndex':
+        return cls(pd.DataFrame({'role': [], 'company': [], 'skill': [], 'count': []}), {})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'SkillIndex':
+        """Build the index from posts (see post_columns for accepted layouts)"""
+        roles, companies, skills = post_columns(df)
+
+        unique_roles = pd.unique(roles.dropna())
+        posts = pd.DataFrame({
+            'post': np.arange(len(df)),
+            'role': roles.map({r: normalize_role(r) for r in unique_roles}).fillna('').to_numpy(),
+            'companies': companies.to_numpy(),
+            'skill': skills.to_numpy()
+        })
+
+        by_skill = posts.drop(columns='companies').explode('skill').dropna(subset=['skill'])
+        if by_skill.empty:
+            return cls.empty()
+
+        raw = by_skill['skill'].str.strip()
+        by_skill['skill'] = raw.str.lower()
+        spellings = pd.Series(raw.to_numpy(), index=by_skill['skill'].to_numpy())
+        display = spellings[~spellings.index.duplicated()].to_dict()
+        by_skill = by_skill.drop_duplicates(['post', 'skill'])
+
+        by_company = by_skill.merge(posts[['post', 'companies']], on='post').explode('companies')
+        by_company = by_company.dropna(subset=['companies'])
+        by_company['company'] = by_company['companies'].str.lower().str.split().str.join(' ')
+        by_company = by_company.drop_duplicates(['post', 'company', 'skill'])
+
+        known_role = by_skill['role'] != ''
+        known_role_company = by_company['role'] != ''
+
+        cells = [
+            by_skill.groupby('skill').size().reset_index(name='count').assign(role=ANY, company=ANY),
+            by_skill[known_role].groupby(['role', 'skill']).size().reset_index(name='count').assign(company=ANY),
+            by_company.groupby(['company', 'skill']).size().reset_index(name='count').assign(role=ANY),
+            by_company[known_role_company].groupby(['role', 'company', 'skill']).size().reset_index(name='count')
+        ]
+        counts = pd.concat(cells, ignore_index=True)[['role', 'company', 'skill', 'count']]
+        return cls(counts, display)
+
+    def merge(self, other: 'SkillIndex') -> 'SkillIndex':
+        """Index with the counts of both (for incremental fits)"""
+        counts = (
+            pd.concat([self.counts, other.counts], ignore_index=True)
+            .groupby(['role', 'company', 'skill'], as_index=False)['count'].sum()
+        )
+        return SkillIndex(counts, {**other.display, **self.display})
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def has_role(self, role: str) -> bool:
+        return normalize_role(role) in self.roles
+
+    def top_skills(
+        self,
+        role: str,
+        companies: Optional[Iterable[str]] = None,
+        k: int = 15,
+        exclude: Optional[Iterable[str]] = None
+    ) -> Optional[List[Tuple[str, int]]]:
+        """
+        Most mentioned skills for a role, merged across target companies
+
+        Args:
+            role: Target role (aliases resolved)
+            companies: Target companies; cells without data for the role fall
+                back to that company across all roles, unknown companies are
+                ignored, and with none left the role-wide counts are used
+            k: Number of skills to return
+            exclude: Skills (any case) to leave out, e.g. ones the user has
+
+        Returns:
+            [(display name, post count)] sorted by count, or None when the
+            index has no data for the role
+        """
+        role_key = normalize_role(role)
+        if role_key not in self.roles:
+            return None
+
+        keys = []
+        for company in companies or []:
+            company_key = normalize_company(company)
+            if (role_key, company_key) in self.cells:
+                keys.append((role_key, company_key))
+            elif (ANY, company_key) in self.cells:
+                keys.append((ANY, company_key))
+        if not keys:
+            keys = [(role_key, ANY)]
+
+        cells = [self.cells[key] for key in keys]
+        totals = np.bincount(
+            np.concatenate([ids for ids, _ in cells]),
+            weights=np.concatenate([counts for _, counts in cells]),
+            minlength=len(self.skills)
+        )
+
+        excluded = [self.skill_ids[s] for s in (e.lower().strip() for e in exclude or []) if s in self.skill_ids]
+        if excluded:
+            totals[excluded] = 0
+
+        nonzero = int(np.count_nonzero(totals))
+        k = min(k, nonzero)
+        if k == 0:
+            return []
+
+        top = np.argpartition(-totals, k - 1)[:k]
+        top = top[np.argsort(-totals[top], kind='stable')]
+        return [(self.display_names[i], int(totals[i])) for i in top]
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Plain numpy arrays for persisting (np.savez)"""
+        return {
+            'role': self.counts['role'].to_numpy(dtype=str),
+            'company': self.counts['company'].to_numpy(dtype=str),
+            'skill': self.counts['skill'].to_numpy(dtype=str),
+            'count': self.counts['count'].to_numpy(dtype=np.int32),
+            'display_keys': np.array(list(self.display.keys()), dtype=str),
+            'display_values': np.array(list(self.display.values()), dtype=str)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Any) -> 'SkillIndex':
+        counts = pd.DataFrame({
+            'role': arrays['role'].astype(object),
+            'company': arrays['company'].astype(object),
+            'skill': arrays['skill'].astype(object),
+            'count': arrays['count'].astype(np.int64)
+        })
+        display = dict(zip(arrays['display_keys'].tolist(), arrays['display_values'].tolist()))
+        return cls(counts, display)
@@ -0,0 +1,43 @@
+"""
+SkillGapAnalyzer regression checks
+
+Run from services/prediction-service:
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import SkillGapAnalyzer  # noqa: E402
+
+
+def backend_analyzer() -> SkillGapAnalyzer:
+    df = pd.DataFrame({
+        'role_type': ['backend', 'backend'],
+        'potential_outcome': ['positive', 'negative'],
+        'metadata': [{'technologies': ['Go', 'Rust']}, {'technologies': ['Go']}]
+    })
+    analyzer = SkillGapAnalyzer()
+    analyzer.fit(df)
+    return analyzer
+
+
+def test_missing_indexed_skill_is_reported():
+    result = backend_analyzer().analyze(['Go'], 'backend')
+    assert result['priority_skills'] == ['Rust']
+
+
+def test_user_with_every_indexed_skill_has_no_gap():
+    # An empty index result is not "no data": it must not fall back to the hard-coded role requirements
+    result = backend_analyzer().analyze(['Go', 'Rust'], 'backend')
+    assert result['missing_skills'] == []
+    assert result['priority_skills'] == []
+
+
+def test_unknown_role_falls_back_to_role_requirements():
+    result = backend_analyzer().analyze([], 'pastry chef')
+    assert result['priority_skills']
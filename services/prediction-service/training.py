@@ -0,0 +1,581 @@
+"""
+Background training jobs for the prediction service
+Runs data loading and model fitting in a separate process and hands the
+resulting bundle back to the server for an atomic swap
+"""
+
+import asyncio
+import fcntl
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from metrics import record_training_job
+from worker_state import is_locked, pid_alive, read_json, try_lock, write_json
+
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+# Training modes: incremental reuses the latest bundle's feature cache, skill
+# counts and selected model family and only reads posts scraped after its
+# watermark; full rebuilds everything from the database and reruns the model
+# selection sweep. Incremental runs only see new posts: a relabel or metadata
+# change to an existing post (which keeps its scraped_at) and a deleted post
+# reach the models only through mode=full, which is why full is the default
+INCREMENTAL = 'incremental'
+FULL = 'full'
+TRAINING_MODES = (INCREMENTAL, FULL)
+
+# Training stages reported while a job runs, with rough completion fractions
+STAGES = {
+    'starting': 0.0,
+    'refreshing_feature_store': 0.02,
+    'loading_data': 0.05,
+    'extracting_features': 0.1,
+    'loading_feature_cache': 0.3,
+    'training_predictor': 0.35,
+    'saving_bundle': 0.95,
+    'done': 1.0
+}
+
+PROGRESS_POLL_SECONDS = 0.5
+
+# Held (flock) for the duration of a training run
+TRAINING_LOCK_FILE = '.training.lock'
+
+# Job records, one JSON file per job, so every serving worker can report any job
+JOBS_DIR = 'jobs'
+
+# Held (flock) while a worker checks for an active job and records a new one
+SUBMIT_LOCK_FILE = '.jobs.lock'
+
+
+# Stage timings and fallback paths of jobs running in this (training) process,
+# returned with the job result so the server can record them as metrics
+_job_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _report(progress, job_id: str, stage: str, **details):
+    now = time.perf_counter()
+    stats = _job_stats.setdefault(job_id, {'stage': None, 'since': now, 'stage_seconds': {}, 'fallbacks': []})
+    if stats['stage'] is not None:
+        seconds = stats['stage_seconds']
+        seconds[stats['stage']] = seconds.get(stats['stage'], 0.0) + now - stats['since']
+    stats['stage'], stats['since'] = stage, now
+
+    progress[job_id] = {'stage': stage, 'progress': STAGES.get(stage, 0.0), **details}
+
+
+def _fallback(job_id: str, path: str):
+    _job_stats.setdefault(job_id, {'stage': None, 'since': time.perf_counter(), 'stage_seconds': {}, 'fallbacks': []})
+    _job_stats[job_id]['fallbacks'].append(path)
+
+
+def _watermark(df, previous: Optional[str] = None) -> Optional[str]:
+    """Latest scraped_at in a training frame (never older than the previous watermark)"""
+    if 'scraped_at' not in df.columns or df['scraped_at'].isna().all():
+        return previous
+    latest = df['scraped_at'].max().isoformat()
+    return max(latest, previous) if previous else latest
+
+
+def run_training_job(
+    job_id: str,
+    artifact_dir: str,
+    progress,
+    mode: str = FULL,
+    profile: bool = False
+) -> Dict[str, Any]:
+    """
+    Train both models and write a bundle (runs in the training process)
+
+    Incremental mode falls back to a full rebuild when there is no previous
+    bundle, or it has no feature cache, skill index or watermark.
+
+    Args:
+        profile: Sample the whole run and save a folded-stack profile named
+            retrain-<job_id> in PROFILE_DIR
+
+    Returns:
+        Summary of the new bundle, with per-stage seconds and any fallback
+        paths taken
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    profiler = None
+    if profile:
+        from profiling import SamplingProfiler
+        profiler = SamplingProfiler().start()
+
+    try:
+        # Several serving workers share the artifact directory; only one trains at a time
+        os.makedirs(artifact_dir, exist_ok=True)
+        with open(os.path.join(artifact_dir, TRAINING_LOCK_FILE), 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RuntimeError("Another worker is already training into this artifact directory")
+            result = _run_locked(job_id, artifact_dir, progress, mode)
+    finally:
+        stats = _job_stats.pop(job_id, None) or {'stage_seconds': {}, 'fallbacks': []}
+        if profiler:
+            from profiling import save_profile
+            path = save_profile(f"retrain-{job_id}", profiler.stop())
+            logger.info(f"🔥 Training profile written to {path} ({profiler.samples} samples)")
+
+    result['stage_seconds'] = {stage: round(seconds, 3) for stage, seconds in stats['stage_seconds'].items()}
+    result['fallbacks'] = stats['fallbacks']
+    if profiler:
+        result['profile'] = f"retrain-{job_id}"
+    return result
+
+
+def _run_locked(job_id: str, artifact_dir: str, progress, mode: str) -> Dict[str, Any]:
+    # Imported here so the server process never pays for them on the request path
+    from artifacts import ModelArtifactStore
+
+    store = ModelArtifactStore(artifact_dir)
+    if mode == INCREMENTAL:
+        base_version = store.latest_version()
+        base_manifest = store.read_manifest(base_version) if base_version in store.versions() else None
+        if (
+            base_manifest and base_manifest.get('watermark') and base_manifest.get('feature_cache') and
+            base_manifest['skill_analyzer'].get('skill_index_file') and store.is_compatible(base_manifest)
+        ):
+            return _train_incremental(job_id, store, base_manifest, progress)
+        logger.info("No incremental base bundle, running a full rebuild")
+        _fallback(job_id, 'training_full_rebuild')
+
+    return _train_full(job_id, store, progress)
+
+
+class _StreamedTrainingSet:
+    """Feature matrix, labels and skill counts accumulated from streamed chunks"""
+
+    def __init__(self):
+        self.features: List[np.ndarray] = []
+        self.labels: List[np.ndarray] = []
+        self.post_ids: List[np.ndarray] = []
+        self.feature_names: Optional[List[str]] = None
+        self.watermark: Optional[str] = None
+        self.rows = 0
+        self.outcomes: Dict[str, int] = {}
+
+
+def _feature_chunks(job_id: str, progress, predictor, since: Optional[str] = None):
+    """
+    (chunk, feature matrix, feature names) for each chunk of training posts
+
+    Reads vectors from the feature store after bringing it up to date, so only
+    new or changed posts go through feature extraction. Without the store
+    (disabled, or migration 45 not applied) features are extracted from the
+    streamed post text.
+    """
+    import psycopg2.errors
+    from database import iter_training_data
+    from feature_store import FEATURE_STORE_ENABLED, iter_stored_features, refresh_feature_store
+
+    refreshed = None
+    if FEATURE_STORE_ENABLED and predictor.text_hashing:
+        # Stored vectors hold the keyword block only; hashing needs the post text
+        logger.info("Hashed text features are on, reading post text instead of the feature store")
+    elif FEATURE_STORE_ENABLED:
+        _report(progress, job_id, 'refreshing_feature_store')
+        try:
+            refreshed = refresh_feature_store(predictor.feature_engine)
+        except psycopg2.errors.UndefinedTable:
+            logger.warning("⚠️  Feature store table missing, extracting features from post text")
+            _fallback(job_id, 'training_feature_store_missing')
+
+    if refreshed is not None:
+        _report(progress, job_id, 'loading_data', featurized=refreshed['computed'])
+        feature_names = predictor.feature_engine.feature_names(with_metadata=True)
+        for chunk, X in iter_stored_features(since=since):
+            yield chunk, X, feature_names
+        return
+
+    for chunk in iter_training_data(since=since):
+        yield chunk, predictor._extract_features(chunk), predictor._feature_names_for(chunk)
+
+
+def _stream_training_set(job_id: str, progress, predictor, analyzer, since: Optional[str] = None) -> _StreamedTrainingSet:
+    """
+    Collect features and skill counts chunk by chunk
+
+    Only one chunk of posts is in memory at a time; what is kept is the
+    compact float32 feature matrix.
+    """
+    streamed = _StreamedTrainingSet()
+    for chunk, X, feature_names in _feature_chunks(job_id, progress, predictor, since):
+        streamed.features.append(X)
+        streamed.labels.append((chunk['potential_outcome'] == 'positive').astype(np.int8).to_numpy())
+        streamed.post_ids.append(chunk['post_id'].to_numpy(dtype=str))
+        streamed.feature_names = streamed.feature_names or feature_names
+        streamed.watermark = _watermark(chunk, streamed.watermark)
+        for outcome, count in chunk['potential_outcome'].value_counts().items():
+            streamed.outcomes[outcome] = streamed.outcomes.get(outcome, 0) + int(count)
+        analyzer.partial_fit(chunk)
+
+        streamed.rows += len(chunk)
+        _report(progress, job_id, 'extracting_features', rows_loaded=streamed.rows)
+
+    if streamed.rows:
+        logger.info(f"Distribution: {streamed.outcomes}")
+    return streamed
+
+
+def _train_full(job_id: str, store, progress) -> Dict[str, Any]:
+    from features import stack_rows
+    from models import InterviewSuccessPredictor, SkillGapAnalyzer
+
+    _report(progress, job_id, 'loading_data')
+    predictor = InterviewSuccessPredictor()
+    analyzer = SkillGapAnalyzer()
+    streamed = _stream_training_set(job_id, progress, predictor, analyzer)
+    if streamed.rows == 0:
+        raise ValueError("No training data available")
+
+    _report(progress, job_id, 'training_predictor', training_samples=streamed.rows)
+    predictor.train_features(
+        stack_rows(streamed.features),
+        np.concatenate(streamed.labels),
+        streamed.feature_names,
+        np.concatenate(streamed.post_ids)
+    )
+
+    _report(progress, job_id, 'saving_bundle', training_samples=streamed.rows)
+    manifest = store.save(predictor, analyzer, extra={
+        'training_mode': FULL,
+        'watermark': streamed.watermark,
+        'base_version': None
+    })
+
+    _report(progress, job_id, 'done', training_samples=streamed.rows)
+    return {
+        'bundle_version': manifest['version'],
+        'mode': FULL,
+        'training_samples': predictor.training_samples,
+        'new_samples': streamed.rows,
+        'accuracy': predictor.accuracy
+    }
+
+
+def _train_incremental(job_id: str, store, base_manifest: Dict[str, Any], progress) -> Dict[str, Any]:
+    from features import stack_rows
+    from models import InterviewSuccessPredictor, SkillGapAnalyzer
+
+    base_version = base_manifest['version']
+    watermark = base_manifest['watermark']
+
+    # Only the new posts go through feature extraction; skill counts start
+    # from the base bundle's frequencies
+    _report(progress, job_id, 'loading_data', base_version=base_version, watermark=watermark)
+    predictor = InterviewSuccessPredictor()
+    analyzer = SkillGapAnalyzer()
+    analyzer.load_state(base_manifest['skill_analyzer'], store.load_skill_index(base_version, base_manifest))
+    streamed = _stream_training_set(job_id, progress, predictor, analyzer, since=watermark)
+
+    if streamed.rows == 0:
+        # Nothing new: keep serving the current bundle
+        logger.info(f"No new training data since {watermark}")
+        _report(progress, job_id, 'done', new_samples=0)
+        return {
+            'bundle_version': base_version,
+            'mode': INCREMENTAL,
+            'training_samples': base_manifest['metrics']['training_samples'],
+            'new_samples': 0,
+            'accuracy': base_manifest['metrics']['accuracy']
+        }
+
+    text_features = predictor.text_hashing.config() if predictor.text_hashing else None
+    if streamed.feature_names != base_manifest['feature_names'] or text_features != base_manifest.get('text_features'):
+        logger.info("Feature columns changed since the base bundle, running a full rebuild")
+        _fallback(job_id, 'training_full_rebuild')
+        return _train_full(job_id, store, progress)
+
+    _report(progress, job_id, 'loading_feature_cache', base_version=base_version, new_samples=streamed.rows)
+    cached_X, cached_y, cached_ids = store.load_feature_cache(base_version)
+    new_ids = np.concatenate(streamed.post_ids)
+
+    # A post already in the base bundle would have its skills counted twice:
+    # the base counts are per skill, not per post, so its old contribution
+    # can't be subtracted
+    if np.isin(new_ids, cached_ids).any():
+        logger.info("Posts from the base bundle changed since its watermark, running a full rebuild")
+        _fallback(job_id, 'training_full_rebuild')
+        return _train_full(job_id, store, progress)
+
+    X = stack_rows([cached_X, *streamed.features])
+    y = np.concatenate([cached_y, *streamed.labels])
+    post_ids = np.concatenate([cached_ids, new_ids])
+
+    # The model selection sweep only runs on full rebuilds
+    _report(progress, job_id, 'training_predictor', training_samples=len(y), new_samples=streamed.rows)
+    predictor.train_features(
+        X, y, streamed.feature_names, post_ids,
+        previous_selection=base_manifest.get('model_selection') or {}
+    )
+
+    _report(progress, job_id, 'saving_bundle', training_samples=len(y), new_samples=streamed.rows)
+    manifest = store.save(predictor, analyzer, extra={
+        'training_mode': INCREMENTAL,
+        'watermark': max(streamed.watermark, watermark) if streamed.watermark else watermark,
+        'base_version': base_version
+    })
+
+    _report(progress, job_id, 'done', training_samples=len(y), new_samples=streamed.rows)
+    return {
+        'bundle_version': manifest['version'],
+        'mode': INCREMENTAL,
+        'training_samples': predictor.training_samples,
+        'new_samples': streamed.rows,
+        'accuracy': predictor.accuracy
+    }
+
+
+class TrainingJob:
+    """Status of one training run"""
+
+    def __init__(self, job_id: str, reason: str, mode: str = FULL, profile: bool = False):
+        self.job_id = job_id
+        self.reason = reason
+        self.mode = mode
+        self.profile = profile
+        self.status = QUEUED
+        self.stage = 'starting'
+        self.progress = 0.0
+        self.details: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.duration_seconds: Optional[float] = None
+        self.worker_pid: Optional[int] = os.getpid()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'reason': self.reason,
+            'mode': self.mode,
+            'profile': self.profile,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'details': self.details,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'duration_seconds': self.duration_seconds,
+            'worker_pid': self.worker_pid
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TrainingJob':
+        job = cls(data['job_id'], data['reason'], data.get('mode', FULL), data.get('profile', False))
+        for key in (
+            'status', 'stage', 'progress', 'details', 'result', 'error',
+            'created_at', 'started_at', 'finished_at', 'duration_seconds', 'worker_pid'
+        ):
+            if key in data:
+                setattr(job, key, data[key])
+        return job
+
+
+class TrainingJobManager:
+    """
+    Runs at most one training job at a time in a separate process
+
+    on_complete is awaited in the server process with the job result once the
+    bundle is on disk; it is responsible for loading and swapping models.
+    Requests keep being served by the previous (or fallback) models until then.
+
+    Job records are kept in JOBS_DIR under the artifact directory, so with
+    several serving workers any of them reports any job, and a retrain
+    submitted to one worker while another trains returns the running job.
+    Only the worker that submitted a job runs it and updates its record.
+    """
+
+    def __init__(self, artifact_dir: str, on_complete: Callable[[Dict[str, Any]], Awaitable[None]], history: int = 20):
+        self.artifact_dir = artifact_dir
+        self.jobs_dir = os.path.join(artifact_dir, JOBS_DIR)
+        self.on_complete = on_complete
+        self.history = history
+        self.jobs: Dict[str, TrainingJob] = {}
+        self._ctx = multiprocessing.get_context('spawn')
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+        self._active: Optional[TrainingJob] = None
+
+    def start(self):
+        self._manager = self._ctx.Manager()
+        self._progress = self._manager.dict()
+        self._pool = ProcessPoolExecutor(max_workers=1, mp_context=self._ctx)
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._manager:
+            self._manager.shutdown()
+
+    @property
+    def active(self) -> Optional[TrainingJob]:
+        """The queued or running job of any worker"""
+        if self._active is not None:
+            return self._active
+        for job in self._load_jobs():
+            if job.status in ACTIVE_STATES:
+                return job
+        return None
+
+    def submit(self, reason: str = 'api', mode: str = FULL, profile: bool = False) -> Tuple[TrainingJob, bool]:
+        """
+        Start a training job, or return the one already running
+
+        Returns:
+            (job, started): started is False when an active job of this or
+            another worker was returned instead
+
+        Raises:
+            RuntimeError: The training lock is held by a process with no job
+                record (e.g. a manual training run on the artifact directory)
+        """
+        lock_file = try_lock(os.path.join(self.artifact_dir, SUBMIT_LOCK_FILE))
+        if lock_file is None:
+            # Another worker is recording its job right now
+            active = self.active
+            if active is not None:
+                return active, False
+            raise RuntimeError("Another worker is starting a training job")
+
+        with lock_file:
+            active = self.active
+            if active is not None:
+                return active, False
+            if is_locked(os.path.join(self.artifact_dir, TRAINING_LOCK_FILE)):
+                raise RuntimeError("Another process is already training into this artifact directory")
+
+            job = TrainingJob(uuid.uuid4().hex, reason, mode, profile)
+            self.jobs[job.job_id] = job
+            self._active = job
+            self._save(job)
+
+        self._trim_history()
+        asyncio.create_task(self._run(job))
+        logger.info(f"🧵 Training job {job.job_id} queued ({reason}, {mode})")
+        return job, True
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        if job_id in self.jobs:
+            return self.jobs[job_id]
+        data = read_json(self._job_path(job_id))
+        return self._checked(TrainingJob.from_dict(data)) if data else None
+
+    def list_jobs(self) -> List[TrainingJob]:
+        return sorted(self._load_jobs(), key=lambda j: j.created_at, reverse=True)
+
+    async def _run(self, job: TrainingJob):
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        job.status = RUNNING
+        job.started_at = datetime.utcnow().isoformat()
+        self._save(job)
+
+        try:
+            future = loop.run_in_executor(
+                self._pool, run_training_job, job.job_id, self.artifact_dir, self._progress, job.mode, job.profile
+            )
+            while not future.done():
+                await asyncio.wait({future}, timeout=PROGRESS_POLL_SECONDS)
+                self._sync_progress(job)
+
+            job.result = future.result()
+            self._sync_progress(job)
+
+            await self.on_complete(job.result)
+            job.status = COMPLETED
+            logger.info(f"✅ Training job {job.job_id} completed: bundle {job.result['bundle_version']}")
+
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger.error(f"❌ Training job {job.job_id} failed: {str(e)}")
+
+        finally:
+            job.finished_at = datetime.utcnow().isoformat()
+            job.duration_seconds = round(time.monotonic() - started, 3)
+            record_training_job(job.mode, job.status, job.duration_seconds, job.result)
+            self._progress.pop(job.job_id, None)
+            self._active = None
+            self._save(job)
+
+    def _sync_progress(self, job: TrainingJob):
+        state = self._progress.get(job.job_id)
+        if not state:
+            return
+        state = dict(state)
+        stage, progress = state.pop('stage'), state.pop('progress')
+        if (stage, progress, state) == (job.stage, job.progress, job.details):
+            return
+        job.stage, job.progress, job.details = stage, progress, state
+        self._save(job)
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _save(self, job: TrainingJob):
+        try:
+            write_json(self._job_path(job.job_id), job.to_dict())
+        except OSError as e:
+            logger.warning(f"⚠️  Could not record training job {job.job_id}: {str(e)}")
+
+    def _checked(self, job: TrainingJob) -> TrainingJob:
+        """Mark a job failed if the worker that ran it exited before finishing it"""
+        if job.status in ACTIVE_STATES and job.job_id not in self.jobs and not pid_alive(job.worker_pid):
+            job.status = FAILED
+            job.error = "Worker exited before the job finished"
+            job.finished_at = job.finished_at or datetime.utcnow().isoformat()
+            self._save(job)
+        return job
+
+    def _load_jobs(self) -> List[TrainingJob]:
+        """Every recorded job; this worker's own jobs come from memory"""
+        jobs = dict(self.jobs)
+        try:
+            names = os.listdir(self.jobs_dir)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            job_id, ext = os.path.splitext(name)
+            if ext != '.json' or job_id in jobs:
+                continue
+            data = read_json(os.path.join(self.jobs_dir, name))
+            if data:
+                jobs[job_id] = self._checked(TrainingJob.from_dict(data))
+        return list(jobs.values())
+
+    def _trim_history(self):
+        finished = [j for j in self.list_jobs() if j.status not in ACTIVE_STATES and j is not self._active]
+        for job in finished[self.history:]:
+            self.jobs.pop(job.job_id, None)
+            try:
+                os.remove(self._job_path(job.job_id))
+            except FileNotFoundError:
+                pass
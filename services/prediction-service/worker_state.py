@@ -0,0 +1,76 @@
+"""
+State shared by the serving workers
+serve.py forks several workers that each keep their own memory; anything
+every worker must answer for (training jobs, feature store refreshes) lives
+in small JSON files and flock files in the artifact directory instead.
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+from typing import IO, Any, Dict, Optional
+
+
+def write_json(path: str, data: Dict[str, Any]):
+    """Replace path with data, atomically, so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def read_json(path: str) -> Optional[Dict[str, Any]]:
+    """Contents of a file written by write_json, or None if it is missing"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def try_lock(path: str) -> Optional[IO]:
+    """
+    Take an exclusive flock on path without waiting
+
+    Returns:
+        The open lock file (close it to release the lock), or None if another
+        process or open file already holds it
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock_file = open(path, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def is_locked(path: str) -> bool:
+    """Whether someone currently holds the flock on path"""
+    lock_file = try_lock(path)
+    if lock_file is None:
+        return True
+    lock_file.close()
+    return False
+
+
+def pid_alive(pid: Optional[int]) -> bool:
+    """Whether a process with this pid is still running on this host"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
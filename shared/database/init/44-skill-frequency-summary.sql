@@ -0,0 +1,168 @@
+-- Migration: Incrementally maintained skill frequency summary
+-- Skill counts and success rates per technology mentioned in scraped_posts
+-- metadata, kept up to date by refresh_skill_frequency_summary() so the
+-- prediction service reads a few hundred summary rows instead of every post
+
+-- What each post currently contributes to the summary, so a changed or
+-- deleted post can have its old counts subtracted
+CREATE TABLE IF NOT EXISTS skill_post_contributions (
+    post_id VARCHAR(100) PRIMARY KEY,
+    potential_outcome VARCHAR(20) NOT NULL,
+    skills TEXT[] NOT NULL DEFAULT '{}',
+    counted_at TIMESTAMP DEFAULT NOW()
+);
+
+-- One row per skill (lowercased)
+CREATE TABLE IF NOT EXISTS skill_frequency_summary (
+    skill TEXT PRIMARY KEY,
+    positive_count INTEGER NOT NULL DEFAULT 0,
+    negative_count INTEGER NOT NULL DEFAULT 0,
+    total INTEGER GENERATED ALWAYS AS (positive_count + negative_count) STORED,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_skill_frequency_summary_total
+  ON skill_frequency_summary(total DESC);
+
+-- Single-row refresh watermark
+CREATE TABLE IF NOT EXISTS skill_frequency_refresh_state (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    refreshed_through TIMESTAMP,
+    last_refresh_at TIMESTAMP,
+    last_changed_posts INTEGER DEFAULT 0
+);
+
+INSERT INTO skill_frequency_refresh_state (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+-- Changed posts are found through updated_at (maintained by trigger)
+CREATE INDEX IF NOT EXISTS idx_scraped_posts_updated_at
+  ON scraped_posts(updated_at);
+
+-- Deleted posts waiting to have their contributions subtracted, recorded by
+-- trigger so a refresh never has to scan skill_post_contributions for them
+CREATE TABLE IF NOT EXISTS skill_deleted_posts (
+    post_id VARCHAR(100) PRIMARY KEY,
+    deleted_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION record_skill_deleted_posts()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO skill_deleted_posts (post_id)
+  SELECT post_id FROM deleted_posts
+  ON CONFLICT (post_id) DO NOTHING;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS record_skill_deleted_posts ON scraped_posts;
+CREATE TRIGGER record_skill_deleted_posts
+  AFTER DELETE ON scraped_posts
+  REFERENCING OLD TABLE AS deleted_posts
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION record_skill_deleted_posts();
+
+-- Posts deleted before the trigger existed (one-off, when upgrading)
+INSERT INTO skill_deleted_posts (post_id)
+SELECT c.post_id
+FROM skill_post_contributions c
+LEFT JOIN scraped_posts p ON p.post_id = c.post_id
+WHERE p.post_id IS NULL
+ON CONFLICT (post_id) DO NOTHING;
+
+-- Apply every post changed or deleted since the last refresh: subtract its
+-- previous contribution, record the new one and add it. Reprocessing a post
+-- is idempotent, so the watermark looks back a few minutes to catch rows
+-- committed late by concurrent transactions. Returns the number of posts
+-- reprocessed.
+CREATE OR REPLACE FUNCTION refresh_skill_frequency_summary()
+RETURNS INTEGER AS $$
+DECLARE
+  v_since TIMESTAMP;
+  v_now TIMESTAMP := clock_timestamp();
+  v_changed INTEGER;
+BEGIN
+  -- One refresh at a time
+  PERFORM pg_advisory_xact_lock(hashtext('skill_frequency_summary'));
+
+  SELECT refreshed_through INTO v_since FROM skill_frequency_refresh_state WHERE id = 1;
+
+  DROP TABLE IF EXISTS _skill_changed_posts;
+  CREATE TEMP TABLE _skill_changed_posts ON COMMIT DROP AS
+    SELECT post_id
+    FROM scraped_posts
+    WHERE v_since IS NULL OR updated_at > v_since - INTERVAL '5 minutes'
+    UNION
+    SELECT post_id
+    FROM skill_deleted_posts;
+
+  SELECT COUNT(*) INTO v_changed FROM _skill_changed_posts;
+
+  IF v_changed > 0 THEN
+    -- Subtract previous contributions
+    UPDATE skill_frequency_summary s
+    SET positive_count = s.positive_count - old.positive_count,
+        negative_count = s.negative_count - old.negative_count,
+        updated_at = NOW()
+    FROM (
+      SELECT skill,
+             COUNT(*) FILTER (WHERE c.potential_outcome = 'positive') AS positive_count,
+             COUNT(*) FILTER (WHERE c.potential_outcome = 'negative') AS negative_count
+      FROM skill_post_contributions c
+      JOIN _skill_changed_posts USING (post_id)
+      CROSS JOIN LATERAL unnest(c.skills) AS skill
+      GROUP BY skill
+    ) old
+    WHERE s.skill = old.skill;
+
+    DELETE FROM skill_post_contributions c
+    USING _skill_changed_posts ch
+    WHERE c.post_id = ch.post_id;
+
+    -- Record current contributions of labelled posts
+    INSERT INTO skill_post_contributions (post_id, potential_outcome, skills)
+    SELECT p.post_id,
+           p.potential_outcome,
+           ARRAY(SELECT lower(t) FROM jsonb_array_elements_text(p.metadata->'technologies') AS t)
+    FROM scraped_posts p
+    JOIN _skill_changed_posts USING (post_id)
+    WHERE p.potential_outcome IN ('positive', 'negative')
+      AND jsonb_typeof(p.metadata->'technologies') = 'array';
+
+    -- Add them
+    INSERT INTO skill_frequency_summary AS s (skill, positive_count, negative_count)
+    SELECT skill,
+           COUNT(*) FILTER (WHERE c.potential_outcome = 'positive'),
+           COUNT(*) FILTER (WHERE c.potential_outcome = 'negative')
+    FROM skill_post_contributions c
+    JOIN _skill_changed_posts USING (post_id)
+    CROSS JOIN LATERAL unnest(c.skills) AS skill
+    GROUP BY skill
+    ON CONFLICT (skill) DO UPDATE
+    SET positive_count = s.positive_count + EXCLUDED.positive_count,
+        negative_count = s.negative_count + EXCLUDED.negative_count,
+        updated_at = NOW();
+
+    DELETE FROM skill_frequency_summary WHERE positive_count + negative_count <= 0;
+
+    DELETE FROM skill_deleted_posts d
+    USING _skill_changed_posts ch
+    WHERE d.post_id = ch.post_id;
+  END IF;
+
+  UPDATE skill_frequency_refresh_state
+  SET refreshed_through = v_now,
+      last_refresh_at = NOW(),
+      last_changed_posts = v_changed
+  WHERE id = 1;
+
+  RETURN v_changed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Initial build
+SELECT refresh_skill_frequency_summary();
+
+COMMENT ON TABLE skill_frequency_summary IS 'Per-skill positive/negative post counts, maintained by refresh_skill_frequency_summary()';
+COMMENT ON TABLE skill_post_contributions IS 'Skills each labelled post contributes to skill_frequency_summary';
+COMMENT ON TABLE skill_deleted_posts IS 'Deleted scraped_posts not yet subtracted from skill_frequency_summary';
@@ -0,0 +1,19 @@
+-- Migration: Per-post feature store for the prediction service
+-- Keyword/metadata feature vectors computed once per post and feature schema
+-- version, so retraining reads vectors instead of re-extracting post text
+
+CREATE TABLE IF NOT EXISTS post_features (
+    post_id VARCHAR(100) NOT NULL REFERENCES scraped_posts(post_id) ON DELETE CASCADE,
+    schema_version INTEGER NOT NULL,
+    features REAL[] NOT NULL,
+    source_hash TEXT,  -- md5 of the inputs the vector was computed from (body_text, word_count, metadata counts)
+    source_updated_at TIMESTAMP,  -- scraped_posts.updated_at when the inputs were last compared
+    computed_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (post_id, schema_version)
+);
+
+-- Vectors of older schema versions are dead weight once a new version is live
+CREATE INDEX IF NOT EXISTS idx_post_features_schema_version
+  ON post_features(schema_version);
+
+COMMENT ON TABLE post_features IS 'Prediction-service feature vectors per post and feature schema version (see features.FEATURE_SCHEMA_VERSION)';
@@ -0,0 +1,17 @@
+-- Migration: Enrichment worker checkpoints
+-- One row per prediction-service enrichment worker: the scraped_posts ids of
+-- the batch it has claimed but not yet written back, plus running totals, so
+-- a restarted worker hands its unfinished batch back and keeps its counters
+
+CREATE TABLE IF NOT EXISTS enrichment_checkpoints (
+    worker_id VARCHAR(200) PRIMARY KEY,
+    in_flight INTEGER[] NOT NULL DEFAULT '{}',  -- scraped_posts.id of the claimed batch
+    batches BIGINT NOT NULL DEFAULT 0,
+    posts_enriched BIGINT NOT NULL DEFAULT 0,
+    posts_failed BIGINT NOT NULL DEFAULT 0,
+    last_post_id VARCHAR(100),
+    last_batch_posts_per_second REAL,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE enrichment_checkpoints IS 'Progress of prediction-service enrichment workers (see enrichment_worker.py)';